@@ -8,8 +8,14 @@ import sys
 import os
 import subprocess
 import site
+import time
+import importlib
+import importlib.util
 from pathlib import Path
 
+# (phase, time.perf_counter() at its end); see StartupReport
+STARTUP_MARKS = [("start", time.perf_counter())]
+
 # Configuration
 MODULES_DIR = Path(__file__).parent / "modules"
 REQUIREMENTS = {
@@ -77,34 +83,19 @@ def check_and_install_modules():
     missing_modules = []
     
     for module, version in REQUIREMENTS.items():
-        module_name = module.replace("-", "_")
-        # Special case for pillow - check for PIL import
-        if module == "pillow":
-            try:
-                __import__("PIL")
-                print(f"[OK] {module} found in system Python")
-                continue
-            except ImportError:
-                pass
-        else:
-            # Check if module is already in system Python
-            try:
-                __import__(module_name)
-                print(f"[OK] {module} found in system Python")
-                continue
-            except ImportError:
-                pass
+        # find_spec locates a package without importing it; yt-dlp alone takes most of
+        # a second to import, and the app only imports it when it is first needed
+        module_name = "PIL" if module == "pillow" else module.replace("-", "_")
+        if importlib.util.find_spec(module_name) is not None:
+            print(f"[OK] {module} found in system Python")
+            continue
         
         # Check if module is in modules directory (append to path to prioritize system packages)
-        try:
-            if str(MODULES_DIR) not in sys.path:
-                sys.path.append(str(MODULES_DIR))
-            if module == "pillow":
-                __import__("PIL")
-            else:
-                __import__(module_name)
+        if str(MODULES_DIR) not in sys.path:
+            sys.path.append(str(MODULES_DIR))
+        if importlib.util.find_spec(module_name) is not None:
             print(f"[OK] {module} found in modules directory")
-        except ImportError:
+        else:
             print(f"[FAIL] {module} not found")
             missing_modules.append((module, version))
     
@@ -118,41 +109,83 @@ def check_and_install_modules():
     if str(MODULES_DIR) not in sys.path:
         sys.path.append(str(MODULES_DIR))
 
-# Run module check and installation
-check_and_install_modules()
+# Run module check and installation, in the app process only: worker processes (the spawn
+# start method re-imports this file) get the app's sys.path and must not print or pip install
+import multiprocessing
+if multiprocessing.parent_process() is None:
+    check_and_install_modules()
+elif str(MODULES_DIR) not in sys.path:
+    sys.path.append(str(MODULES_DIR))
+STARTUP_MARKS.append(("module check", time.perf_counter()))
 
 # ============================================================================
 # MAIN IMPORTS
 # ============================================================================
 
+import argparse
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import tkinter
 import threading
-import yt_dlp
-import sqlite3
+import asyncio
+import queue
 import json
+import re
+import bisect
+import cProfile
+import functools
+import glob
+import itertools
+import logging
+import logging.handlers
+import pstats
 import time
-import requests
+import random
+import shutil
+import signal
+from collections import Counter, OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from contextlib import ExitStack, contextmanager, nullcontext
 from io import BytesIO
-import webbrowser
-
-# Handle PIL import gracefully - try multiple import methods
-Image = None
-ImageTk = None
-
-# Try direct PIL import
-try:
-    from PIL import Image
-    print("[OK] PIL (Image) imported successfully")
-except ImportError as e:
-    print(f"Warning: PIL/Pillow import failed: {e}. Trying alternative imports...")
-    try:
-        import PIL.Image as Image
-        print("[OK] PIL imported via PIL.Image")
-    except ImportError as e2:
-        print(f"Warning: PIL/Pillow not available: {e2}. Thumbnails will not load.")
-        Image = None
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Keeps slow imports off the path to the first painted window; warm() imports the
+    module ahead of use, from a background thread after startup.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def warm(self):
+        if self._module is None:
+            # Import is thread-safe; two threads racing here get the same module object
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        # Only called for attributes the proxy itself doesn't have
+        return getattr(self.warm(), attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'{' (loaded)' if self._module else ''}>"
+
+
+yt_dlp = LazyModule('yt_dlp')
+requests = LazyModule('requests')
+sqlite3 = LazyModule('sqlite3')
+webbrowser = LazyModule('webbrowser')
+
+# Pillow is optional; without it thumbnails are not shown
+Image = LazyModule('PIL.Image') if importlib.util.find_spec('PIL') is not None else None
+if Image is None:
+    print("Warning: PIL/Pillow not available. Thumbnails will not load.")
+
+STARTUP_MARKS.append(("imports", time.perf_counter()))
 
 # A comprehensive set of default yt-dlp settings.
 DEFAULT_CONFIG = {
@@ -163,7 +196,16 @@ DEFAULT_CONFIG = {
         "retries": 10,
         "fragment_retries": 10,
         "concurrent_fragment_downloads": 5,
-        "limit_rate": "0"  # 0 = unlimited
+        "limit_rate": "0",  # 0 = unlimited
+        "queue_policy": "FIFO",  # FIFO, Shortest first, Priority or Round-robin
+        "batch_workers": 8,  # Parallel metadata lookups (batch imports, subscriptions, playlist formats)
+        "queue_retries": 3,  # Re-queue attempts for transient failures (rate limits, network, expired URLs)
+        "retry_base_delay": 10,  # Seconds; doubled on each attempt, with jitter
+        "min_free_space_mb": 1024,  # Keep this much free on the target disk
+        "disk_check_interval": 15,  # Seconds between free space checks while downloading
+        "enrich_workers": 2,  # Background format lookups for playlist entries
+        "enrich_interval": 1,  # Minimum seconds between those lookups
+        "shutdown_timeout": 30  # Seconds to let post-processing finish when closing
     },
     "output": {
         "keep_video": False,
@@ -198,6 +240,39 @@ DEFAULT_CONFIG = {
         "socket_timeout": 20,
         "source_address": "0.0.0.0"  # 0.0.0.0 for auto-select
     },
+    "performance": {
+        "execution_mode": "threads",  # threads or processes (yt-dlp runs in worker processes)
+        "worker_processes": 2,
+        "worker_stall_timeout": 600,  # Seconds without progress before a download worker is restarted
+        "extract_timeout": 120  # Seconds before a metadata lookup worker is restarted
+    },
+    "live": {
+        "max_captures": 2,  # Live recordings run in their own slots, outside the download queue
+        "segment_minutes": 60,  # Split recordings into files of this length
+        "keep_segments": 0,  # Delete the oldest segments beyond this many (0 = keep all)
+        "from_start": False,  # Record from the beginning of the stream (single file, no segments)
+        "poll_interval": 60  # Seconds between checks while waiting for a premiere to start
+    },
+    "subscriptions": {
+        "auto_sync": False,
+        "interval_minutes": 60,
+        "sync_workers": 4,
+        "auto_download": False  # Start the queue when a scheduled sync finds new uploads
+    },
+    "logging": {
+        "level": "INFO",  # DEBUG, INFO, WARNING or ERROR
+        "ytdlp_verbose": False,  # yt-dlp's debug output (logged at DEBUG); slows large runs
+        "log_to_file": False,
+        "log_file": "logs/yt-dlp-gui.log",
+        "max_file_mb": 5,  # Rotate the log file at this size
+        "backup_count": 3,  # Rotated files to keep
+        "buffer_lines": 5000  # Recent messages kept in memory for the log viewer
+    },
+    "metrics": {
+        "http_port": 0,  # Serve Prometheus-format metrics on 127.0.0.1:<port> (0 = off)
+        "file": "",  # Also write them to this file (empty = off)
+        "file_interval": 15  # Seconds between file writes
+    },
     "authentication": {
         "use_cookies": False,
         "cookie_browser": "chrome",
@@ -274,294 +349,2336 @@ class EntryContextMenu:
             pass
 
 
-class DatabaseManager:
-    """Database manager for download history"""
+class LogBuffer(logging.Handler):
+    """Ring buffer of recent log records for the log viewer.
 
-    def __init__(self, db_path='downloads.db'):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.create_tables()
+    Writers never take a lock: appending to a bounded deque and drawing from the
+    sequence counter are atomic in CPython, so worker threads only pay for
+    formatting their own message. The viewer polls for entries newer than the
+    last sequence number it has shown.
+    """
 
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS downloads (id INTEGER PRIMARY KEY AUTOINCREMENT, video_id TEXT UNIQUE NOT NULL, title TEXT, url TEXT, uploader TEXT, duration INTEGER, format TEXT, resolution TEXT, file_path TEXT, file_size INTEGER, download_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, status TEXT DEFAULT 'completed')''')
-        self.conn.commit()
+    def __init__(self, capacity=5000):
+        super().__init__()
+        self.entries = deque(maxlen=capacity)  # (seq, created, levelno, logger name, message)
+        self.counter = itertools.count(1)
 
-    def add_download(self, info):
-        cursor = self.conn.cursor()
-        cursor.execute('''INSERT OR REPLACE INTO downloads (video_id, title, url, uploader, duration, format, resolution, file_path, file_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', (info.get('id'), info.get('title'), info.get(
-            'webpage_url'), info.get('uploader'), info.get('duration'), info.get('format'), info.get('resolution'), info.get('_filename') or info.get('requested_downloads', [{}])[0].get('_filename'), info.get('filesize') or info.get('filesize_approx')))
-        self.conn.commit()
+    def handle(self, record):
+        # Handler.handle would serialize writers on the handler lock
+        if self.filter(record):
+            self.emit(record)
+        return True
 
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message += "\n" + logging.Formatter().formatException(record.exc_info)
+            self.entries.append((next(self.counter), record.created, record.levelno, record.name, message))
+        except Exception:
+            self.handleError(record)
 
-class YouTubeDownloader:
-    """Main class for managing YouTube downloads"""
-    
-    # Custom User-Agent headers for different device types
-    CUSTOM_HEADERS = {
-        "Desktop": {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-        },
-        "Android": {
-            "User-Agent": "Mozilla/5.0 (Linux; Android 13; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Mobile Safari/537.36"
-        },
-        "iOS": {
-            "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
-        },
-        "TV": {
-            "User-Agent": "Mozilla/5.0 (CrKey armv7l 1.54.110279) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-        },
-        "Chrome": {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-        },
-        "Firefox": {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0"
-        },
-        "Safari": {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15"
-        },
-        "Edge": {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0"
-        },
-        "Samsung Smart TV": {
-            "User-Agent": "Mozilla/5.0 (SmartTV; Tizen 6.0) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/16.0 Chrome/96.0.4664.45 TV Safari/537.36"
-        },
-        "Roku": {
-            "User-Agent": "Mozilla/5.0 (Roku/DVP-7.70 (297.70E04154A)) Gecko/20100101 Firefox/108.0"
-        }
-    }
+    def resize(self, capacity):
+        if capacity != self.entries.maxlen:
+            self.entries = deque(self.entries, maxlen=max(100, capacity))
 
-    def __init__(self, config_path='config.json', progress_callback=None, postprocessor_callback=None, log_callback=None):
-        self.progress_callback = progress_callback
-        self.postprocessor_callback = postprocessor_callback
-        self.log_callback = log_callback
-        self.config = self.load_config(config_path)
-        self.db = DatabaseManager('downloads.db')
+    def since(self, seq):
+        """Entries newer than seq, oldest first."""
+        while True:
+            try:
+                snapshot = list(self.entries)
+                break
+            except RuntimeError:  # Appended to while copying; try again
+                continue
+        start = len(snapshot)
+        while start > 0 and snapshot[start - 1][0] > seq:
+            start -= 1
+        return snapshot[start:]
 
-    def log(self, message):
-        if self.log_callback:
-            self.log_callback(message)
 
-    def load_config(self, path):
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                user_config = json.load(f)
-                config = DEFAULT_CONFIG.copy()
-                for key, value in user_config.items():
-                    if key in config and isinstance(value, dict):
-                        config[key].update(value)
-                    else:
-                        config[key] = value
-                return config
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.log(
-                f"'{path}' not found or invalid, creating default config.")
+class LogPipeline:
+    """Levels and handlers of the 'ytgui.*' loggers, built from the "logging" config section.
+
+    Every record goes to the in-memory LogBuffer; console (warnings and up) and the
+    rotating log file are written by a listener thread fed through a queue, so a slow
+    disk never stalls a download thread.
+    """
+
+    FORMAT = logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def __init__(self):
+        self.root = logging.getLogger('ytgui')
+        self.root.propagate = False
+        self.buffer = LogBuffer()
+        self.root.addHandler(self.buffer)
+        self.listener = None
+
+    def configure(self, config):
+        settings = config.get('logging', {})
+        self.stop()
+        self.root.setLevel(getattr(logging, str(settings.get('level') or 'INFO').upper(), logging.INFO))
+        self.buffer.resize(int(settings.get('buffer_lines') or 5000))
+        handlers = []
+        console = logging.StreamHandler()
+        console.setLevel(logging.WARNING)
+        handlers.append(console)
+        if settings.get('log_to_file'):
+            path = Path(settings.get('log_file') or 'logs/yt-dlp-gui.log').expanduser()
             try:
-                with open(path, 'w', encoding='utf-8') as f:
-                    json.dump(DEFAULT_CONFIG, f, indent=2, ensure_ascii=False)
-                return DEFAULT_CONFIG
-            except Exception as e:
-                self.log(f"Error creating config file: {e}")
-                return DEFAULT_CONFIG
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handlers.append(logging.handlers.RotatingFileHandler(
+                    path, maxBytes=int(settings.get('max_file_mb') or 5) * 1024 * 1024,
+                    backupCount=int(settings.get('backup_count') or 3), encoding='utf-8'))
+            except OSError as e:
+                self.root.warning(f"Cannot write log file {path}: {e}")
+        for handler in handlers:
+            handler.setFormatter(self.FORMAT)
+        records = queue.SimpleQueue()
+        self.root.addHandler(logging.handlers.QueueHandler(records))
+        self.listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        self.listener.start()
 
-    def get_video_info(self, url):
-        ydl_opts = {'quiet': True, 'no_warnings': True,
-                    'extract_flat': False, 'skip_download': True}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return {
-                'title': info.get('title'),
-                'duration': info.get('duration'),
-                'uploader': info.get('uploader'),
-                'thumbnail': info.get('thumbnail'),
-                'formats': self._parse_formats(info.get('formats', [])),
-                'subtitles': list(info.get('subtitles', {}).keys()),
-                'views': info.get('view_count'),
-                'likes': info.get('like_count'),
-                'upload_date': info.get('upload_date'),
-                'description': info.get('description'),
-                'tags': info.get('tags', []),
-                'categories': info.get('categories', []),
-                'age_limit': info.get('age_limit'),
-                'availability': info.get('availability'),
-                'is_live': info.get('is_live', False),
-                'channel_id': info.get('channel_id'),
-            }
-    
-    def get_playlist_info(self, url):
-        """Extract playlist information with flat extraction."""
-        ydl_opts = {'quiet': True, 'no_warnings': True,
-                    'extract_flat': 'in_playlist', 'skip_download': True}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            entries = info.get('entries', [])
-            videos = []
-            for entry in entries:
-                videos.append({
-                    'id': entry.get('id'),
-                    'title': entry.get('title', 'Unknown'),
-                    'duration': entry.get('duration', 0),
-                    'url': entry.get('url') or f"https://www.youtube.com/watch?v={entry.get('id')}"
-                })
-            return {
-                'title': info.get('title', 'Playlist'),
-                'uploader': info.get('uploader', 'N/A'),
-                'videos': videos
-            }
+    def stop(self):
+        """Flush and close the console/file handlers."""
+        for handler in list(self.root.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                self.root.removeHandler(handler)
+        if self.listener:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
 
-    def _parse_formats(self, formats):
-        video_formats = []
-        audio_formats = []
-        container_formats = set()
-        for f in formats:
-            if f.get('vcodec') != 'none' and f.get('acodec') == 'none':
-                video_formats.append({'format_id': f.get('format_id'), 'resolution': f.get('resolution'), 'fps': f.get('fps'), 'vcodec': f.get(
-                    'vcodec'), 'filesize': f.get('filesize') or f.get('filesize_approx'), 'format_note': f.get('format_note'), 'ext': f.get('ext')})
-            elif f.get('vcodec') == 'none' and f.get('acodec') != 'none':
-                audio_formats.append({'format_id': f.get('format_id'), 'acodec': f.get('acodec'), 'abr': f.get('abr'), 'filesize': f.get('filesize') or f.get('filesize_approx')})
-            # Collect all available container formats
-            if f.get('ext'):
-                container_formats.add(f.get('ext'))
-        return {'video': video_formats, 'audio': audio_formats, 'formats': sorted(list(container_formats))}
 
-    def download(self, url, options):
-        options['progress_hooks'] = [self.progress_hook]
-        options['postprocessor_hooks'] = [self.postprocessor_hook]
+class YtDlpLogger:
+    """Sends yt-dlp's output to the 'ytgui.yt_dlp' logger instead of stdout/stderr."""
+
+    logger = logging.getLogger('ytgui.yt_dlp')
+
+    def debug(self, message):
+        # yt-dlp passes both its debug and its screen messages here; only debug ones are prefixed
+        if message.startswith('[debug] '):
+            self.logger.debug(message[8:])
+        else:
+            self.logger.info(message)
+
+    def info(self, message):
+        self.logger.info(message)
+
+    def warning(self, message):
+        self.logger.warning(message)
+
+    def error(self, message):
+        self.logger.error(message)
+
+
+class Histogram:
+    """Bucketed distribution of observations, with Prometheus-style upper bounds."""
+
+    SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+    BYTES = tuple(2 ** n for n in range(10, 37, 2))  # 1 KiB .. 64 GiB
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate, interpolating inside the bucket that holds the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / count, self.max)
+            cumulative += count
+        return self.max
+
+
+class Metrics:
+    """Process-wide counters and histograms (the METRICS instance).
+
+    Names follow Prometheus conventions: counters end in _total, histograms in
+    _seconds or _bytes; labels are keyword arguments.
+    """
+
+    PREFIX = "ytgui_"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if (histogram := self.histograms.get(key)) is None:
+                buckets = Histogram.BYTES if '_bytes' in name else Histogram.SECONDS
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the block into '<name>_seconds'; exceptions also count in '<name>_errors_total'."""
+        start = time.perf_counter()
         try:
-            with yt_dlp.YoutubeDL(options) as ydl:
-                self.log(f"Attempting to download {url} with specified options.")
-                info = ydl.extract_info(url, download=True)
-                final_info = ydl.sanitize_info(info)
-                self.db.add_download(final_info)
-                return {'status': 'success', 'info': final_info}
-        except yt_dlp.utils.DownloadError as e:
-            if "Failed to decrypt with DPAPI" in str(e) and options.get('cookiesfrombrowser'):
-                self.log("Cookie decryption failed. Retrying download without browser cookies.")
-                
-                new_options = options.copy()
-                new_options['cookiesfrombrowser'] = None
-                
-                try:
-                    with yt_dlp.YoutubeDL(new_options) as ydl:
-                        self.log(f"Retrying download for {url} without cookies.")
-                        info = ydl.extract_info(url, download=True)
-                        final_info = ydl.sanitize_info(info)
-                        self.db.add_download(final_info)
-                        self.log("Download succeeded on retry.")
-                        return {'status': 'success', 'info': final_info}
-                except Exception as retry_e:
-                    self.log(f"Download retry failed: {retry_e}")
-                    message = "Cookie decryption failed and the download was unsuccessful without cookies. The video may be private or require a login that is not accessible."
-                    return {'status': 'error', 'message': message}
-            else:
-                import traceback
-                traceback.print_exc()
-                self.log(f"Download Error: {e}")
-                return {'status': 'error', 'message': str(e)}
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            self.log(f"An unexpected error occurred during download: {e}")
-            return {'status': 'error', 'message': str(e)}
+            yield
+        except Exception:
+            self.inc(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
 
-    def progress_hook(self, d):
-        if self.progress_callback:
-            self.progress_callback(d)
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
 
-    def postprocessor_hook(self, d):
-        if self.postprocessor_callback:
-            self.postprocessor_callback(d)
-    
-    def extract_headers_from_cookies(self, cookie_file_path):
-        """Extract useful headers from cookie file."""
+    def snapshot(self):
+        """(counters, histograms) as sorted lists of (name, labels, value/summary dict)."""
+        with self.lock:
+            counters = [(name, labels, value) for (name, labels), value in sorted(self.counters.items())]
+            histograms = [(name, labels, {'count': h.count, 'sum': h.sum, 'max': h.max,
+                                          'p50': h.quantile(0.5), 'p95': h.quantile(0.95)})
+                          for (name, labels), h in sorted(self.histograms.items())]
+        return counters, histograms
+
+    @staticmethod
+    def _labels(labels, **extra):
+        pairs = list(labels) + list(extra.items())
+        if not pairs:
+            return ""
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {self.PREFIX}{name} counter")
+                lines.append(f"{self.PREFIX}{name}{self._labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {self.PREFIX}{name} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f"{self.PREFIX}{name}_bucket{self._labels(labels, le=le)} {cumulative}")
+                lines.append(f"{self.PREFIX}{name}_sum{self._labels(labels)} {histogram.sum}")
+                lines.append(f"{self.PREFIX}{name}_count{self._labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+class MetricsExporter:
+    """Publishes METRICS for headless runs: an HTTP endpoint on localhost and/or a file."""
+
+    def __init__(self, metrics, port=0, path="", interval=15):
+        self.metrics = metrics
+        self.port = port
+        self.path = Path(path).expanduser() if path else None
+        self.interval = max(1, interval)
+        self.server = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if self.port:
+            metrics = self.metrics
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = metrics.prometheus_text().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                def log_message(self, format, *args):
+                    pass  # Scrapes would flood the log
+            self.server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        if self.path:
+            threading.Thread(target=self._write_loop, name="metrics-file", daemon=True).start()
+        return self
+
+    def _write_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.write_file()
+
+    def write_file(self):
         try:
-            with open(cookie_file_path, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
-            
-            headers = {}
-            if isinstance(cookies, list):
-                # Extract security cookies if available
-                for cookie in cookies:
-                    if cookie.get('name') in ['PSID', 'SSID', 'APISID', 'SAPISID']:
-                        headers[f"X-{cookie['name']}"] = cookie.get('value', '')
-            
-            # Add default Chrome headers
-            headers['User-Agent'] = self.CUSTOM_HEADERS.get('Chrome', {}).get('User-Agent', '')
-            headers['Accept-Language'] = 'en-US,en;q=0.9'
-            headers['Accept-Encoding'] = 'gzip, deflate, br'
-            headers['Sec-Fetch-Dest'] = 'document'
-            headers['Sec-Fetch-Mode'] = 'navigate'
-            headers['Sec-Fetch-Site'] = 'none'
-            
-            return headers if headers else None
-        except Exception as e:
-            self.log(f"Failed to extract headers from cookies: {e}")
-            return None
-    
-    def get_http_headers(self, config):
-        """Build HTTP headers based on config."""
-        headers = {}
-        
-        auth_config = config.get('authentication', {})
-        
-        # Extract headers from cookie file if enabled
-        if auth_config.get('use_headers_from_cookies') and auth_config.get('cookie_file_path'):
-            extracted_headers = self.extract_headers_from_cookies(auth_config['cookie_file_path'])
-            if extracted_headers:
-                headers.update(extracted_headers)
-        
-        # Apply custom headers if enabled
-        if auth_config.get('use_custom_headers'):
-            header_type = auth_config.get('custom_header_type', 'Desktop')
-            custom_header = self.CUSTOM_HEADERS.get(header_type, {})
-            headers.update(custom_header)
-        
-        return headers if headers else None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(self.path.name + ".tmp")
+            temporary.write_text(self.metrics.prometheus_text(), encoding='utf-8')
+            os.replace(temporary, self.path)  # Readers never see a half-written file
+        except OSError as e:
+            logging.getLogger('ytgui.metrics').warning(f"Cannot write metrics file {self.path}: {e}")
 
+    def stop(self):
+        self.stop_event.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.path:
+            self.write_file()
 
-class PlaylistSelectorWindow(ctk.CTkToplevel):
-    """Popup window to select videos from a playlist."""
 
-    def __init__(self, parent, playlist_info):
-        super().__init__(parent)
-        self.transient(parent)
-        self.title("Playlist Video Selector")
-        self.geometry("700x600")
-        self.parent = parent
-        self.playlist_info = playlist_info
-        self.selected_videos = []
-        self.checkboxes = []
-        self.check_vars = []
-        
-        self.setup_ui()
+class Timeline:
+    """Trace of one queue item, exported as Chrome trace-event JSON (chrome://tracing, Perfetto).
 
-    def setup_ui(self):
-        # Header frame
-        header_frame = ctk.CTkFrame(self)
-        header_frame.pack(padx=10, pady=10, fill="x")
-        
-        ctk.CTkLabel(header_frame, text=f"Playlist: {self.playlist_info['title']}", 
-                     font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w")
-        ctk.CTkLabel(header_frame, text=f"Uploader: {self.playlist_info['uploader']} | Videos: {len(self.playlist_info['videos'])}", 
-                     font=ctk.CTkFont(size=11)).pack(anchor="w", pady=(5, 0))
-        
-        # Button frame for Select/Unselect All
-        button_frame = ctk.CTkFrame(self)
-        button_frame.pack(padx=10, pady=5, fill="x")
-        
-        ctk.CTkButton(button_frame, text="Select All", command=self.select_all, width=100).pack(side="left", padx=5)
-        ctk.CTkButton(button_frame, text="Unselect All", command=self.unselect_all, width=100).pack(side="left", padx=5)
-        
-        # Scrollable frame for videos
-        scrollable_frame = ctk.CTkScrollableFrame(self)
-        scrollable_frame.pack(padx=10, pady=10, fill="both", expand=True)
-        scrollable_frame.grid_columnconfigure(0, weight=1)
+    Stages go on separate tracks, so a slow item shows at a glance whether its time
+    went to extraction, the transfer or ffmpeg. Spans are built from the progress and
+    postprocessor hook events.
+    """
+
+    FRAGMENT_BATCH = 20  # Fragments per span of fragmented (HLS/DASH) transfers
+    TRACKS = {'queue': 1, 'extract': 2, 'transfer': 3, 'postprocess': 4, 'db': 5}
+
+    def __init__(self, title, queued_at=None):
+        self.title = title
+        self.events = []
+        self.open = {}  # key -> (start, name, category, args)
+        if queued_at:
+            self.instant('queued', 'queue', at=queued_at)
+            self.complete('waiting in queue', 'queue', queued_at, time.time())
+
+    def instant(self, name, category, at=None, **args):
+        self.events.append({'name': name, 'cat': category, 'ph': 'i', 's': 't', 'ts': int((at or time.time()) * 1e6),
+                            'tid': self.TRACKS[category], 'args': args})
+
+    def complete(self, name, category, start, end, **args):
+        self.events.append({'name': name, 'cat': category, 'ph': 'X', 'ts': int(start * 1e6),
+                            'dur': max(0, int((end - start) * 1e6)), 'tid': self.TRACKS[category], 'args': args})
+
+    def begin(self, key, name, category, **args):
+        self.open[key] = (time.time(), name, category, args)
+
+    def end(self, key, **args):
+        if (entry := self.open.pop(key, None)) is not None:
+            start, name, category, begin_args = entry
+            self.complete(name, category, start, time.time(), **begin_args, **args)
+
+    @contextmanager
+    def span(self, name, category, **args):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, time.time(), **args)
+
+    def on_progress(self, d):
+        self.end('extract')  # The first progress event comes once extraction is done
+        filename = d.get('filename') or ''
+        if d['status'] == 'downloading':
+            if ('file', filename) not in self.open:
+                self.begin(('file', filename), f"download {Path(filename).name}", 'transfer')
+            if d.get('fragment_index'):
+                batch = (d['fragment_index'] - 1) // self.FRAGMENT_BATCH
+                current = self.open.get(('batch', filename))
+                if current is None or current[3]['batch'] != batch:
+                    self.end(('batch', filename), bytes=d.get('downloaded_bytes'))
+                    last = min((batch + 1) * self.FRAGMENT_BATCH, d.get('fragment_count') or 0) or '?'
+                    self.begin(('batch', filename), f"fragments {batch * self.FRAGMENT_BATCH + 1}-{last}",
+                               'transfer', batch=batch)
+        elif d['status'] in ('finished', 'error'):
+            self.end(('batch', filename), bytes=d.get('downloaded_bytes'))
+            self.end(('file', filename), status=d['status'], bytes=d.get('total_bytes') or d.get('downloaded_bytes'))
+
+    def on_postprocessor(self, d):
+        self.end('extract')
+        key = ('postprocessor', d.get('postprocessor'))
+        if d['status'] == 'started':
+            self.begin(key, d.get('postprocessor') or 'postprocessor', 'postprocess')
+        elif d['status'] == 'finished':
+            self.end(key)
+
+    def close(self, status):
+        for key in list(self.open):
+            self.end(key, interrupted=True)
+        self.instant(status, 'queue')
+
+    def chrome_events(self, pid):
+        """This item's events as process pid, with names for the process and its tracks."""
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': self.title}}]
+        events += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                   for name, tid in self.TRACKS.items()]
+        return events + [dict(event, pid=pid) for event in self.events]
+
+    @staticmethod
+    def export(timelines):
+        """Chrome trace-event document with one process row per item."""
+        return {'traceEvents': [event for pid, timeline in enumerate(timelines, 1)
+                                for event in timeline.chrome_events(pid)],
+                'displayTimeUnit': 'ms'}
+
+
+class SamplingProfiler:
+    """Samples the stack of every thread from a background thread.
+
+    Reads sys._current_frames() every interval, so the profiled code pays nothing and
+    a whole session (Tk main thread, queue runner, pool threads) can be profiled.
+    Stacks are kept as collapsed lines, 'thread;outer;...;inner count', which
+    flamegraph.pl, speedscope and inferno read as they are.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        labels = {}  # code object -> frame label
+        while not self.stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            if not frames.keys() <= names.keys():
+                # Pool threads differ only by number ('ThreadPoolExecutor-0_3'); merge them
+                names = {thread.ident: re.sub(r'[-_]\d+', '', thread.name) for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if (label := labels.get(code)) is None:
+                        label = labels[code] = (f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                                                f"{code.co_firstlineno})").replace(';', ',')
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, 'thread'))
+                self.counts[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class StageProfiler:
+    """cProfile of selected stages: 'extract', 'options' (building download options) and 'progress'.
+
+    Each call of an enabled stage is profiled on its own thread and merged into that
+    stage's stats. Stages that are not enabled cost a set lookup.
+    """
+
+    STAGES = ('extract', 'options', 'progress')
+
+    def __init__(self):
+        self.enabled = set()
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()  # .active: a stage is being profiled on this thread
+
+    @contextmanager
+    def stage(self, name):
+        if name not in self.enabled or getattr(self.local, 'active', False):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one cProfile at a time; another thread has it
+            yield
+            return
+        self.local.active = True
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.local.active = False
+            with self.lock:
+                if name in self.stats:
+                    self.stats[name].add(profile)
+                else:
+                    self.stats[name] = pstats.Stats(profile)
+
+    def profiled(self, name):
+        """Decorator form of stage()."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+
+PROFILER = StageProfiler()
+
+
+class ProfileSession:
+    """One profiled run: the sampling profiler and/or stage profiles, saved to a new directory.
+
+    close() writes samples.folded (collapsed stacks), and for each stage that ran,
+    <stage>.pstats plus <stage>.txt with the top functions by cumulative time.
+    """
+
+    def __init__(self, root="profiles", label="gui", sample=True, stages=(), interval=0.005):
+        self.directory = Path(root) / f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{os.getpid()}"
+        self.sampler = SamplingProfiler(interval) if sample else None
+        self.stages = set(stages)
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        PROFILER.enabled = set(self.stages)
+        if self.sampler:
+            self.sampler.start()
+        return self
+
+    def close(self):
+        """Stop profiling and write the results; returns the session directory."""
+        if self.sampler:
+            self.sampler.stop()
+        PROFILER.enabled = set()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.sampler:
+            self.sampler.write(self.directory / "samples.folded")
+        with PROFILER.lock:
+            stage_stats, PROFILER.stats = PROFILER.stats, {}
+        for name, stats in stage_stats.items():
+            stats.dump_stats(str(self.directory / f"{name}.pstats"))
+            with open(self.directory / f"{name}.txt", 'w', encoding='utf-8') as f:
+                stats.stream = f
+                stats.sort_stats('cumulative').print_stats(40)
+        logging.getLogger('ytgui.profile').info(
+            f"Profile of {time.perf_counter() - self.started:.1f}s"
+            + (f" ({self.sampler.samples} samples)" if self.sampler else "") + f" written to {self.directory}")
+        return self.directory
+
+
+
+class StartupReport:
+    """How long each startup phase took, against a time-to-interactive budget.
+
+    Phases are timed from the first line of this file. 'interactive' is the first idle
+    moment after the main window is built; the warm-up phases after it run in the
+    background (deferred imports, opening the database).
+    """
+
+    BUDGET = 1.0  # Seconds until the window takes input
+
+    def __init__(self, marks):
+        self.marks = marks
+
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter()))
+
+    def elapsed(self, phase):
+        """Seconds from the start to the end of phase, or None if it hasn't ended."""
+        return next((at - self.marks[0][1] for name, at in self.marks if name == phase), None)
+
+    def lines(self):
+        lines = [f"{'Startup phase':<26}{'took':>9}{'done at':>10}"]
+        previous = start = self.marks[0][1]
+        for phase, at in self.marks[1:]:
+            lines.append(f"  {phase:<24}{(at - previous) * 1000:>7.0f}ms{(at - start) * 1000:>8.0f}ms")
+            previous = at
+        if (interactive := self.elapsed('interactive')) is not None:
+            verdict = "within" if interactive <= self.BUDGET else "OVER"
+            lines.append(f"Time to interactive: {interactive * 1000:.0f}ms ({verdict} the {self.BUDGET * 1000:.0f}ms budget)")
+        return lines
+
+
+STARTUP = StartupReport(STARTUP_MARKS)
+
+class DatabaseManager:
+    """Database manager for download history"""
+
+    # How many recently seen entry IDs to keep per newest-first subscription
+    SEEN_IDS_KEPT = 200
+
+    def __init__(self, db_path='downloads.db'):
+        self.db_path = db_path
+        self._conn = None
+        # The connection is shared by the queue runner and subscription sync threads
+        self.lock = threading.RLock()
+
+    @property
+    def conn(self):
+        """The shared connection, opened (and the tables created) on first use."""
+        if self._conn is None:
+            with self.lock:
+                if self._conn is None:
+                    self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                    self.create_tables()
+        return self._conn
+
+    def create_tables(self):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS downloads (id INTEGER PRIMARY KEY AUTOINCREMENT, video_id TEXT UNIQUE NOT NULL, title TEXT, url TEXT, uploader TEXT, duration INTEGER, format TEXT, resolution TEXT, file_path TEXT, file_size INTEGER, download_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, status TEXT DEFAULT 'completed')''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS failures (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, title TEXT, category TEXT, message TEXT, attempts INTEGER, final INTEGER DEFAULT 0, failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS subscriptions (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE NOT NULL, title TEXT, quality TEXT DEFAULT '1080p', format TEXT DEFAULT 'mp4', newest_first INTEGER DEFAULT 1, last_seen_id TEXT, last_checked TIMESTAMP, enabled INTEGER DEFAULT 1)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS subscription_seen (subscription_id INTEGER NOT NULL, video_id TEXT NOT NULL, seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (subscription_id, video_id))''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS queue_checkpoint (position INTEGER PRIMARY KEY, item TEXT NOT NULL, interrupted INTEGER DEFAULT 0)''')
+            self.conn.commit()
+
+    def add_failure(self, url, title, category, message, attempts, final):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''INSERT INTO failures (url, title, category, message, attempts, final) VALUES (?, ?, ?, ?, ?, ?)''',
+                           (url, title, category, message, attempts, int(final)))
+            self.conn.commit()
+
+    def add_download(self, record):
+        with METRICS.span('db_add_download'), self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''INSERT OR REPLACE INTO downloads (video_id, title, url, uploader, duration, format, resolution, file_path, file_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', (record.id, record.title,
+                record.webpage_url, record.uploader, record.duration, record.format, record.resolution, record.filename, record.filesize))
+            self.conn.commit()
+
+    def add_subscription(self, url, quality, format_choice, newest_first=True):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''INSERT OR IGNORE INTO subscriptions (url, quality, format, newest_first) VALUES (?, ?, ?, ?)''',
+                           (url, quality, format_choice, int(newest_first)))
+            self.conn.commit()
+            cursor.execute('''SELECT id FROM subscriptions WHERE url = ?''', (url,))
+            return cursor.fetchone()[0]
+
+    def remove_subscription(self, subscription_id):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''DELETE FROM subscription_seen WHERE subscription_id = ?''', (subscription_id,))
+            cursor.execute('''DELETE FROM subscriptions WHERE id = ?''', (subscription_id,))
+            self.conn.commit()
+
+    def get_subscriptions(self, enabled_only=False):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''SELECT id, url, title, quality, format, newest_first, last_seen_id, last_checked, enabled FROM subscriptions'''
+                           + (' WHERE enabled = 1' if enabled_only else '') + ' ORDER BY id')
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_seen_ids(self, subscription_id):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''SELECT video_id FROM subscription_seen WHERE subscription_id = ?''', (subscription_id,))
+            return {row[0] for row in cursor.fetchall()}
+
+    def record_subscription_sync(self, subscription_id, title, new_ids, prune=True):
+        """Remember entries seen by a sync (newest first) and stamp the check time."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.executemany('''INSERT OR IGNORE INTO subscription_seen (subscription_id, video_id) VALUES (?, ?)''',
+                               [(subscription_id, video_id) for video_id in reversed(new_ids)])
+            if new_ids:
+                cursor.execute('''UPDATE subscriptions SET last_seen_id = ? WHERE id = ?''', (new_ids[0], subscription_id))
+            cursor.execute('''UPDATE subscriptions SET title = COALESCE(?, title), last_checked = CURRENT_TIMESTAMP WHERE id = ?''',
+                           (title, subscription_id))
+            if prune:
+                # Only the most recent IDs are needed to detect where the new uploads end
+                cursor.execute('''DELETE FROM subscription_seen WHERE subscription_id = ? AND rowid NOT IN
+                                  (SELECT rowid FROM subscription_seen WHERE subscription_id = ? ORDER BY rowid DESC LIMIT ?)''',
+                               (subscription_id, subscription_id, self.SEEN_IDS_KEPT))
+            self.conn.commit()
+
+    def save_queue_checkpoint(self, items, interrupted=False):
+        """Replace the saved queue with items; interrupted marks a run that was stopped mid-way."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''DELETE FROM queue_checkpoint''')
+            cursor.executemany('''INSERT INTO queue_checkpoint (position, item, interrupted) VALUES (?, ?, ?)''',
+                               [(position, json.dumps(item, default=str), int(interrupted))
+                                for position, item in enumerate(items)])
+            self.conn.commit()
+
+    def take_queue_checkpoint(self):
+        """Return (items, interrupted) saved by the last session and clear them."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''SELECT item, interrupted FROM queue_checkpoint ORDER BY position''')
+            rows = cursor.fetchall()
+            cursor.execute('''DELETE FROM queue_checkpoint''')
+            self.conn.commit()
+        return [json.loads(item) for item, _ in rows], any(interrupted for _, interrupted in rows)
+
+    def close(self):
+        # Waits for any write in progress, so no half-finished transaction is left behind
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+
+
+class FormatMenus:
+    """Entries of the quality, audio and format menus for one video's parsed formats.
+
+    Built in the fetch thread, so the Tk thread only assigns menu values; switching
+    quality is a dictionary lookup instead of another pass over the formats.
+    """
+
+    AUDIO_CONVERSIONS = ["best", "mp3", "aac", "opus", "wav", "flac"]
+
+    def __init__(self, formats):
+        self.video_formats = formats.get('video', [])
+        self.audio_formats = formats.get('audio', [])
+        self.container_formats = formats.get('formats', ['mp4'])
+        self.quality_map = {}  # Quality menu entry -> height ('1080') or 'audio'
+        self.format_options = {}  # Quality menu entry -> (format menu values, display string -> format_id)
+
+        listed = [f for f in self.video_formats if 'x' in (f.get('resolution') or '')]
+        heights = {}  # Height -> video formats of that height, in listing order
+        for f in listed:
+            heights.setdefault(f['resolution'].split('x')[1], []).append(f)
+        for f in sorted(listed, key=lambda f: (int(f['resolution'].split('x')[1]), int(f.get('fps', 0) or 0)),
+                        reverse=True):
+            height = f['resolution'].split('x')[1]
+            display_key = f"{height}p"
+            if (fps := f.get('fps')) and fps > 30:
+                display_key += str(fps)
+            if (note := f.get('format_note')) and "hdr" in note.lower():
+                display_key += " (HDR)"
+            if display_key not in self.quality_map:
+                self.quality_map[display_key] = height
+                self.format_options[display_key] = self._video_options(heights[height])
+        self.quality_map["Audio Only"] = "audio"
+        self.format_options["Audio Only"] = self._audio_conversion_options()
+        self.default_quality = next((q for q in ["1080p", "720p"] if q in self.quality_map), next(iter(self.quality_map)))
+
+        # Audio track menu: the highest bitrate stream of each codec
+        self.audio_options = ["best"]
+        self.audio_id_map = {}  # Audio menu codec -> format_id
+        for audio in sorted(self.audio_formats, key=lambda a: a.get('abr') or 0, reverse=True):
+            codec = audio.get('acodec', 'unknown')
+            if codec not in self.audio_id_map:
+                self.audio_options.append(codec)
+                self.audio_id_map[codec] = audio.get('format_id')
+
+    def _video_options(self, formats):
+        values, id_map = [], {}
+        seen_codecs = set()
+        for fmt in formats:
+            codec = fmt.get('vcodec', 'unknown')
+            if codec in seen_codecs:
+                continue
+            seen_codecs.add(codec)
+            fps = fmt.get('fps', 0)
+            filesize = fmt.get('filesize', 0)
+            size_str = f"{filesize / (1024*1024):.1f}MB" if filesize else "unknown size"
+            display = f"{codec} @ {int(fps)}fps ({size_str})" if fps and fps > 30 else f"{codec} ({size_str})"
+            values.append(display)
+            id_map[display] = fmt.get('format_id')
+        return values, id_map
+
+    def _audio_conversion_options(self):
+        values, id_map = list(self.AUDIO_CONVERSIONS), {}
+        seen_codecs = set()
+        for audio in sorted(self.audio_formats, key=lambda a: a.get('abr') or 0, reverse=True):
+            codec = audio.get('acodec', 'unknown')
+            if codec in seen_codecs or codec in self.AUDIO_CONVERSIONS:
+                continue
+            abr = audio.get('abr', 0)
+            display = f"{codec} ({abr}kbps)" if abr else codec
+            values.append(display)
+            seen_codecs.add(codec)
+            id_map[display] = audio.get('format_id')
+        return values, id_map
+
+    def options_for(self, quality):
+        """(format menu values, display string -> format_id, default value) for a quality entry."""
+        if quality in self.format_options:
+            values, id_map = self.format_options[quality]
+        else:
+            values, id_map = [], {}
+        if quality == "Audio Only":
+            return values, id_map, "best"
+        if not values:
+            # No exact formats at this quality: offer the containers instead
+            values = self.container_formats or ['mp4', 'mkv', 'webm']
+        return values, id_map, values[0]
+
+
+class SizeEstimator:
+    """Projects download sizes for queue items from parsed formats or typical bitrates"""
+
+    # Rough average bitrates (kbps) for YouTube streams, used when a format has no size info
+    TYPICAL_VIDEO_KBPS = {
+        "4320": 40000, "2160": 18000, "1440": 9000, "1080": 4500,
+        "720": 2500, "480": 1200, "360": 700, "240": 400, "144": 200,
+    }
+    TYPICAL_AUDIO_KBPS = 130
+
+    @staticmethod
+    def format_bytes(fmt, duration):
+        """Size of one parsed format: exact/approx filesize, else bitrate x duration."""
+        if not fmt:
+            return None
+        if fmt.get('filesize'):
+            return int(fmt['filesize'])
+        if fmt.get('tbr') and duration:
+            return int(fmt['tbr'] * 1000 / 8 * duration)
+        return None
+
+    @classmethod
+    def from_bitrate(cls, height, duration):
+        """Estimate from the typical bitrate of a quality level (for flat playlist entries)."""
+        if not duration:
+            return None
+        kbps = cls.TYPICAL_AUDIO_KBPS
+        if height and height != "audio":
+            # Pick the closest known quality at or below the requested height
+            known = sorted((int(h) for h in cls.TYPICAL_VIDEO_KBPS), reverse=True)
+            match = next((h for h in known if h <= int(height)), known[-1])
+            kbps += cls.TYPICAL_VIDEO_KBPS[str(match)]
+        return int(kbps * 1000 / 8 * duration)
+
+    @classmethod
+    def estimate(cls, height, duration, video_format=None, audio_format=None):
+        """Best available size estimate in bytes, or None when nothing is known."""
+        if height == "audio":
+            return cls.format_bytes(audio_format, duration) or cls.from_bitrate("audio", duration)
+        video_bytes = cls.format_bytes(video_format, duration)
+        if video_bytes is None:
+            return cls.from_bitrate(height, duration)
+        audio_bytes = cls.format_bytes(audio_format, duration)
+        if audio_bytes is None:
+            audio_bytes = int(cls.TYPICAL_AUDIO_KBPS * 1000 / 8 * (duration or 0))
+        return video_bytes + audio_bytes
+
+
+class ThroughputMeter:
+    """Rolling average of transfer speed over the last few seconds"""
+
+    def __init__(self, window=20.0):
+        self.window = window
+        self.samples = deque()
+        self.lock = threading.Lock()
+
+    def add(self, nbytes, now=None):
+        now = now or time.monotonic()
+        with self.lock:
+            self.samples.append((now, nbytes))
+            self._trim(now)
+
+    def rate(self, now=None):
+        """Bytes per second over the window, or 0 if there is no recent data."""
+        now = now or time.monotonic()
+        with self.lock:
+            self._trim(now)
+            if not self.samples:
+                return 0.0
+            span = max(now - self.samples[0][0], 1.0)
+            return sum(n for _, n in self.samples) / span
+
+    def _trim(self, now):
+        while self.samples and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+
+class RetryPolicy:
+    """Classifies download failures and schedules re-queue attempts with backoff"""
+
+    # Category of an HTTP status, read from the error chain or the message before any phrase is matched
+    STATUS_CATEGORIES = {429: "rate_limited", 403: "expired", 410: "expired", 401: "private", 404: "not_found",
+                         408: "transient", 500: "transient", 502: "transient", 503: "transient", 504: "transient"}
+    # (category, substrings of the yt-dlp error message), checked in order
+    ERROR_PATTERNS = [
+        ("rate_limited", ["too many requests", "rate-limit", "rate limit",
+                          "confirm you're not a bot", "confirm you\u2019re not a bot"]),
+        ("geo_blocked", ["available in your country", "geo restrict", "geo-restrict",
+                         "blocked it in your country", "not available from your location"]),
+        ("private", ["private video", "members-only", "join this channel", "sign in to confirm your age",
+                     "video unavailable", "has been removed", "account associated with this video has been terminated"]),
+        ("expired", ["url has expired", "urls have expired"]),
+        ("transient", ["timed out", "timeout", "connection reset", "connection aborted", "connection refused",
+                       "temporary failure in name resolution", "getaddrinfo failed", "network is unreachable",
+                       "remote end closed", "incompleteread"]),
+    ]
+    RETRYABLE = {"rate_limited", "transient", "expired"}
+
+    def __init__(self, max_attempts=3, base_delay=10, max_delay=900):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def classify(cls, message, error=None):
+        """Category of a failure; error is the exception, when there is one, for its HTTP status."""
+        text = (message or "").lower()
+        status = cls.http_status(error)
+        if status is None and (match := re.search(r'http error (\d{3})', text)):
+            status = int(match.group(1))
+        if status in cls.STATUS_CATEGORIES:
+            return cls.STATUS_CATEGORIES[status]
+        for category, patterns in cls.ERROR_PATTERNS:
+            if any(pattern in text for pattern in patterns):
+                return category
+        return "unknown"
+
+    @staticmethod
+    def http_status(error):
+        """HTTP status behind a yt-dlp error, following DownloadError.exc_info and error causes."""
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            status = getattr(error, 'status', None)
+            if isinstance(status, int) and 100 <= status < 600:
+                return status
+            exc_info = getattr(error, 'exc_info', None)
+            error = (exc_info[1] if exc_info else None) or getattr(error, 'cause', None) or error.__cause__
+        return None
+
+    def should_retry(self, category, attempts):
+        return category in self.RETRYABLE and attempts <= self.max_attempts
+
+    def delay(self, category, attempts):
+        """Exponential backoff with jitter; expired URLs only need a fresh extraction."""
+        if category == "expired":
+            return random.uniform(1, 5)
+        base = self.base_delay * (6 if category == "rate_limited" else 1)
+        delay = min(self.max_delay, base * 2 ** (attempts - 1))
+        # "Equal jitter": keep half the delay, randomise the rest so retries don't bunch up
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class Sections:
+    """Time ranges of a video to download instead of the whole thing"""
+
+    @staticmethod
+    def parse_time(text):
+        """'1:02:03.5', '2:45' or '90' -> seconds; '' -> None."""
+        text = text.strip()
+        if not text:
+            return None
+        seconds = 0.0
+        for part in text.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+
+    @classmethod
+    def parse(cls, text):
+        """'1:30-2:45, 1:02:00-' -> [[90.0, 165.0], [3720.0, None]]; an open end runs to the end."""
+        ranges = []
+        for chunk in filter(None, (chunk.strip() for chunk in text.split(','))):
+            start_text, separator, end_text = chunk.partition('-')
+            if not separator:
+                raise ValueError(f"'{chunk}' is not a range like 1:30-2:45")
+            try:
+                start, end = cls.parse_time(start_text) or 0.0, cls.parse_time(end_text)
+            except ValueError:
+                raise ValueError(f"'{chunk}' has an invalid time") from None
+            if end is not None and end <= start:
+                raise ValueError(f"'{chunk}' ends before it starts")
+            ranges.append([start, end])
+        return ranges
+
+    @staticmethod
+    def format_time(seconds):
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+    @classmethod
+    def format(cls, ranges):
+        return ", ".join(f"{cls.format_time(start)}-{cls.format_time(end) if end is not None else ''}"
+                         for start, end in ranges)
+
+    @staticmethod
+    def total(ranges, duration):
+        """Seconds covered by ranges, open ends running to duration."""
+        return sum(max((end if end is not None else duration or start) - start, 0) for start, end in ranges)
+
+
+class QueueScheduler:
+    """Decides which pending queue item is downloaded next"""
+
+    POLICIES = ["FIFO", "Shortest first", "Priority", "Round-robin"]
+
+    def __init__(self, policy="FIFO"):
+        self.policy = policy if policy in self.POLICIES else "FIFO"
+        self.served = {}  # group -> items started this run (round-robin fairness)
+
+    def order(self, pending):
+        """Return pending items in the order they should be tried (sorts are stable, so ties stay FIFO)."""
+        if self.policy == "Shortest first":
+            # Unknown sizes go last so the known-small clips finish first
+            return sorted(pending, key=lambda item: (not item.get('estimated_bytes'), item.get('estimated_bytes') or 0))
+        if self.policy == "Priority":
+            return sorted(pending, key=lambda item: -item.get('priority', 0))
+        if self.policy == "Round-robin":
+            return sorted(pending, key=lambda item: self.served.get(item.get('group'), 0))
+        return list(pending)
+
+    def mark_started(self, item):
+        group = item.get('group')
+        self.served[group] = self.served.get(group, 0) + 1
+
+
+class ShutdownRequested(Exception):
+    """Raised from the progress hook to stop a download because the app is closing"""
+
+
+class DiskSpaceLowError(Exception):
+    """Raised from the progress hook to stop a download before the disk fills up."""
+
+
+class DiskSpaceGuard:
+    """Admission control that keeps queued downloads from filling the target disk"""
+
+    def __init__(self, path, reserve_bytes=0, check_interval=15):
+        self.path = Path(path)
+        self.reserve_bytes = reserve_bytes
+        self.check_interval = check_interval
+        self.last_check = 0.0
+        self.low_space = False
+
+    def free_bytes(self):
+        # The save path may not exist yet; measure the filesystem it will be created on
+        path = self.path
+        while not path.exists() and path.parent != path:
+            path = path.parent
+        return shutil.disk_usage(path).free
+
+    def fits(self, required_bytes):
+        return self.free_bytes() - self.reserve_bytes >= (required_bytes or 0)
+
+    def periodic_check(self):
+        """Re-check free space at most once per interval; returns False once below the reserve."""
+        now = time.monotonic()
+        if now - self.last_check >= self.check_interval:
+            self.last_check = now
+            self.low_space = self.free_bytes() < self.reserve_bytes
+        return not self.low_space
+
+    @staticmethod
+    def required_bytes(estimated_bytes, merges=False, rewrites=False, keep_video=False):
+        """Peak disk usage of one item, including post-processing temporary copies.
+
+        Merging writes the output next to the separate streams, and every later rewrite
+        (remux, audio extraction, embedding, SponsorBlock cuts) writes a full temporary copy.
+        """
+        if not estimated_bytes:
+            return 0
+        persistent = estimated_bytes * (2 if merges and keep_video else 1)
+        peak = estimated_bytes * 2 if merges else estimated_bytes
+        if rewrites:
+            peak = max(peak, persistent + estimated_bytes)
+        return int(peak)
+
+
+class ChildProcessReaper:
+    """Stops child processes (ffmpeg, pip) so none outlive the app"""
+
+    @staticmethod
+    def child_pids(pid=None):
+        pid = pid or os.getpid()
+        try:
+            if os.path.isdir('/proc/self'):
+                children = []
+                for entry in os.listdir('/proc'):
+                    if entry.isdigit():
+                        try:
+                            with open(f'/proc/{entry}/stat', 'r') as f:
+                                # The command name may contain spaces; state and parent PID follow it
+                                state, parent = f.read().rsplit(')', 1)[1].split()[:2]
+                            if int(parent) == pid and state != 'Z':  # Exited children are not running
+                                children.append(int(entry))
+                        except (OSError, IndexError, ValueError):
+                            continue
+                return children
+            if os.name == 'nt':
+                output = subprocess.run(
+                    ['powershell', '-NoProfile', '-Command',
+                     f"Get-CimInstance Win32_Process -Filter 'ParentProcessId={pid}' | ForEach-Object {{ $_.ProcessId }}"],
+                    capture_output=True, text=True, timeout=15, creationflags=subprocess.CREATE_NO_WINDOW).stdout
+            else:
+                output = subprocess.run(['pgrep', '-P', str(pid)], capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            return []
+        return [int(line) for line in output.split() if line.isdigit()]
+
+    @classmethod
+    def terminate_children(cls, timeout=5, pid=None):
+        """Ask every child of pid (default: this process) to exit, then kill those still running."""
+        parent = pid
+        pids = cls.child_pids(parent)
+        for pid in pids:
+            try:
+                if os.name == 'nt':
+                    subprocess.run(['taskkill', '/PID', str(pid), '/T', '/F'], capture_output=True,
+                                   creationflags=subprocess.CREATE_NO_WINDOW)
+                else:
+                    os.kill(pid, signal.SIGTERM)
+            except (OSError, subprocess.SubprocessError):
+                pass
+        if os.name == 'nt':
+            return pids
+        deadline = time.monotonic() + timeout
+        while pids and time.monotonic() < deadline:
+            pids = [pid for pid in pids if pid in cls.child_pids(parent)]
+            time.sleep(0.1)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+        return pids
+
+
+class LiveCapture:
+    """Records one live stream, or a premiere once it starts, outside the download queue.
+
+    ffmpeg copies the stream into fixed-length segment files, so memory stays flat
+    and old segments can be deleted to bound disk use. When ffmpeg stops (the signed
+    stream URL expired, or a network hiccup) the stream is resolved again and recording
+    continues in new segments until the stream ends or the capture is stopped.
+    """
+
+    LIVE_STATUSES = ('is_live', 'is_upcoming')
+    STABLE_RUN_SECONDS = 60  # An ffmpeg run this long resets the reconnect backoff
+
+    def __init__(self, url, title, save_dir, segment_minutes=60, keep_segments=0, from_start=False,
+                 poll_interval=60, ydl_options=None, disk_guard=None, log=None):
+        self.url = url
+        self.title = title or url
+        self.save_dir = Path(save_dir)
+        self.segment_seconds = max(60, int(segment_minutes * 60))
+        self.keep_segments = keep_segments
+        self.from_start = from_start
+        self.poll_interval = max(5, poll_interval)
+        self.ydl_options = ydl_options or {}
+        self.disk_guard = disk_guard
+        self.log = log or logging.getLogger('ytgui.live').info
+        self.stop_event = threading.Event()
+        self.process = None
+        self.status = "Waiting for a free live slot"
+        self.finished = False
+        self.segments_written = 0
+        self.bytes_written = 0
+        # Segment files start with this prefix; the timestamp part is filled in by ffmpeg
+        self.prefix = self._file_prefix(self.title)
+
+    @staticmethod
+    def _file_prefix(title):
+        return re.sub(r'[\\/:*?"<>|]+', '_', title)[:80].strip() or "live"
+
+    def stop(self):
+        self.stop_event.set()
+        if self.process and self.process.poll() is None:
+            self.process.terminate()  # ffmpeg closes the current segment cleanly on SIGTERM
+
+    def run(self):
+        """Blocking; runs in a live slot of the orchestrator."""
+        self.save_dir.mkdir(parents=True, exist_ok=True)
+        failures = 0  # ffmpeg runs in a row that ended early
+        try:
+            while not self.stop_event.is_set():
+                info = self._wait_until_live()
+                if info is None:
+                    break
+                if self.from_start:
+                    self._capture_from_start()
+                    break
+                started = time.monotonic()
+                self._capture_segments(info)
+                if self.stop_event.is_set():
+                    break
+                # A manifest refused outright (403) would otherwise be re-resolved in a tight loop
+                failures = failures + 1 if time.monotonic() - started < self.STABLE_RUN_SECONDS else 0
+                if failures:
+                    delay = min(self.poll_interval, 5 * 2 ** (failures - 1))
+                    self.status = f"Reconnecting in {delay}s"
+                    self.stop_event.wait(delay)
+            if not self.status.startswith("Stopped"):
+                self.status = "Stopped" if self.stop_event.is_set() else "Finished: stream ended"
+        except Exception as e:
+            self.status = f"Failed: {e}"
+            logging.getLogger('ytgui.live').error(f"Live capture of {self.title} failed: {e}")
+        finally:
+            self.finished = True
+
+    def _resolve(self):
+        options = dict(self.ydl_options, quiet=True, no_warnings=True, ignore_no_formats_error=True,
+                       logger=YtDlpLogger(), format='best')  # One muxed stream, so ffmpeg needs a single input
+        with yt_dlp.YoutubeDL(options) as ydl:
+            return ydl.extract_info(self.url, download=False)
+
+    def _wait_until_live(self):
+        """Resolve the stream, waiting for scheduled starts; None once it is not live anymore."""
+        while not self.stop_event.is_set():
+            info = self._resolve()
+            if self.title == self.url and info.get('title'):
+                # Started from a bare URL: name the files after the stream once it is known
+                self.title = info['title']
+                self.prefix = self._file_prefix(self.title)
+            live_status = info.get('live_status')
+            if live_status == 'is_live' and info.get('url'):
+                return info
+            if live_status != 'is_upcoming' and live_status != 'is_live':
+                return None
+            wait = self.poll_interval
+            if release := info.get('release_timestamp'):
+                remaining = release - time.time()
+                self.status = f"Waiting for start ({max(remaining, 0) / 60:.0f} min)"
+                if remaining > 0:
+                    wait = min(max(remaining, 5), self.poll_interval)
+            else:
+                self.status = "Waiting for start"
+            self.stop_event.wait(wait)
+        return None
+
+    def _segment_files(self):
+        return sorted(self.save_dir.glob(f"{glob.escape(self.prefix)} *.mkv"), key=lambda f: f.stat().st_mtime)
+
+    def _capture_segments(self, info):
+        pattern = self.save_dir / f"{self.prefix} %Y-%m-%d_%H-%M-%S.mkv"
+        command = [shutil.which('ffmpeg') or 'ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin']
+        if headers := info.get('http_headers'):
+            command += ['-headers', ''.join(f"{key}: {value}\r\n" for key, value in headers.items())]
+        # Matroska segments stay playable even if the app dies mid-segment
+        command += ['-i', info['url'], '-map', '0', '-c', 'copy', '-f', 'segment',
+                    '-segment_time', str(self.segment_seconds), '-segment_format', 'matroska',
+                    '-reset_timestamps', '1', '-strftime', '1', str(pattern)]
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.PIPE)
+        # Drained while ffmpeg runs: hours of segment errors would fill the pipe and stall it
+        errors = deque(maxlen=20)
+        drain = threading.Thread(target=self._drain_stderr, args=(self.process.stderr, errors), daemon=True)
+        drain.start()
+        self.status = "Recording"
+        while self.process.poll() is None:
+            if self.stop_event.wait(5):
+                break
+            self._rotate()
+            if self.disk_guard and not self.disk_guard.periodic_check():
+                self.status = "Stopped: low disk space"
+                self.stop()
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        drain.join(timeout=5)
+        if self.process.returncode not in (0, 255, -signal.SIGTERM) and not self.stop_event.is_set():
+            self.log(f"Live capture of {self.title}: ffmpeg exited ({errors[-1] if errors else self.process.returncode}), reconnecting")
+        self.process.stderr.close()
+        self._rotate()
+
+    @staticmethod
+    def _drain_stderr(stream, errors):
+        """Keep the last lines ffmpeg writes to stderr for the reconnect message."""
+        for line in iter(stream.readline, b''):
+            if line := line.decode(errors='replace').strip():
+                errors.append(line)
+
+    def _rotate(self):
+        """Update totals and delete the oldest finished segments beyond keep_segments."""
+        segments = self._segment_files()
+        if self.keep_segments and len(segments) > self.keep_segments:
+            # The newest segment is the one being written and is never deleted
+            for old in segments[:len(segments) - self.keep_segments]:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+            segments = segments[len(segments) - self.keep_segments:]
+        self.segments_written = len(segments)
+        self.bytes_written = sum(f.stat().st_size for f in segments if f.exists())
+
+    def _capture_from_start(self):
+        """Record from the beginning of the stream with yt-dlp (one file, no rotation)."""
+        def progress(d):
+            if self.stop_event.is_set():
+                raise ShutdownRequested("Live capture stopped")
+            self.bytes_written = d.get('downloaded_bytes') or self.bytes_written
+        options = dict(self.ydl_options, quiet=True, no_warnings=True, live_from_start=True, logger=YtDlpLogger(),
+                       format='bestvideo+bestaudio/best', progress_hooks=[progress],
+                       outtmpl=str(self.save_dir / f"{self.prefix} (from start) %(epoch)s.%(ext)s"))
+        self.status = "Recording from start"
+        try:
+            with yt_dlp.YoutubeDL(options) as ydl:
+                ydl.download([self.url])
+        except (yt_dlp.utils.DownloadError, ShutdownRequested):
+            if not self.stop_event.is_set():
+                raise
+        self.segments_written = 1
+
+
+class WorkerProcessError(Exception):
+    """A job failed inside, or took down, a worker process"""
+
+
+class WorkerRecorder:
+    """Stands in for DatabaseManager in a worker process; the app process writes the rows"""
+
+    def __init__(self, send):
+        self.send = send
+
+    def add_download(self, record):
+        self.send('record', record)
+
+
+# Progress fields forwarded from worker processes; the rest (info_dict etc.) is large or unpicklable
+PROGRESS_FIELDS = ('status', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate', 'speed', 'eta',
+                   'elapsed', 'filename', 'tmpfilename', 'fragment_index', 'fragment_count', 'postprocessor')
+
+
+class WorkerLogHandler(logging.Handler):
+    """Forwards a worker process's log records to the app process, which logs them again."""
+
+    def __init__(self, send):
+        super().__init__()
+        self.send = send
+
+    def emit(self, record):
+        try:
+            self.send('log', (record.name, record.levelno, record.getMessage()))
+        except Exception:
+            self.handleError(record)
+
+
+def _process_worker_main(conn, log_level=logging.INFO):
+    """Entry point of a worker process: runs yt-dlp jobs from the pipe and streams events back."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The app process decides when workers stop
+    def send(kind, payload):
+        conn.send((kind, payload))
+    def forward(kind):
+        return lambda d: send(kind, {key: d[key] for key in PROGRESS_FIELDS if key in d})
+    root_logger = logging.getLogger('ytgui')
+    root_logger.propagate = False
+    root_logger.setLevel(log_level)  # Filter here so unwanted debug output never crosses the pipe
+    root_logger.addHandler(WorkerLogHandler(send))
+    downloader = YouTubeDownloader(config={}, db=WorkerRecorder(send),
+                                   progress_callback=forward('progress'), postprocessor_callback=forward('postprocessor'))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            if job[0] == 'download':
+                url, options = job[1], job[2]
+                options.update(progress_hooks=[downloader.progress_hook], postprocessor_hooks=[downloader.postprocessor_hook])
+                result = downloader._download(url, options)
+            elif job[0] == 'video_info':
+                result = downloader._extract_video_info(job[1], YouTubeDownloader.canonical_id(job[1]))
+            else:
+                raise ValueError(f"Unknown job {job[0]!r}")
+            send('result', result)
+        except Exception as e:
+            send('error', str(e))
+
+
+class ProcessWorker:
+    """One worker process and the app end of its pipe"""
+
+    def __init__(self, context):
+        self.context = context
+        self.start()
+
+    def start(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_process_worker_main,
+                                            args=(child_conn, logging.getLogger('ytgui').getEffectiveLevel()),
+                                            name="yt-dlp-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        """Stop the worker; it is started again when it gets its next job."""
+        if self.process.is_alive():
+            # Children first (ffmpeg), so they do not outlive the worker
+            ChildProcessReaper.terminate_children(timeout=2, pid=self.process.pid)
+            self.process.kill()
+            self.process.join(5)
+        self.conn.close()
+
+
+class ProcessPool:
+    """Runs downloads and metadata lookups in worker processes.
+
+    Extractor parsing then no longer competes with Tk for the GIL, and a hung or
+    crashed job only costs its worker: a watchdog restarts workers that send no
+    events for too long.
+    """
+
+    def __init__(self, size=2, stall_timeout=600, extract_timeout=120):
+        # Forking a process that runs Tk and threads is unsafe; spawn starts clean interpreters
+        self.context = multiprocessing.get_context('spawn')
+        self.size = max(1, size)
+        self.stall_timeout = stall_timeout
+        self.extract_timeout = extract_timeout
+        self.idle = queue.Queue()
+        self.workers = []
+        self.lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.workers) < self.size:
+                worker = ProcessWorker(self.context)
+                self.workers.append(worker)
+                return worker
+        return self.idle.get()
+
+    def run(self, job, on_event=None, timeout=None):
+        """Run job on a free worker, passing its events to on_event; returns the job's result."""
+        worker = self._acquire()
+        try:
+            return self._run_on(worker, job, on_event, timeout or self.stall_timeout)
+        finally:
+            self.idle.put(worker)
+
+    def _run_on(self, worker, job, on_event, timeout):
+        if not worker.process.is_alive():
+            worker.start()  # Restart a worker that was killed or crashed on an earlier job
+        worker.conn.send(job)
+        last_event = time.monotonic()
+        while True:
+            if not worker.conn.poll(1.0):
+                if not worker.process.is_alive():
+                    worker.kill()
+                    raise WorkerProcessError(f"Worker process exited unexpectedly (code {worker.process.exitcode})")
+                if time.monotonic() - last_event > timeout:
+                    worker.kill()
+                    raise WorkerProcessError(f"Worker stalled for {timeout}s and was restarted")
+                continue
+            try:
+                kind, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.kill()
+                raise WorkerProcessError("Worker process exited unexpectedly")
+            last_event = time.monotonic()
+            if kind == 'result':
+                return payload
+            if kind == 'error':
+                raise WorkerProcessError(payload)
+            if on_event:
+                try:
+                    on_event(kind, payload)
+                except BaseException:
+                    # A hook asked to stop the job (closing, low disk space): stop the worker mid-job
+                    worker.kill()
+                    raise
+
+    def shutdown(self):
+        with self.lock:
+            for worker in self.workers:
+                worker.kill()
+            self.workers = []
+
+
+class VideoInfo:
+    """The parts of a video's metadata the app uses, built once per extraction.
+
+    yt-dlp's info dict carries every format with its URLs, headers and fragments;
+    this keeps the parsed formats and what the info panel shows, so the metadata
+    cache and thousands of queue lookups stay small. A plain __slots__ class
+    rather than a dataclass: slots=True needs Python 3.10.
+    """
+
+    __slots__ = ('title', 'duration', 'uploader', 'thumbnail', 'formats', 'subtitles', 'views', 'likes',
+                 'upload_date', 'description', 'tags', 'tag_count', 'chapters', 'live_status', 'release_timestamp')
+    DESCRIPTION_CHARS = 500  # The info panel shows this much of the description
+    TAGS_KEPT = 5
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_info(cls, info, formats):
+        """From a yt-dlp info dict; formats is its parsed format list (YouTubeDownloader._parse_formats)."""
+        description = info.get('description') or ""
+        if len(description) > cls.DESCRIPTION_CHARS:
+            description = description[:cls.DESCRIPTION_CHARS] + "..."
+        tags = info.get('tags') or []
+        return cls(title=info.get('title'), duration=info.get('duration'), uploader=info.get('uploader'),
+                   thumbnail=info.get('thumbnail'), formats=formats, subtitles=list(info.get('subtitles') or {}),
+                   views=info.get('view_count'), likes=info.get('like_count'), upload_date=info.get('upload_date'),
+                   description=description, tags=tags[:cls.TAGS_KEPT], tag_count=len(tags),
+                   chapters=[{'title': chapter.get('title'), 'start_time': chapter.get('start_time'),
+                              'end_time': chapter.get('end_time')} for chapter in info.get('chapters') or []],
+                   live_status=info.get('live_status'), release_timestamp=info.get('release_timestamp'))
+
+
+class DownloadRecord:
+    """What is kept of a finished download: the fields of its history row.
+
+    Returned in place of yt-dlp's sanitized info dict, which also crosses the pipe
+    from worker processes.
+    """
+
+    __slots__ = ('id', 'title', 'webpage_url', 'uploader', 'duration', 'format', 'resolution', 'filename', 'filesize')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_info(cls, info):
+        requested = info.get('requested_downloads') or [{}]
+        return cls(id=info.get('id'), title=info.get('title'), webpage_url=info.get('webpage_url'),
+                   uploader=info.get('uploader'), duration=info.get('duration'), format=info.get('format'),
+                   resolution=info.get('resolution'), filename=info.get('_filename') or requested[0].get('_filename'),
+                   filesize=info.get('filesize') or info.get('filesize_approx'))
+
+class MetadataCache:
+    """Thread-safe LRU cache of parsed video info, keyed by canonical video ID"""
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            info = self.entries.get(key)
+            if info is not None:
+                self.entries.move_to_end(key)
+            return info
+
+    def put(self, key, info):
+        with self.lock:
+            self.entries[key] = info
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one in-flight call"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def run(self, key, func):
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.in_flight[key] = Future()
+        if not leader:
+            return future.result()  # Re-raises the leader's exception
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+
+class TaskGroup:
+    """Background tasks that are waited for, or cancelled, together.
+
+    Leaving the with-block waits for every task; an exception inside it cancels the
+    ones that have not finished.
+    """
+
+    def __init__(self, orchestrator, limit=None):
+        self.orchestrator = orchestrator
+        self.semaphore = orchestrator.create_semaphore(limit) if limit else None
+        self.futures = []
+
+    def spawn(self, resource, func, *args):
+        future = self.orchestrator.submit(
+            self.orchestrator.run_blocking(resource, func, *args, group_semaphore=self.semaphore))
+        self.futures.append(future)
+        return future
+
+    def as_completed(self):
+        return as_completed(self.futures)
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.cancel()
+        wait(self.futures)
+        return False
+
+
+class Orchestrator:
+    """Single home for background work: an asyncio loop on its own thread.
+
+    Blocking calls (yt-dlp, HTTP, pip) run in the loop's thread pool, bounded per
+    resource class by semaphores. Results reach Tk only through call_ui, which queues
+    callbacks for the Tk thread to run.
+    """
+
+    # Concurrent operations allowed per resource class
+    DEFAULT_LIMITS = {"extract": 8, "download": 1, "postprocess": 1, "thumbnail": 2}
+    logger = logging.getLogger('ytgui.orchestrator')
+
+    def __init__(self, ui, limits=None, max_threads=32):
+        self.ui = ui
+        self.ui_calls = queue.SimpleQueue()
+        self.accepting = True
+        self.tasks = set()
+        self.running = 0  # Blocking calls currently in the thread pool
+        self.running_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="worker")
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        self.thread = threading.Thread(target=self._run_loop, name="orchestrator", daemon=True)
+        self.thread.start()
+        self.semaphores = {name: self.create_semaphore(limit)
+                           for name, limit in dict(self.DEFAULT_LIMITS, **(limits or {})).items()}
+        self._pump_ui()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def create_semaphore(self, limit):
+        async def make():
+            return asyncio.Semaphore(max(1, int(limit)))
+        # Created on the loop thread so it binds to this loop on every Python version
+        return asyncio.run_coroutine_threadsafe(make(), self.loop).result()
+
+    def submit(self, coro):
+        """Schedule a coroutine from any thread; returns a concurrent.futures.Future."""
+        if not self.accepting:
+            coro.close()
+            raise RuntimeError("Shutting down, not accepting new work")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.tasks.add(future)
+        future.add_done_callback(self.tasks.discard)
+        return future
+
+    async def run_blocking(self, resource, func, *args, group_semaphore=None):
+        """Run a blocking call in the thread pool once a slot of its resource class is free."""
+        semaphores = [sem for sem in (group_semaphore, self.semaphores.get(resource)) if sem]
+        for sem in semaphores:
+            await sem.acquire()
+        try:
+            return await self.loop.run_in_executor(None, self._call, func, args)
+        finally:
+            for sem in semaphores:
+                sem.release()
+
+    def _call(self, func, args):
+        # Counted in the pool thread: a cancelled task's call keeps running until it returns
+        with self.running_lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self.running_lock:
+                self.running -= 1
+
+    def spawn(self, resource, func, *args, on_done=None, on_error=None):
+        """Fire-and-forget blocking job; on_done/on_error run on the Tk thread."""
+        future = self.submit(self.run_blocking(resource, func, *args))
+        def finished(future):
+            if future.cancelled():
+                return
+            if (error := future.exception()) is not None:
+                if on_error:
+                    self.call_ui(on_error, error)
+                else:
+                    self.logger.error(f"Background task {getattr(func, '__name__', func)} failed: {error!r}")
+            elif on_done:
+                self.call_ui(on_done, future.result())
+        future.add_done_callback(finished)
+        return future
+
+    def group(self, limit=None):
+        return TaskGroup(self, limit)
+
+    @contextmanager
+    def slot(self, resource):
+        """Hold a slot of a resource class from a worker thread (never from the loop thread)."""
+        semaphore = self.semaphores[resource]
+        asyncio.run_coroutine_threadsafe(semaphore.acquire(), self.loop).result()
+        try:
+            yield
+        finally:
+            self.loop.call_soon_threadsafe(semaphore.release)
+
+    def call_ui(self, func, *args):
+        """Thread-safe: run func(*args) on the Tk thread."""
+        self.ui_calls.put((func, args))
+
+    def _pump_ui(self):
+        # Scheduled first: a callback that waits in a nested event loop (a dialog) must not stop the pump
+        self.ui.after(20, self._pump_ui)
+        deadline = time.monotonic() + 0.05  # Keep the UI responsive under bursts of callbacks
+        while time.monotonic() < deadline:
+            try:
+                func, args = self.ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                with METRICS.span('ui_callback'):
+                    func(*args)
+            except Exception as e:
+                self.logger.exception(f"UI callback {getattr(func, '__name__', func)} failed: {e!r}")
+
+    def stop_accepting(self):
+        """Refuse new work and cancel what is still waiting for a slot; running calls carry on."""
+        self.accepting = False
+        for future in list(self.tasks):
+            future.cancel()
+
+    def shutdown(self):
+        """Stop accepting work, cancel what is still waiting for a slot and stop the loop."""
+        self.stop_accepting()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False)
+
+
+class EntryEnricher:
+    """Fully extracts flat playlist entries in the background, a few at a time.
+
+    Queued items are looked up before the rows a selector has on screen, each in the
+    order requested. Lookups are spaced by a minimum interval so enriching a long
+    playlist does not trip rate limits; results go to the metadata cache.
+    """
+
+    def __init__(self, extract, cache, key_func, dispatch, start_worker, workers=2, interval=1.0):
+        self.extract = extract  # url -> parsed info
+        self.cache = cache
+        self.key_func = key_func
+        self.dispatch = dispatch  # Runs callbacks on the UI thread
+        self.start_worker = start_worker  # Runs a worker loop in the background, returns a future
+        self.workers = max(1, workers)
+        self.interval = max(0.0, interval)
+        self.queued = deque()
+        self.visible = deque()
+        self.condition = threading.Condition()
+        self.next_slot = 0.0
+        self.running = []  # Futures of the worker loops
+        self.stopped = False
+
+    def request(self, url, callback, queued=False, cancel_event=None):
+        """Look up url and call callback(info) on the UI thread; cached results are immediate."""
+        info = self.cache.get(self.key_func(url))
+        if info is not None:
+            callback(info)
+            return
+        with self.condition:
+            if self.stopped:
+                return
+            (self.queued if queued else self.visible).append((url, callback, cancel_event))
+            self._start_workers()
+            self.condition.notify()
+
+    def _start_workers(self):
+        self.running = [worker for worker in self.running if not worker.done()]
+        while len(self.running) < self.workers:
+            self.running.append(self.start_worker(self._worker))
+
+    def cancel(self, cancel_event):
+        """Drop the pending lookups requested with cancel_event (a closed or scrolled selector)."""
+        with self.condition:
+            for pending in (self.queued, self.visible):
+                kept = [request for request in pending if request[2] is not cancel_event]
+                pending.clear()
+                pending.extend(kept)
+
+    def stop(self):
+        """Drop pending lookups and let the workers exit."""
+        with self.condition:
+            self.stopped = True
+            self.queued.clear()
+            self.visible.clear()
+            self.condition.notify_all()
+
+    def _next_request(self):
+        with self.condition:
+            while True:
+                while not self.queued and not self.visible:
+                    if self.stopped:
+                        return None
+                    if not self.condition.wait(timeout=30):
+                        return None  # Idle workers exit; request() starts them again
+                request = (self.queued or self.visible).popleft()
+                cancel_event = request[2]
+                if not (cancel_event and cancel_event.is_set()):
+                    break  # Cancelled requests are dropped without taking an interval slot
+            # Space lookups out across all workers
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return request
+
+    def _worker(self):
+        while (request := self._next_request()) is not None:
+            url, callback, cancel_event = request
+            if cancel_event and cancel_event.is_set():
+                continue
+            key = self.key_func(url)
+            info = self.cache.get(key)
+            if info is None:
+                try:
+                    info = self.extract(url)
+                except Exception:
+                    continue  # The entry keeps its flat info; the download reports real errors
+                self.cache.put(key, info)
+            self.dispatch(callback, info)
+
+
+class YouTubeDownloader:
+    """Main class for managing YouTube downloads"""
+    
+    # Custom User-Agent headers for different device types
+    CUSTOM_HEADERS = {
+        "Desktop": {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+        },
+        "Android": {
+            "User-Agent": "Mozilla/5.0 (Linux; Android 13; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Mobile Safari/537.36"
+        },
+        "iOS": {
+            "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+        },
+        "TV": {
+            "User-Agent": "Mozilla/5.0 (CrKey armv7l 1.54.110279) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+        },
+        "Chrome": {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+        },
+        "Firefox": {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0"
+        },
+        "Safari": {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15"
+        },
+        "Edge": {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0"
+        },
+        "Samsung Smart TV": {
+            "User-Agent": "Mozilla/5.0 (SmartTV; Tizen 6.0) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/16.0 Chrome/96.0.4664.45 TV Safari/537.36"
+        },
+        "Roku": {
+            "User-Agent": "Mozilla/5.0 (Roku/DVP-7.70 (297.70E04154A)) Gecko/20100101 Firefox/108.0"
+        }
+    }
+
+    # Video ID from watch/embed/shorts/live/youtu.be links
+    YOUTUBE_ID_RE = re.compile(
+        r'(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})')
+
+    def __init__(self, config_path='config.json', progress_callback=None, postprocessor_callback=None, log_callback=None,
+                 config=None, db=None):
+        self.progress_callback = progress_callback
+        self.postprocessor_callback = postprocessor_callback
+        self.log_callback = log_callback
+        self.config = config if config is not None else self.load_config(config_path)
+        self.db = db or DatabaseManager('downloads.db')
+        self.metadata_cache = MetadataCache()
+        self.extractions = SingleFlight()
+        self.resource_slot = None  # resource name -> context manager bounding that resource class
+        self.postprocessing = False  # True while a download is in its ffmpeg phase
+        self.postprocessor_started = {}  # (thread id, postprocessor) -> perf_counter at its start
+        self.active = threading.local()  # .timeline of the download running on this thread
+        self.process_pool = None
+        performance = self.config.get('performance', {})
+        if performance.get('execution_mode') == 'processes':
+            self.process_pool = ProcessPool(int(performance.get('worker_processes') or 2),
+                                            stall_timeout=int(performance.get('worker_stall_timeout') or 600),
+                                            extract_timeout=int(performance.get('extract_timeout') or 120))
+
+    logger = logging.getLogger('ytgui.downloader')
+
+    def log(self, message, level=logging.INFO):
+        self.logger.log(level, message)
+        if self.log_callback:
+            self.log_callback(message)
+
+    def load_config(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                user_config = json.load(f)
+                config = DEFAULT_CONFIG.copy()
+                for key, value in user_config.items():
+                    if key in config and isinstance(value, dict):
+                        config[key].update(value)
+                    else:
+                        config[key] = value
+                return config
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.log(
+                f"'{path}' not found or invalid, creating default config.")
+            try:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(DEFAULT_CONFIG, f, indent=2, ensure_ascii=False)
+                return DEFAULT_CONFIG
+            except Exception as e:
+                self.log(f"Error creating config file: {e}", logging.ERROR)
+                return DEFAULT_CONFIG
+
+    @classmethod
+    def canonical_id(cls, url):
+        """Stable key for a URL: 'youtube:<id>' for any YouTube video link, else the URL itself."""
+        url = url.strip()
+        if match := cls.YOUTUBE_ID_RE.search(url):
+            return f"youtube:{match.group(1)}"
+        if re.fullmatch(r'[A-Za-z0-9_-]{11}', url):
+            return f"youtube:{url}"
+        return url.split('#')[0].rstrip('/')
+
+    @classmethod
+    def is_playlist_url(cls, url):
+        """Playlist, channel or user links that should be expanded rather than extracted as one video."""
+        if cls.YOUTUBE_ID_RE.search(url):
+            return False
+        return bool(re.search(r'[?&]list=|/playlist\b|youtube\.com/(?:@|channel/|c/|user/)', url))
+
+    def get_video_info(self, url, refresh=False):
+        """Parsed info of one video, from the metadata cache unless refresh is set.
+
+        Concurrent requests for the same video (Fetch Info, playlist enrichment, batch
+        import) share a single extraction.
+        """
+        key = self.canonical_id(url)
+        if not refresh and (info := self.metadata_cache.get(key)) is not None:
+            METRICS.inc('metadata_cache_hits_total')
+            return info
+        if self.process_pool:
+            extract = lambda: self._extract_in_worker(url, key)
+        else:
+            extract = lambda: self._extract_video_info(url, key)
+        with METRICS.span('get_video_info'):
+            return self.extractions.run(('video', key), extract)
+
+    def _extract_in_worker(self, url, key):
+        parsed = self.process_pool.run(('video_info', url), timeout=self.process_pool.extract_timeout)
+        self.metadata_cache.put(key, parsed)
+        return parsed
+
+    @PROFILER.profiled('extract')
+    def _extract_video_info(self, url, key):
+        # Scheduled premieres/streams have no formats yet; still return their info
+        ydl_opts = {'quiet': True, 'no_warnings': True, 'ignore_no_formats_error': True,
+                    'extract_flat': False, 'skip_download': True, 'logger': YtDlpLogger()}
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            parsed = VideoInfo.from_info(info, self._parse_formats(info.get('formats', [])))
+        self.metadata_cache.put(key, parsed)
+        return parsed
+    
+    def get_playlist_info(self, url):
+        """Extract playlist information with flat extraction."""
+        # Not the canonical video ID: watch?v=X&list=A and &list=B are different playlists
+        key = ('playlist', url.strip().split('#')[0].rstrip('/'))
+        with METRICS.span('get_playlist_info'):
+            return self.extractions.run(key, lambda: self._extract_playlist_info(url))
+
+    @PROFILER.profiled('extract')
+    def _extract_playlist_info(self, url):
+        pages = self.iter_playlist_info(url)
+        meta = next(pages)
+        videos = []
+        for page in pages:
+            videos.extend(page)
+        return {
+            'title': meta['title'],
+            'uploader': meta['uploader'],
+            'videos': videos
+        }
+
+    def iter_playlist_info(self, url, page_size=50, cancel_event=None):
+        """Enumerate a playlist lazily.
+
+        Yields a metadata dict ('title', 'uploader', 'is_playlist') first, then lists of
+        flat entries as yt-dlp fetches them, so callers can show the first page of a
+        channel with thousands of uploads right away. Setting cancel_event (or closing
+        the generator) stops enumeration before the next page request.
+        """
+        ydl_opts = {'quiet': True, 'no_warnings': True, 'logger': YtDlpLogger(),
+                    'extract_flat': 'in_playlist', 'skip_download': True}
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # process=False keeps 'entries' as the extractor's lazy generator/paged list
+            info = ydl.extract_info(url, download=False, process=False)
+            for _ in range(5):
+                # Channel URLs redirect to a tab (e.g. /videos) before yielding entries
+                if info.get('_type') not in ('url', 'url_transparent'):
+                    break
+                info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+            is_playlist = info.get('_type') in ('playlist', 'multi_video')
+            yield {
+                'title': info.get('title') or 'Playlist',
+                'uploader': info.get('uploader') or info.get('channel') or 'N/A',
+                'is_playlist': is_playlist,
+            }
+            if not is_playlist:
+                return
+            page = []
+            for entry in self._iter_entries(info.get('entries') or [], page_size):
+                if cancel_event and cancel_event.is_set():
+                    return
+                if not entry:
+                    continue
+                page.append({
+                    'id': entry.get('id'),
+                    'title': entry.get('title', 'Unknown'),
+                    'duration': entry.get('duration', 0),
+                    'url': entry.get('url') or f"https://www.youtube.com/watch?v={entry.get('id')}",
+                    'live_status': entry.get('live_status')
+                })
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+            if page:
+                yield page
+
+    @classmethod
+    def entry_key(cls, entry):
+        """Stable identifier of a playlist entry; flat entries of some sites have no ID."""
+        return entry.get('id') or cls.canonical_id(entry['url'])
+
+    def fetch_new_entries(self, url, known_ids, newest_first=True, max_new=200, cancel_event=None):
+        """Entries of a channel/playlist that are not in known_ids, newest first.
+
+        Newest-first sources (channel upload tabs) stop enumerating at the first known ID,
+        so a sync costs a page request or two; other playlists are walked fully. With no
+        known IDs, a newest-first source only returns its first page (the sync baseline).
+        """
+        pages = self.iter_playlist_info(url, page_size=30, cancel_event=cancel_event)
+        try:
+            meta = next(pages)
+            if not meta['is_playlist']:
+                raise ValueError(f"{url} is not a channel or playlist")
+            new_entries = []
+            for page in pages:
+                for entry in page:
+                    if self.entry_key(entry) in known_ids:
+                        if newest_first:
+                            return meta, new_entries
+                        continue
+                    new_entries.append(entry)
+                if newest_first and (not known_ids or len(new_entries) >= max_new):
+                    break
+            return meta, new_entries
+        finally:
+            # Closing the generator stops yt-dlp before it requests the next page
+            pages.close()
+
+    @staticmethod
+    def _iter_entries(entries, page_size):
+        if isinstance(entries, yt_dlp.utils.PagedList):
+            # Paged lists fetch on slicing rather than iteration
+            start = 0
+            while chunk := entries.getslice(start, start + page_size):
+                yield from chunk
+                start += len(chunk)
+        else:
+            yield from entries
+
+    def _parse_formats(self, formats):
+        video_formats = []
+        audio_formats = []
+        container_formats = set()
+        for f in formats:
+            if f.get('vcodec') != 'none' and f.get('acodec') == 'none':
+                video_formats.append({'format_id': f.get('format_id'), 'resolution': f.get('resolution'), 'fps': f.get('fps'), 'vcodec': f.get(
+                    'vcodec'), 'filesize': f.get('filesize') or f.get('filesize_approx'), 'tbr': f.get('tbr'), 'format_note': f.get('format_note'), 'ext': f.get('ext')})
+            elif f.get('vcodec') == 'none' and f.get('acodec') != 'none':
+                audio_formats.append({'format_id': f.get('format_id'), 'acodec': f.get('acodec'), 'abr': f.get('abr'), 'tbr': f.get('tbr') or f.get('abr'), 'filesize': f.get('filesize') or f.get('filesize_approx')})
+            # Collect all available container formats
+            if f.get('ext'):
+                container_formats.add(f.get('ext'))
+        return {'video': video_formats, 'audio': audio_formats, 'formats': sorted(list(container_formats))}
+
+    def download(self, url, options, timeline=None):
+        """Download url; timeline, if given, records the stages of this download."""
+        if timeline:
+            timeline.begin('extract', 'extraction', 'extract')
+            def progress_hook(d):
+                timeline.on_progress(d)
+                self.progress_hook(d)
+            options['progress_hooks'] = [progress_hook]
+        else:
+            options['progress_hooks'] = [self.progress_hook]
+        self.active.timeline = timeline
+        with ExitStack() as slots:
+            holding = []
+            def postprocessor_hook(d):
+                # ffmpeg work is bounded separately from downloading: the first postprocessor
+                # takes a post-processing slot, held until this download returns
+                if d['status'] == 'started' and not holding and self.resource_slot:
+                    slots.enter_context(self.resource_slot('postprocess'))
+                    holding.append(True)
+                self.postprocessing = True
+                if timeline:
+                    timeline.on_postprocessor(d)
+                self.postprocessor_hook(d)
+            options['postprocessor_hooks'] = [postprocessor_hook]
+            try:
+                with METRICS.span('download'):
+                    if self.process_pool:
+                        result = self._download_in_worker(url, options)
+                    else:
+                        result = self._download(url, options)
+                METRICS.inc('downloads_total', status=result['status'])
+                return result
+            finally:
+                self.postprocessing = False
+                self.active.timeline = None
+
+    def _download_in_worker(self, url, options):
+        """Download in a worker process, replaying its events through this process's hooks."""
+        def on_event(kind, payload):
+            if kind == 'progress':
+                options['progress_hooks'][0](payload)
+            elif kind == 'postprocessor':
+                options['postprocessor_hooks'][0](payload)
+            elif kind == 'log':
+                name, level, message = payload
+                logging.getLogger(name).log(level, message)
+            elif kind == 'record':
+                self._record_download(payload)
+        job_options = {key: value for key, value in options.items() if key not in ('progress_hooks', 'postprocessor_hooks')}
+        try:
+            return self.process_pool.run(('download', url, job_options), on_event)
+        except Exception as e:
+            self.log(f"Download in worker process failed: {e}", logging.ERROR)
+            return {'status': 'error', 'message': str(e), 'category': RetryPolicy.classify(str(e))}
+
+    def _download(self, url, options):
+        if (ranges := options.pop('section_ranges', None)):
+            # Built here rather than by the caller: the function does not pickle to worker processes
+            options['download_ranges'] = yt_dlp.utils.download_range_func(
+                None, [(start, end if end is not None else float('inf')) for start, end in ranges])
+        # yt-dlp's messages go to the log; the GUI draws progress itself
+        options.setdefault('logger', YtDlpLogger())
+        options.setdefault('noprogress', True)
+        try:
+            with yt_dlp.YoutubeDL(options) as ydl:
+                self.log(f"Attempting to download {url} with specified options.")
+                # Only the history row's fields are kept; the full info JSON is on disk when writeinfojson is on
+                record = DownloadRecord.from_info(ydl.extract_info(url, download=True))
+                self._record_download(record)
+                return {'status': 'success', 'info': record}
+        except yt_dlp.utils.DownloadError as e:
+            if "Failed to decrypt with DPAPI" in str(e) and options.get('cookiesfrombrowser'):
+                self.log("Cookie decryption failed. Retrying download without browser cookies.", logging.WARNING)
+                
+                new_options = options.copy()
+                new_options['cookiesfrombrowser'] = None
+                
+                try:
+                    with yt_dlp.YoutubeDL(new_options) as ydl:
+                        self.log(f"Retrying download for {url} without cookies.")
+                        record = DownloadRecord.from_info(ydl.extract_info(url, download=True))
+                        self._record_download(record)
+                        self.log("Download succeeded on retry.")
+                        return {'status': 'success', 'info': record}
+                except Exception as retry_e:
+                    self.log(f"Download retry failed: {retry_e}", logging.ERROR)
+                    message = "Cookie decryption failed and the download was unsuccessful without cookies. The video may be private or require a login that is not accessible."
+                    return {'status': 'error', 'message': message, 'category': RetryPolicy.classify(str(retry_e), retry_e)}
+            else:
+                self.log(f"Download Error: {e}", logging.ERROR)
+                return {'status': 'error', 'message': str(e), 'category': RetryPolicy.classify(str(e), e)}
+        except Exception as e:
+            self.logger.exception(f"An unexpected error occurred during download: {e}")
+            return {'status': 'error', 'message': str(e), 'category': RetryPolicy.classify(str(e), e)}
+
+    def _record_download(self, record):
+        timeline = getattr(self.active, 'timeline', None)
+        with timeline.span('database commit', 'db') if timeline else nullcontext():
+            self.db.add_download(record)
+
+    @PROFILER.profiled('progress')
+    def progress_hook(self, d):
+        if d['status'] == 'finished':
+            size = d.get('total_bytes') or d.get('downloaded_bytes') or 0
+            METRICS.inc('downloaded_bytes_total', size)
+            METRICS.observe('file_size_bytes', size)
+            if size and d.get('elapsed'):
+                METRICS.observe('throughput_bytes_per_second', size / d['elapsed'])
+        if self.progress_callback:
+            self.progress_callback(d)
+
+    def postprocessor_hook(self, d):
+        # Hooks of one download run on its thread, so (thread, postprocessor) identifies a run
+        key = (threading.get_ident(), d.get('postprocessor'))
+        if d['status'] == 'started':
+            self.postprocessor_started[key] = time.perf_counter()
+        elif d['status'] == 'finished' and (start := self.postprocessor_started.pop(key, None)) is not None:
+            METRICS.observe('postprocessor_seconds', time.perf_counter() - start, postprocessor=d.get('postprocessor'))
+        if self.postprocessor_callback:
+            self.postprocessor_callback(d)
+    
+    def extract_headers_from_cookies(self, cookie_file_path):
+        """Extract useful headers from cookie file."""
+        try:
+            with open(cookie_file_path, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+            
+            headers = {}
+            if isinstance(cookies, list):
+                # Extract security cookies if available
+                for cookie in cookies:
+                    if cookie.get('name') in ['PSID', 'SSID', 'APISID', 'SAPISID']:
+                        headers[f"X-{cookie['name']}"] = cookie.get('value', '')
+            
+            # Add default Chrome headers
+            headers['User-Agent'] = self.CUSTOM_HEADERS.get('Chrome', {}).get('User-Agent', '')
+            headers['Accept-Language'] = 'en-US,en;q=0.9'
+            headers['Accept-Encoding'] = 'gzip, deflate, br'
+            headers['Sec-Fetch-Dest'] = 'document'
+            headers['Sec-Fetch-Mode'] = 'navigate'
+            headers['Sec-Fetch-Site'] = 'none'
+            
+            return headers if headers else None
+        except Exception as e:
+            self.log(f"Failed to extract headers from cookies: {e}", logging.WARNING)
+            return None
+    
+    def get_http_headers(self, config):
+        """Build HTTP headers based on config."""
+        headers = {}
+        
+        auth_config = config.get('authentication', {})
+        
+        # Extract headers from cookie file if enabled
+        if auth_config.get('use_headers_from_cookies') and auth_config.get('cookie_file_path'):
+            extracted_headers = self.extract_headers_from_cookies(auth_config['cookie_file_path'])
+            if extracted_headers:
+                headers.update(extracted_headers)
+        
+        # Apply custom headers if enabled
+        if auth_config.get('use_custom_headers'):
+            header_type = auth_config.get('custom_header_type', 'Desktop')
+            custom_header = self.CUSTOM_HEADERS.get(header_type, {})
+            headers.update(custom_header)
+        
+        return headers if headers else None
+
+
+class PlaylistSelectorWindow(ctk.CTkToplevel):
+    """Popup window to select videos from a playlist.
+
+    Videos can arrive in pages while the playlist is still being enumerated; selected
+    videos can be queued at any time without waiting for the rest.
+    """
+
+    LOOKUP_MARGIN = 5  # Rows looked up beyond the visible ones, so short scrolls find them ready
+
+    def __init__(self, parent, playlist_info, cancel_event=None):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Playlist Video Selector")
+        self.geometry("700x600")
+        self.parent = parent
+        self.playlist_info = playlist_info
+        self.cancel_event = cancel_event or threading.Event()
+        self.loading = True
+        self.selected_videos = []
+        self.queued_indexes = set()
+        self.checkboxes = []
+        self.check_vars = []
+        self.video_labels = []
+        self.quality_vars = []
+        self.quality_menus = []
+        self.closed_event = threading.Event()  # Drops pending format lookups once closed
+        self.looked_up = set()  # Rows showing their real formats
+        self.visible_rows = range(0)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.setup_ui()
+        self.add_videos(list(playlist_info['videos']), already_listed=True)
+        self.after(100, self._poll_visible_rows)  # Once the rows are laid out
+
+    def setup_ui(self):
+        # Header frame
+        header_frame = ctk.CTkFrame(self)
+        header_frame.pack(padx=10, pady=10, fill="x")
+        
+        ctk.CTkLabel(header_frame, text=f"Playlist: {self.playlist_info['title']}", 
+                     font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w")
+        self.count_label = ctk.CTkLabel(header_frame, text="", font=ctk.CTkFont(size=11))
+        self.count_label.pack(anchor="w", pady=(5, 0))
+        
+        # Button frame for Select/Unselect All
+        button_frame = ctk.CTkFrame(self)
+        button_frame.pack(padx=10, pady=5, fill="x")
+        
+        ctk.CTkButton(button_frame, text="Select All", command=self.select_all, width=100).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Unselect All", command=self.unselect_all, width=100).pack(side="left", padx=5)
+        self.stop_button = ctk.CTkButton(button_frame, text="Stop Loading", command=self.stop_loading,
+                                         width=100, fg_color="orange")
+        self.stop_button.pack(side="right", padx=5)
+        
+        # Scrollable frame for videos
+        self.scrollable_frame = ctk.CTkScrollableFrame(self)
+        self.scrollable_frame.pack(padx=10, pady=10, fill="both", expand=True)
+        self.scrollable_frame.grid_columnconfigure(0, weight=1)
+        
+        # Bottom frame with actions
+        bottom_frame = ctk.CTkFrame(self)
+        bottom_frame.pack(padx=10, pady=10, fill="x")
+        bottom_frame.grid_columnconfigure(2, weight=1)
         
-        # Add checkboxes for each video
-        for idx, video in enumerate(self.playlist_info['videos']):
+        ctk.CTkButton(bottom_frame, text="Download Selected", command=self.on_confirm).grid(row=0, column=0, padx=5)
+        ctk.CTkButton(bottom_frame, text="Queue Selected Now", command=self.queue_selected).grid(row=0, column=1, padx=5)
+        ctk.CTkButton(bottom_frame, text="Cancel", command=self.close).grid(row=0, column=3, padx=5)
+        self._update_count()
+
+    def add_videos(self, videos, already_listed=False):
+        """Append a page of videos to the list (called on the Tk thread as pages arrive)."""
+        if not already_listed:
+            self.playlist_info['videos'].extend(videos)
+        for video in videos:
+            idx = len(self.check_vars)
             var = ctk.BooleanVar(value=True)  # Default selected
             self.check_vars.append(var)
             
-            video_frame = ctk.CTkFrame(scrollable_frame)
+            video_frame = ctk.CTkFrame(self.scrollable_frame)
             video_frame.grid(row=idx, column=0, sticky="ew", padx=5, pady=5)
             video_frame.grid_columnconfigure(1, weight=1)
             
@@ -571,46 +2688,603 @@ class PlaylistSelectorWindow(ctk.CTkToplevel):
             self.checkboxes.append(checkbox)
             
             # Video info
-            duration_str = time.strftime('%H:%M:%S', time.gmtime(video.get('duration', 0)))
-            info_text = f"{video['title']} ({duration_str})"
-            label = ctk.CTkLabel(video_frame, text=info_text, wraplength=600, justify="left")
+            label = ctk.CTkLabel(video_frame, text=self._video_text(video), wraplength=480, justify="left")
             label.grid(row=0, column=1, sticky="w", padx=5)
+            self.video_labels.append(label)
+            
+            # Per-video quality, filled with the real formats once looked up
+            quality_var = ctk.StringVar(value="Default")
+            quality_menu = ctk.CTkOptionMenu(video_frame, variable=quality_var, values=["Default"],
+                                             width=110, state="disabled")
+            quality_menu.grid(row=0, column=2, padx=5)
+            self.quality_vars.append(quality_var)
+            self.quality_menus.append(quality_menu)
+        self._update_count()
+
+    def _visible_range(self):
+        """Indexes of the rows on screen, plus a few either side."""
+        count = len(self.check_vars)
+        # CTkScrollableFrame has no public view; its canvas knows which fraction is shown
+        top, bottom = self.scrollable_frame._parent_canvas.yview()
+        return range(max(0, int(top * count) - self.LOOKUP_MARGIN),
+                     min(count, int(bottom * count) + 1 + self.LOOKUP_MARGIN))
+
+    def _poll_visible_rows(self):
+        """Look up the formats of the rows on screen; rows scrolled away give up their place."""
+        if self.closed_event.is_set():
+            return
+        rows = self._visible_range()
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.parent.enricher.cancel(self.closed_event)
+            for idx in rows:
+                if idx not in self.looked_up:
+                    self.parent.enricher.request(self.playlist_info['videos'][idx]['url'],
+                                                 lambda info, idx=idx: self.apply_video_info(idx, info),
+                                                 cancel_event=self.closed_event)
+        self.after(250, self._poll_visible_rows)
+
+    @staticmethod
+    def _video_text(video, note=None):
+        duration_str = time.strftime('%H:%M:%S', time.gmtime(video.get('duration') or 0))
+        text = f"{video['title']} ({duration_str})"
+        return f"{text}\n{note}" if note else text
+
+    def apply_video_info(self, idx, info):
+        """Show the real qualities and size of a looked-up entry (Tk thread)."""
+        if self.closed_event.is_set():
+            return
+        self.looked_up.add(idx)
+        video = self.playlist_info['videos'][idx]
+        video['formats'] = info.formats
+        if info.duration:
+            video['duration'] = info.duration
+        heights = sorted({h for f in (video['formats'] or {}).get('video', [])
+                          if (h := MainWindow._format_height(f))}, reverse=True)
+        qualities = [f"{h}p" for h in heights] + ["Audio Only"]
+        self.quality_menus[idx].configure(values=["Default"] + qualities, state="normal")
+        default_quality = self.parent.quality_var.get() if self.parent.playlist_options_active else "720p"
+        estimate = self.parent._estimate_queue_item(
+            {'quality': default_quality, 'duration': video.get('duration')}, video['formats'])
+        note = f"Up to {heights[0]}p" if heights else "Audio only"
+        if estimate.get('estimated_bytes'):
+            note += f" | ~{self.parent.format_bytes(estimate['estimated_bytes'])} at {default_quality}"
+        if idx not in self.queued_indexes:
+            self.video_labels[idx].configure(text=self._video_text(video, note))
+
+    def finish_loading(self, error=None):
+        self.loading = False
+        self.stop_button.configure(state="disabled")
+        self._update_count(error)
+
+    def stop_loading(self):
+        self.cancel_event.set()
+        self.finish_loading()
+
+    def _update_count(self, error=None):
+        text = f"Uploader: {self.playlist_info['uploader']} | Videos: {len(self.check_vars)}"
+        if self.loading:
+            text += " (loading more...)"
+        elif self.cancel_event.is_set():
+            text += " (loading stopped)"
+        if error:
+            text += f" (loading failed: {error})"
+        if self.queued_indexes:
+            text += f" | Queued: {len(self.queued_indexes)}"
+        self.count_label.configure(text=text)
+
+    def select_all(self):
+        for var in self.check_vars:
+            var.set(True)
+
+    def unselect_all(self):
+        for var in self.check_vars:
+            var.set(False)
+
+    def _take_selected(self):
+        """Selected videos that were not queued yet; marks them as queued."""
+        selected = []
+        for idx, var in enumerate(self.check_vars):
+            if var.get() and idx not in self.queued_indexes:
+                video = self.playlist_info['videos'][idx]
+                if self.quality_vars[idx].get() != "Default":
+                    video['quality'] = self.quality_vars[idx].get()
+                selected.append(video)
+                self.queued_indexes.add(idx)
+                var.set(False)
+                self.checkboxes[idx].configure(state="disabled")
+                self.quality_menus[idx].configure(state="disabled")
+                self.video_labels[idx].configure(text_color="gray")
+        return selected
+
+    def queue_selected(self):
+        """Queue the current selection while the rest of the playlist keeps loading."""
+        videos = self._take_selected()
+        if not videos:
+            messagebox.showwarning("No Selection", "Please select at least one video.", parent=self)
+            return
+        self.parent.queue_playlist_videos(videos)
+        self._update_count()
+
+    def on_confirm(self):
+        """Get selected videos and store them."""
+        self.selected_videos = self._take_selected()
+        
+        if not self.selected_videos and not self.queued_indexes:
+            messagebox.showwarning("No Selection", "Please select at least one video.")
+            return
+        
+        # Set parent's playlist videos and close
+        self.parent.selected_playlist_videos = self.selected_videos
+        self.parent.is_playlist_mode = True
+        self.close()
+
+    def close(self):
+        """Close the window and hand the selection back to the main window."""
+        self.destroy()
+        self.parent.on_playlist_selector_closed(self)
+
+    def destroy(self):
+        # Nothing can be selected from a closed window; stop enumerating the playlist
+        self.cancel_event.set()
+        self.closed_event.set()
+        self.parent.enricher.cancel(self.closed_event)
+        super().destroy()
+
+
+class BatchImportWindow(ctk.CTkToplevel):
+    """Popup window to paste or load many URLs and add them all to the queue."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Batch Import")
+        self.geometry("650x500")
+        self.parent = parent
+        self.cancel_event = threading.Event()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        self.setup_ui()
+
+    def setup_ui(self):
+        ctk.CTkLabel(self, text="One URL per line (video, playlist or channel links; # starts a comment):",
+                     font=ctk.CTkFont(size=12)).pack(padx=10, pady=(10, 0), anchor="w")
+        self.url_text = ctk.CTkTextbox(self)
+        self.url_text.pack(padx=10, pady=10, fill="both", expand=True)
+        
+        # Quality/format applied to every imported item
+        options_frame = ctk.CTkFrame(self)
+        options_frame.pack(padx=10, pady=5, fill="x")
+        ctk.CTkLabel(options_frame, text="Quality:").pack(side="left", padx=5)
+        self.quality_var = ctk.StringVar(value="1080p")
+        ctk.CTkOptionMenu(options_frame, variable=self.quality_var, command=self.on_quality_change,
+                          values=["1080p", "720p", "480p", "360p", "240p", "Audio Only"]).pack(side="left", padx=5)
+        ctk.CTkLabel(options_frame, text="Format:").pack(side="left", padx=5)
+        self.format_var = ctk.StringVar(value="mp4")
+        self.format_menu = ctk.CTkOptionMenu(options_frame, variable=self.format_var, values=["mp4", "mkv", "webm"])
+        self.format_menu.pack(side="left", padx=5)
+        
+        self.status_label = ctk.CTkLabel(self, text="")
+        self.status_label.pack(padx=10, pady=5, anchor="w")
         
-        # Bottom frame with actions
         bottom_frame = ctk.CTkFrame(self)
         bottom_frame.pack(padx=10, pady=10, fill="x")
-        bottom_frame.grid_columnconfigure(1, weight=1)
+        ctk.CTkButton(bottom_frame, text="Load File...", command=self.load_file, width=100).pack(side="left", padx=5)
+        self.import_button = ctk.CTkButton(bottom_frame, text="Import to Queue", command=self.start_import)
+        self.import_button.pack(side="left", padx=5)
+        ctk.CTkButton(bottom_frame, text="Close", command=self.on_close, width=100).pack(side="right", padx=5)
+
+    def on_quality_change(self, quality):
+        values = ["best", "mp3", "aac", "opus", "wav"] if quality == "Audio Only" else ["mp4", "mkv", "webm"]
+        self.format_menu.configure(values=values)
+        if self.format_var.get() not in values:
+            self.format_var.set(values[0])
+
+    def load_file(self):
+        """Append the lines of a text file (e.g. a yt-dlp batch file) to the URL box."""
+        if not (path := filedialog.askopenfilename(filetypes=[("Text files", "*.txt"), ("All files", "*.*")])):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.url_text.insert("end", f.read().strip() + "\n")
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Could not load batch file: {e}", parent=self)
+
+    def start_import(self):
+        lines = self.url_text.get("1.0", "end").splitlines()
+        if not any(line.strip() and not line.strip().startswith(('#', ';', ']')) for line in lines):
+            messagebox.showwarning("No URLs", "Please paste or load at least one URL.", parent=self)
+            return
+        self.import_button.configure(state="disabled")
+        self.status_label.configure(text="Resolving...")
+        self.parent.orchestrator.spawn(None, self._import_thread, lines, self.quality_var.get(), self.format_var.get())
+
+    def _import_thread(self, lines, quality, format_choice):
+        stats = self.parent.import_batch(lines, quality, format_choice,
+                                         progress_callback=self._report_progress, cancel_event=self.cancel_event)
+        self._report_progress(stats, finished=True)
+
+    def _report_progress(self, stats, finished=False):
+        def _update():
+            if not self.winfo_exists():
+                return
+            text = (f"Resolved {stats['resolved']}/{stats['total']} | Added {stats['added']} | "
+                    f"Failed {stats['failed']} | Duplicates skipped {stats['duplicates']}")
+            self.status_label.configure(text=("Done. " if finished else "") + text)
+            if finished:
+                self.import_button.configure(state="normal")
+        # Called from worker threads; the main window outlives this popup
+        self.parent.call_ui(_update)
+
+    def on_close(self):
+        self.cancel_event.set()
+        self.destroy()
+
+
+class SubscriptionsWindow(ctk.CTkToplevel):
+    """Popup window to manage followed channels/playlists and sync them."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Subscriptions")
+        self.geometry("750x500")
+        self.parent = parent
         
-        ctk.CTkButton(bottom_frame, text="Download Selected", command=self.on_confirm).grid(row=0, column=0, padx=5)
-        ctk.CTkButton(bottom_frame, text="Cancel", command=self.destroy).grid(row=0, column=2, padx=5)
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        add_frame = ctk.CTkFrame(self)
+        add_frame.pack(padx=10, pady=10, fill="x")
+        add_frame.grid_columnconfigure(0, weight=1)
+        self.url_entry = ctk.CTkEntry(add_frame, placeholder_text="Channel or playlist URL...")
+        self.url_entry.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        EntryContextMenu(self.url_entry)
+        if current := self.parent.url_entry.get().strip():
+            self.url_entry.insert(0, current)
+        self.quality_var = ctk.StringVar(value="1080p")
+        ctk.CTkOptionMenu(add_frame, variable=self.quality_var, width=100, command=self.on_quality_change,
+                          values=["1080p", "720p", "480p", "360p", "240p", "Audio Only"]).grid(row=0, column=1, padx=5)
+        self.format_var = ctk.StringVar(value="mp4")
+        self.format_menu = ctk.CTkOptionMenu(add_frame, variable=self.format_var, width=80, values=["mp4", "mkv", "webm"])
+        self.format_menu.grid(row=0, column=2, padx=5)
+        ctk.CTkButton(add_frame, text="Subscribe", command=self.subscribe, width=90).grid(row=0, column=3, padx=5)
+        
+        self.list_display = ctk.CTkTextbox(self, state="disabled")
+        self.list_display.pack(padx=10, pady=5, fill="both", expand=True)
+        
+        self.status_label = ctk.CTkLabel(self, text="")
+        self.status_label.pack(padx=10, pady=5, anchor="w")
+        
+        bottom_frame = ctk.CTkFrame(self)
+        bottom_frame.pack(padx=10, pady=10, fill="x")
+        ctk.CTkLabel(bottom_frame, text="Subscription #").pack(side="left", padx=5)
+        self.id_entry = ctk.CTkEntry(bottom_frame, width=50)
+        self.id_entry.pack(side="left", padx=5)
+        ctk.CTkButton(bottom_frame, text="Remove", command=self.remove, width=80).pack(side="left", padx=5)
+        ctk.CTkButton(bottom_frame, text="Sync All Now", command=self.sync_now).pack(side="right", padx=5)
+
+    def on_quality_change(self, quality):
+        # Audio formats only make sense with Audio Only; a video remuxed to mp3 fails
+        values = ["best", "mp3", "aac", "opus", "wav"] if quality == "Audio Only" else ["mp4", "mkv", "webm"]
+        self.format_menu.configure(values=values)
+        if self.format_var.get() not in values:
+            self.format_var.set(values[0])
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        subscriptions = self.parent.downloader.db.get_subscriptions()
+        self.list_display.configure(state="normal")
+        self.list_display.delete("1.0", "end")
+        if not subscriptions:
+            self.list_display.insert("end", "No subscriptions yet")
+        for sub in subscriptions:
+            self.list_display.insert("end", f"#{sub['id']} {sub['title'] or '(not synced yet)'}\n"
+                                            f"   {sub['url']}\n"
+                                            f"   {sub['quality']} / {sub['format']} | Last checked: {sub['last_checked'] or 'never'}\n\n")
+        self.list_display.configure(state="disabled")
+
+    def set_status(self, text):
+        if self.winfo_exists():
+            self.status_label.configure(text=text)
+
+    def subscribe(self):
+        url = self.url_entry.get().strip()
+        if not url:
+            messagebox.showerror("Error", "Please enter a channel or playlist URL.", parent=self)
+            return
+        self.parent.subscribe(url, self.quality_var.get(), self.format_var.get(), on_done=self._on_sync_done)
+        self.set_status("Subscribed, recording the current uploads...")
+        self.refresh()
+
+    def remove(self):
+        try:
+            subscription_id = int(self.id_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("Error", "Enter the number of a subscription.", parent=self)
+            return
+        self.parent.downloader.db.remove_subscription(subscription_id)
+        self.refresh()
+
+    def sync_now(self):
+        self.set_status("Syncing subscriptions...")
+        self.parent.sync_subscriptions(on_done=self._on_sync_done)
+
+    def _on_sync_done(self, summary):
+        self.set_status(summary)
+        self.refresh()
+
+
+class ChapterPickerWindow(ctk.CTkToplevel):
+    """Popup window to pick chapters of the fetched video as download sections."""
+
+    def __init__(self, parent, chapters):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Select Chapters")
+        self.geometry("500x450")
+        self.parent = parent
+        self.chapters = chapters
+        self.check_vars = []
+        
+        chapter_frame = ctk.CTkScrollableFrame(self)
+        chapter_frame.pack(padx=10, pady=10, fill="both", expand=True)
+        for chapter in chapters:
+            var = ctk.BooleanVar(value=False)
+            self.check_vars.append(var)
+            text = (f"{Sections.format_time(chapter['start_time'] or 0)} - "
+                    f"{Sections.format_time(chapter['end_time'] or 0)}  {chapter['title'] or ''}")
+            ctk.CTkCheckBox(chapter_frame, text=text, variable=var).pack(anchor="w", padx=5, pady=3)
+        ctk.CTkButton(self, text="Use Selected", command=self.on_confirm).pack(padx=10, pady=10, side="right")
+
+    def on_confirm(self):
+        ranges = [[chapter['start_time'] or 0, chapter['end_time']]
+                  for chapter, var in zip(self.chapters, self.check_vars) if var.get()]
+        self.parent.sections_var.set(Sections.format(ranges))
+        self.destroy()
+
+
+class LiveCapturesWindow(ctk.CTkToplevel):
+    """Popup window listing live recordings, with controls to start and stop them."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Live Recordings")
+        self.geometry("700x400")
+        self.parent = parent
+        self.rows = {}  # capture -> (status label, stop button)
+        
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        add_frame = ctk.CTkFrame(self)
+        add_frame.pack(padx=10, pady=10, fill="x")
+        add_frame.grid_columnconfigure(0, weight=1)
+        self.url_entry = ctk.CTkEntry(add_frame, placeholder_text="Live stream or premiere URL...")
+        self.url_entry.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        EntryContextMenu(self.url_entry)
+        if current := self.parent.url_entry.get().strip():
+            self.url_entry.insert(0, current)
+        self.from_start_var = ctk.BooleanVar(value=self.parent.downloader.config['live'].get('from_start', False))
+        ctk.CTkCheckBox(add_frame, text="From start", variable=self.from_start_var).grid(row=0, column=1, padx=5)
+        ctk.CTkButton(add_frame, text="Record", command=self.record, width=80).grid(row=0, column=2, padx=5)
+        
+        self.list_frame = ctk.CTkScrollableFrame(self)
+        self.list_frame.pack(padx=10, pady=(0, 10), fill="both", expand=True)
+        self.list_frame.grid_columnconfigure(0, weight=1)
+
+    def record(self):
+        url = self.url_entry.get().strip()
+        if not url:
+            messagebox.showerror("Error", "Please enter a URL.", parent=self)
+            return
+        self.parent.start_live_capture(url, None, from_start=self.from_start_var.get())
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        for capture in self.parent.live_captures:
+            if capture not in self.rows:
+                row = len(self.rows)
+                ctk.CTkLabel(self.list_frame, text=capture.title[:60], anchor="w").grid(
+                    row=row * 2, column=0, padx=5, pady=(5, 0), sticky="w")
+                status_label = ctk.CTkLabel(self.list_frame, text="", anchor="w", font=ctk.CTkFont(size=11))
+                status_label.grid(row=row * 2 + 1, column=0, padx=15, sticky="w")
+                stop_button = ctk.CTkButton(self.list_frame, text="Stop", width=60, fg_color="red",
+                                            command=capture.stop)
+                stop_button.grid(row=row * 2, column=1, rowspan=2, padx=5)
+                self.rows[capture] = (status_label, stop_button)
+            status_label, stop_button = self.rows[capture]
+            status_label.configure(text=f"{capture.status} | {capture.segments_written} file(s), "
+                                        f"{self.parent.format_bytes(capture.bytes_written)}")
+            if capture.finished:
+                stop_button.configure(state="disabled")
+        self.after(1000, self.refresh)
+
+
+class LogWindow(ctk.CTkToplevel):
+    """Popup log viewer that appends new messages from the shared LogBuffer in batches.
+
+    Only the newest MAX_LINES lines live in the text widget, so a long run does not
+    slow Tk down; changing a filter redraws from the buffer.
+    """
+
+    MAX_LINES = 2000
+    LEVELS = {"Debug": logging.DEBUG, "Info": logging.INFO, "Warning": logging.WARNING, "Error": logging.ERROR}
+    COMPONENTS = ["All", "app", "queue", "downloader", "yt_dlp", "subscriptions", "live", "orchestrator"]
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Log")
+        self.geometry("900x500")
+        self.parent = parent
+        self.buffer = parent.logs.buffer
+        self.last_seq = 0  # Newest entry looked at
+        self.cleared_seq = 0  # Entries up to this one were cleared from view
+        self.line_count = 0
+        
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        filter_frame = ctk.CTkFrame(self)
+        filter_frame.pack(padx=10, pady=(10, 0), fill="x")
+        ctk.CTkLabel(filter_frame, text="Level:").pack(side="left", padx=(10, 5), pady=5)
+        self.level_var = ctk.StringVar(value="Info")
+        ctk.CTkOptionMenu(filter_frame, variable=self.level_var, values=list(self.LEVELS),
+                          command=self.redraw, width=100).pack(side="left", padx=5)
+        ctk.CTkLabel(filter_frame, text="Component:").pack(side="left", padx=(15, 5))
+        self.component_var = ctk.StringVar(value="All")
+        ctk.CTkOptionMenu(filter_frame, variable=self.component_var, values=self.COMPONENTS,
+                          command=self.redraw, width=130).pack(side="left", padx=5)
+        self.autoscroll_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(filter_frame, text="Follow", variable=self.autoscroll_var).pack(side="left", padx=15)
+        ctk.CTkButton(filter_frame, text="Clear", command=self.clear, width=70).pack(side="right", padx=10)
+        
+        self.textbox = ctk.CTkTextbox(self, wrap="none", font=ctk.CTkFont(family="Courier", size=12))
+        self.textbox.pack(padx=10, pady=10, fill="both", expand=True)
+        self.textbox.configure(state="disabled")
+
+    def _wanted(self, entry):
+        seq, created, level, name, message = entry
+        component = self.component_var.get()
+        return (seq > self.cleared_seq and level >= self.LEVELS[self.level_var.get()]
+                and (component == "All" or name == f"ytgui.{component}"))
+
+    @staticmethod
+    def _format(entry):
+        seq, created, level, name, message = entry
+        return (f"{time.strftime('%H:%M:%S', time.localtime(created))} {logging.getLevelName(level):<7} "
+                f"{name.rpartition('.')[2]}: {message}\n")
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        self.append_new()
+        self.after(250, self.refresh)
+
+    def append_new(self):
+        entries = self.buffer.since(self.last_seq)
+        if not entries:
+            return
+        self.last_seq = entries[-1][0]
+        lines = [self._format(entry) for entry in entries if self._wanted(entry)]
+        if not lines:
+            return
+        text = "".join(lines[-self.MAX_LINES:])
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", text)
+        self.line_count += text.count("\n")
+        if self.line_count > self.MAX_LINES:
+            self.textbox.delete("1.0", f"{self.line_count - self.MAX_LINES + 1}.0")
+            self.line_count = self.MAX_LINES
+        self.textbox.configure(state="disabled")
+        if self.autoscroll_var.get():
+            self.textbox.see("end")
+
+    def redraw(self, *_):
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.configure(state="disabled")
+        self.last_seq = 0
+        self.line_count = 0
+        self.append_new()
+
+    def clear(self):
+        self.cleared_seq = self.last_seq
+        self.redraw()
+
+
+class StatsWindow(ctk.CTkToplevel):
+    """Popup window with the timing spans and counters collected in METRICS."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title("Stats")
+        self.geometry("800x500")
+        self.parent = parent
+        
+        button_frame = ctk.CTkFrame(self)
+        button_frame.pack(padx=10, pady=(10, 0), fill="x")
+        ctk.CTkButton(button_frame, text="Reset", command=self.reset, width=80).pack(side="right", padx=10, pady=5)
+        ctk.CTkButton(button_frame, text="Export Trace...", command=self.export_trace,
+                      width=120).pack(side="right", padx=(10, 0), pady=5)
+        ctk.CTkLabel(button_frame, text="Traces of recent queue items open in chrome://tracing or ui.perfetto.dev",
+                     font=ctk.CTkFont(size=11)).pack(side="left", padx=10)
+        self.textbox = ctk.CTkTextbox(self, wrap="none", font=ctk.CTkFont(family="Courier", size=12))
+        self.textbox.pack(padx=10, pady=10, fill="both", expand=True)
+        self.refresh()
+
+    @staticmethod
+    def _labels(labels):
+        return "{" + ", ".join(f"{key}={value}" for key, value in labels) + "}" if labels else ""
+
+    def _value(self, name, value):
+        if name.endswith('_bytes') or name.endswith('_bytes_total'):
+            return self.parent.format_bytes(value)
+        if name.endswith('_bytes_per_second'):
+            return f"{self.parent.format_bytes(value)}/s"
+        if name.endswith('_seconds'):
+            return f"{value * 1000:.1f}ms" if value < 1 else f"{value:.2f}s"
+        return f"{value:g}"
 
-    def select_all(self):
-        for var in self.check_vars:
-            var.set(True)
+    def render(self):
+        counters, histograms = METRICS.snapshot()
+        lines = [f"{'Timing / distribution':<48}{'count':>7}{'avg':>11}{'p50':>11}{'p95':>11}{'max':>11}"]
+        for name, labels, summary in histograms:
+            average = summary['sum'] / summary['count']
+            lines.append(f"{(name + self._labels(labels))[:47]:<48}{summary['count']:>7}"
+                         + "".join(f"{self._value(name, value):>11}" for value in
+                                   (average, summary['p50'], summary['p95'], summary['max'])))
+        lines += ["", "Counters"]
+        for name, labels, value in counters:
+            lines.append(f"  {name + self._labels(labels):<54}{self._value(name, value)}")
+        lines += [""] + STARTUP.lines()
+        return "\n".join(lines)
 
-    def unselect_all(self):
-        for var in self.check_vars:
-            var.set(False)
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        position = self.textbox.yview()[0]
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("end", self.render())
+        self.textbox.configure(state="disabled")
+        self.textbox.yview_moveto(position)
+        self.after(1000, self.refresh)
 
-    def on_confirm(self):
-        """Get selected videos and store them."""
-        self.selected_videos = []
-        for idx, var in enumerate(self.check_vars):
-            if var.get():
-                self.selected_videos.append(self.playlist_info['videos'][idx])
-        
-        if not self.selected_videos:
-            messagebox.showwarning("No Selection", "Please select at least one video.")
+    def reset(self):
+        METRICS.reset()
+
+    def export_trace(self):
+        timelines = list(self.parent.timelines)
+        if not timelines:
+            messagebox.showinfo("Export Trace", "No queue item has been downloaded yet.", parent=self)
             return
-        
-        # Set parent's playlist videos and close
-        self.parent.selected_playlist_videos = self.selected_videos
-        self.parent.is_playlist_mode = True
-        self.destroy()
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json", initialfile="trace.json",
+                                            filetypes=[("Trace JSON", "*.json")])
+        if not path:
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(Timeline.export(timelines), f)
+        messagebox.showinfo("Export Trace", f"Exported {len(timelines)} item(s) to {path}.", parent=self)
 
 
 class SettingsWindow(ctk.CTkToplevel):
-    """Advanced Settings Window"""
+    """Advanced Settings Window
+
+    Created once and hidden on close; each tab's widgets are built the first time
+    the tab is shown.
+    """
+
+    # Number settings that take fractions; the others are saved as integers
+    FRACTIONAL = {"enrich_interval", "shutdown_timeout"}
 
     def __init__(self, parent):
         super().__init__(parent)
@@ -621,20 +3295,40 @@ class SettingsWindow(ctk.CTkToplevel):
         self.config_path = 'config.json'
         self.config = parent.downloader.config
         self.vars = {}
-        self.tab_view = ctk.CTkTabview(self, anchor="w")
+        self.tab_builders = {}  # Tab name -> function filling it, until first shown
+        self.tab_view = ctk.CTkTabview(self, anchor="w", command=self.build_current_tab)
         self.tab_view.pack(expand=True, fill="both", padx=10, pady=10)
         self.create_tabs()
         save_button = ctk.CTkButton(
             self, text="Save and Close", command=self.save_and_close)
         save_button.pack(pady=10, padx=10, side="right")
+        # Closing without saving hides the window; show() discards the edits
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
 
     def create_tabs(self):
-        tabs = {"Download": self.create_download_tab, "Output": self.create_output_tab, "Subtitles": self.create_subtitles_tab,
-                "Metadata": self.create_metadata_tab, "Post-Processing": self.create_postprocessing_tab,
-                "Network": self.create_network_tab, "Authentication": self.create_auth_tab,
-                "Appearance": self.create_appearance_tab, "Updates": self.create_updates_tab}
-        for name, func in tabs.items():
-            func(self.tab_view.add(name))
+        self.tab_builders = {"Download": self.create_download_tab, "Output": self.create_output_tab,
+                             "Subtitles": self.create_subtitles_tab, "Metadata": self.create_metadata_tab,
+                             "Post-Processing": self.create_postprocessing_tab, "Network": self.create_network_tab,
+                             "Performance": self.create_performance_tab, "Live": self.create_live_tab,
+                             "Subscriptions": self.create_subscriptions_tab, "Logging": self.create_logging_tab,
+                             "Authentication": self.create_auth_tab, "Appearance": self.create_appearance_tab,
+                             "Updates": self.create_updates_tab}
+        for name in self.tab_builders:
+            self.tab_view.add(name)
+        self.build_current_tab()
+
+    def build_current_tab(self):
+        name = self.tab_view.get()
+        if (builder := self.tab_builders.pop(name, None)):
+            builder(self.tab_view.tab(name))
+
+    def show(self):
+        """Bring the hidden window back with the fields reset to the saved config."""
+        self.config = self.parent.downloader.config
+        for name, (var, section_name, is_number, is_list) in self.vars.items():
+            var.set(self._display_value(name, section_name, is_list))
+        self.deiconify()
+        self.lift()
 
     def create_download_tab(self, tab):
         tab.grid_columnconfigure(1, weight=1)
@@ -650,6 +3344,22 @@ class SettingsWindow(ctk.CTkToplevel):
                        "Concurrent Fragments", "download", 4, is_number=True)
         self.add_entry(tab, "limit_rate",
                        "Rate Limit (e.g., 5M, 100K)", "download", 5)
+        self.add_entry(tab, "min_free_space_mb",
+                       "Minimum Free Space (MB)", "download", 6, is_number=True)
+        self.add_entry(tab, "disk_check_interval",
+                       "Disk Check Interval (seconds)", "download", 7, is_number=True)
+        self.add_entry(tab, "queue_retries",
+                       "Queue Retries (transient errors)", "download", 8, is_number=True)
+        self.add_entry(tab, "retry_base_delay",
+                       "Retry Base Delay (seconds)", "download", 9, is_number=True)
+        self.add_entry(tab, "batch_workers",
+                       "Batch Import Workers", "download", 10, is_number=True)
+        self.add_entry(tab, "enrich_workers",
+                       "Playlist Format Lookups", "download", 11, is_number=True)
+        self.add_entry(tab, "enrich_interval",
+                       "Seconds Between Lookups", "download", 12, is_number=True)
+        self.add_entry(tab, "shutdown_timeout",
+                       "Post-Processing Wait on Close (s)", "download", 13, is_number=True)
 
     def create_output_tab(self, tab):
         self.add_checkbox(tab, "keep_video",
@@ -702,6 +3412,59 @@ class SettingsWindow(ctk.CTkToplevel):
         self.add_entry(tab, "source_address",
                        "Source IP Address", "network", 3)
 
+    def create_performance_tab(self, tab):
+        self.add_dropdown(tab, "execution_mode", "Run yt-dlp in (restart to apply)", "performance", 0,
+                          ["threads", "processes"])
+        self.add_entry(tab, "worker_processes",
+                       "Worker Processes", "performance", 1, is_number=True)
+        self.add_entry(tab, "worker_stall_timeout",
+                       "Restart Download Worker After (s without progress)", "performance", 2, is_number=True)
+        self.add_entry(tab, "extract_timeout",
+                       "Restart Lookup Worker After (s)", "performance", 3, is_number=True)
+        self.add_entry(tab, "http_port",
+                       "Metrics Port on 127.0.0.1 (0 = off, restart to apply)", "metrics", 4, is_number=True)
+        self.add_entry(tab, "file",
+                       "Metrics File (restart to apply)", "metrics", 5)
+        self.add_entry(tab, "file_interval",
+                       "Metrics File Interval (s)", "metrics", 6, is_number=True)
+
+    def create_live_tab(self, tab):
+        self.add_entry(tab, "max_captures",
+                       "Simultaneous Live Recordings", "live", 0, is_number=True)
+        self.add_entry(tab, "segment_minutes",
+                       "Segment Length (minutes)", "live", 1, is_number=True)
+        self.add_entry(tab, "keep_segments",
+                       "Keep Newest Segments (0 = all)", "live", 2, is_number=True)
+        self.add_checkbox(tab, "from_start",
+                          "Record from the beginning (single file)", "live", 3)
+        self.add_entry(tab, "poll_interval",
+                       "Premiere Check Interval (s)", "live", 4, is_number=True)
+
+    def create_subscriptions_tab(self, tab):
+        self.add_checkbox(tab, "auto_sync",
+                          "Sync subscriptions automatically", "subscriptions", 0)
+        self.add_entry(tab, "interval_minutes",
+                       "Sync Interval (minutes)", "subscriptions", 1, is_number=True)
+        self.add_entry(tab, "sync_workers",
+                       "Parallel Syncs", "subscriptions", 2, is_number=True)
+        self.add_checkbox(tab, "auto_download",
+                          "Start downloading when new uploads are found", "subscriptions", 3)
+
+    def create_logging_tab(self, tab):
+        self.add_dropdown(tab, "level", "Log Level", "logging", 0,
+                          ["DEBUG", "INFO", "WARNING", "ERROR"])
+        self.add_checkbox(tab, "ytdlp_verbose",
+                          "yt-dlp debug output (at DEBUG level)", "logging", 1)
+        self.add_checkbox(tab, "log_to_file",
+                          "Write a log file", "logging", 2)
+        self.add_entry(tab, "log_file", "Log File", "logging", 3)
+        self.add_entry(tab, "max_file_mb",
+                       "Rotate at (MB)", "logging", 4, is_number=True)
+        self.add_entry(tab, "backup_count",
+                       "Rotated Files to Keep", "logging", 5, is_number=True)
+        self.add_entry(tab, "buffer_lines",
+                       "Messages Kept for the Log Viewer", "logging", 6, is_number=True)
+
     def create_auth_tab(self, tab):
         tab.grid_columnconfigure(1, weight=1)
         
@@ -810,14 +3573,18 @@ class SettingsWindow(ctk.CTkToplevel):
     def add_list_entry(self, tab, name, text, section, row): self.add_entry(
         tab, name, text, section, row, is_list=True)
 
+    def _display_value(self, name, section_name, is_list):
+        value = self.config[section_name].get(name)
+        if is_list:
+            return ", ".join(value) if isinstance(value, list) else ""
+        if name == "theme":
+            return str(value).capitalize()
+        return value
+
     def _add_widget(self, tab, name, text, section_name, row, w_type, **kwargs):
-        section = self.config[section_name]
         ctk.CTkLabel(tab, text=text).grid(
             row=row, column=0, padx=10, pady=10, sticky="w")
-        current_value = section.get(name)
-        if kwargs.get("is_list"):
-            current_value = ", ".join(current_value) if isinstance(
-                current_value, list) else ""
+        current_value = self._display_value(name, section_name, kwargs.get("is_list"))
 
         if w_type == "checkbox":
             var = ctk.BooleanVar(value=current_value)
@@ -832,8 +3599,7 @@ class SettingsWindow(ctk.CTkToplevel):
                 ctk.CTkButton(tab, text="Browse...", width=80, command=lambda: self.browse_path(
                     var)).grid(row=row, column=2, padx=(0, 10))
         elif w_type == "dropdown":
-            var = ctk.StringVar(value=str(current_value).capitalize(
-            ) if name == "theme" else str(current_value))
+            var = ctk.StringVar(value=str(current_value))
             ctk.CTkOptionMenu(tab, variable=var, values=kwargs.get("values"), command=kwargs.get(
                 "command")).grid(row=row, column=1, padx=10, pady=10, sticky="w")
 
@@ -848,70 +3614,50 @@ class SettingsWindow(ctk.CTkToplevel):
         new_theme.lower())
 
     def run_updates(self): 
-        threading.Thread(target=self._update_dependencies, daemon=True).start()
+        self._start_pip([sys.executable, '-m', 'pip', 'install',
+                         '--upgrade', 'yt-dlp', 'customtkinter', 'Pillow', 'requests'],
+                        "Starting update check...", "Update check")
     
     def run_force_updates(self): 
-        threading.Thread(target=self._force_update_dependencies, daemon=True).start()
+        self._start_pip([sys.executable, '-m', 'pip', 'install', '--force-reinstall',
+                         '--no-cache-dir', 'yt-dlp', 'customtkinter', 'Pillow', 'requests'],
+                        "Starting FORCE update (reinstall)...", "Force update")
 
-    def _update_dependencies(self):
+    def _start_pip(self, command, header, name):
         if not self.update_log.winfo_exists():
             return
         self.update_log.delete("1.0", "end")
-        self.update_log.insert("end", "Starting update check...\n")
+        self.update_log.insert("end", f"{header}\n")
+        self.update_log.insert("end", f"Running: {' '.join(command)}\n\n")
+        self.parent.orchestrator.spawn(None, self._run_pip, command, name)
+
+    def _append_update_log(self, text):
+        if self.update_log.winfo_exists():
+            self.update_log.insert("end", text)
+            self.update_log.see("end")
+
+    def _run_pip(self, command, name):
+        """Stream pip output into the update log (worker thread)."""
         try:
-            command = [sys.executable, '-m', 'pip', 'install',
-                       '--upgrade', 'yt-dlp', 'customtkinter', 'Pillow', 'requests']
-            if self.update_log.winfo_exists():
-                self.update_log.insert(
-                    "end", f"Running: {' '.join(command)}\n\n")
-            else:
-                return
             process = subprocess.Popen(
                 command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8')
             for line in iter(process.stdout.readline, ''):
-                if not self.update_log.winfo_exists():
-                    process.kill()
-                    break
-                self.update_log.insert("end", line)
-                self.update_log.see("end")
+                self.parent.call_ui(self._append_update_log, line)
             process.stdout.close()
             return_code = process.wait()
-            if self.update_log.winfo_exists():
-                self.update_log.insert(
-                    "end", f"\n\nUpdate check finished with code: {return_code}.")
+            self.parent.call_ui(self._append_update_log, f"\n\n{name} finished with code: {return_code}.")
         except Exception as e:
-            if self.update_log.winfo_exists():
-                self.update_log.insert("end", f"\n\nAn error occurred: {e}")
-    
-    def _force_update_dependencies(self):
-        if not self.update_log.winfo_exists():
-            return
-        self.update_log.delete("1.0", "end")
-        self.update_log.insert("end", "Starting FORCE update (reinstall)...\n")
+            self.parent.call_ui(self._append_update_log, f"\n\nAn error occurred: {e}")
+
+    def _parse_number(self, name, text, previous):
+        """The number typed for a setting; invalid input keeps the previous value."""
         try:
-            command = [sys.executable, '-m', 'pip', 'install', '--force-reinstall',
-                       '--no-cache-dir', 'yt-dlp', 'customtkinter', 'Pillow', 'requests']
-            if self.update_log.winfo_exists():
-                self.update_log.insert(
-                    "end", f"Running: {' '.join(command)}\n\n")
-            else:
-                return
-            process = subprocess.Popen(
-                command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8')
-            for line in iter(process.stdout.readline, ''):
-                if not self.update_log.winfo_exists():
-                    process.kill()
-                    break
-                self.update_log.insert("end", line)
-                self.update_log.see("end")
-            process.stdout.close()
-            return_code = process.wait()
-            if self.update_log.winfo_exists():
-                self.update_log.insert(
-                    "end", f"\n\nForce update finished with code: {return_code}.")
-        except Exception as e:
-            if self.update_log.winfo_exists():
-                self.update_log.insert("end", f"\n\nAn error occurred: {e}")
+            number = float(str(text).strip())
+        except ValueError:
+            return previous
+        if not 0 <= number < float('inf'):  # Also rejects nan
+            return previous
+        return number if name in self.FRACTIONAL else int(number)
 
     def save_and_close(self):
         for name, (var, section_name, is_number, is_list) in self.vars.items():
@@ -919,7 +3665,7 @@ class SettingsWindow(ctk.CTkToplevel):
             if isinstance(var, ctk.BooleanVar):
                 value = bool(value)
             if is_number:
-                value = int(value) if str(value).isdigit() else 0
+                value = self._parse_number(name, value, self.config[section_name].get(name))
             if is_list:
                 value = [item.strip()
                          for item in value.split(',') if item.strip()]
@@ -929,29 +3675,89 @@ class SettingsWindow(ctk.CTkToplevel):
         with open(self.config_path, 'w', encoding='utf-8') as f:
             json.dump(self.config, f, indent=2, ensure_ascii=False)
         self.parent.downloader.config = self.config
+        self.parent.logs.configure(self.config)
         messagebox.showinfo(
             "Settings Saved", "Settings have been saved successfully.")
-        self.destroy()
+        self.withdraw()
 
 
 class MainWindow(ctk.CTk):
     """Main application window"""
 
-    def __init__(self):
+    logger = logging.getLogger('ytgui.app')
+    queue_logger = logging.getLogger('ytgui.queue')
+    subscription_logger = logging.getLogger('ytgui.subscriptions')
+
+    def __init__(self, startup_report=False):
         super().__init__()
-        self.downloader = YouTubeDownloader(
-            log_callback=self.log_to_gui,
-            progress_callback=self.update_progress_display,
-            postprocessor_callback=self.update_postprocessor_display
-        )
+        STARTUP.mark("tk")
+        self._init_state()
+        STARTUP.mark("state")
+        self.startup_report = startup_report  # Print the startup report and exit once warmed up
         ctk.set_appearance_mode(
             self.downloader.config["app"].get("theme", "dark"))
         self.title("YouTube Professional Downloader")
         self.geometry("1200x800")
         ctk.set_default_color_theme("blue")
+        self.setup_ui()
+        STARTUP.mark("widgets")
+        self._schedule_subscription_sync()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        if threading.current_thread() is threading.main_thread():
+            # Handled between Tk events; the orchestrator's UI pump keeps Python code running
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.call_ui(self.on_close))
+        # Idle callbacks run in order, so this one comes after the window's first drawing
+        self.after_idle(self._on_interactive)
+
+    def _on_interactive(self):
+        """The window is drawn: import and open the rest in the background."""
+        STARTUP.mark("interactive")
+        self.orchestrator.spawn(None, self._warm_up)
+
+    def _warm_up(self):
+        for module in (yt_dlp, requests, Image, sqlite3):
+            if module is not None:
+                module.warm()
+                STARTUP.mark(f"import {module._name}")
+        self.downloader.db.conn  # Opens the database and creates missing tables
+        STARTUP.mark("database")
+        self.call_ui(self._finish_startup)
+
+    def _finish_startup(self):
+        if self.shutting_down:
+            return
+        self._restore_queue_checkpoint()
+        self.logger.info("Startup:\n" + "\n".join(STARTUP.lines()))
+        if self.startup_report:
+            print("\n".join(STARTUP.lines()))
+            self.on_close()
+
+    def _init_state(self, downloader=None):
+        """Everything but the widgets: downloader, orchestrator and queue state.
+
+        benchmark.py calls this on its own to run the queue without Tk.
+        """
+        self.logs = LogPipeline()
+        self.downloader = downloader or YouTubeDownloader()
+        self.downloader.progress_callback = self.update_progress_display
+        self.downloader.postprocessor_callback = self.update_postprocessor_display
+        self.logs.configure(self.downloader.config)
+        metrics_config = self.downloader.config.get('metrics', {})
+        self.metrics_exporter = None
+        if metrics_config.get('http_port') or metrics_config.get('file'):
+            try:
+                self.metrics_exporter = MetricsExporter(
+                    METRICS, port=int(metrics_config.get('http_port') or 0), path=metrics_config.get('file') or "",
+                    interval=int(metrics_config.get('file_interval') or 15)).start()
+            except OSError as e:
+                self.logger.error(f"Cannot start the metrics endpoint: {e}")
         self.video_info = None
+        self.checkpoint_restored = False
         self.settings_window = None
         self.quality_map = {}
+        self.format_id_map = {}  # Format menu display string -> exact format_id
+        self.audio_id_map = {}  # Audio menu codec -> best matching audio format_id
+        self.format_menus = FormatMenus({})  # Menus of the fetched video
         self.video_formats = []
         self.audio_formats = []
         self.container_formats = []
@@ -960,11 +3766,111 @@ class MainWindow(ctk.CTk):
         self.current_url = None
         # Queue management
         self.download_queue = []  # List of dicts with video info and quality settings
+        self.queue_lock = threading.RLock()  # Guards download_queue while the runner picks items
+        self.current_queue_item = None
+        self.current_playlist_title = None
+        self._queue_redraw_pending = False
+        self.playlist_window = None
+        self.playlist_options_active = False
+        self.scheduler = QueueScheduler(self.downloader.config['download'].get('queue_policy', 'FIFO'))
+        download_config = self.downloader.config['download']
+        # All background work goes through the orchestrator; see Orchestrator.DEFAULT_LIMITS
+        self.orchestrator = Orchestrator(self, {"extract": download_config.get('batch_workers') or 8,
+                                                "live": self.downloader.config['live'].get('max_captures') or 2})
+        self.downloader.resource_slot = self.orchestrator.slot
+        self.enricher = EntryEnricher(self._extract_bounded, self.downloader.metadata_cache,
+                                      YouTubeDownloader.canonical_id, self.call_ui,
+                                      lambda worker: self.orchestrator.spawn(None, worker),
+                                      workers=int(download_config.get('enrich_workers') or 2),
+                                      interval=float(download_config.get('enrich_interval') or 0))
+        # Byte-weighted queue progress
+        self.throughput = ThroughputMeter()
+        self.queue_bytes_total = 0
+        self.queue_bytes_done = 0
+        self.current_item_estimate = 0
+        self.current_item_weight = 0
+        self.current_file_bytes = {}  # filename -> downloaded bytes of the current item
+        self.current_item_fraction = 0.0
+        self.show_queue_eta = False
+        self.disk_guard = None  # Set while a queue run is active
+        self.queue_status_text = ""
+        # Subscriptions
+        self.subscriptions_window = None
+        self.subscription_sync_running = False
+        # Live recordings
+        self.live_captures = []
+        self.live_window = None
+        self.log_window = None
+        self.stats_window = None
+        self.timelines = deque(maxlen=200)  # Traces of the most recently started queue items
         # Download control
         self.is_downloading = False
         self.cancel_download = False
         self.skip_current_video = False
-        self.setup_ui()
+        self.shutting_down = False
+
+    def call_ui(self, func, *args):
+        """Run func(*args) on the Tk thread; safe to call from any thread."""
+        self.orchestrator.call_ui(func, *args)
+
+    def _restore_queue_checkpoint(self):
+        """Put back the queue saved when the app was last closed."""
+        items, interrupted = self.downloader.db.take_queue_checkpoint()
+        self.checkpoint_restored = True
+        if not items:
+            return
+        self._append_queue_items(items)
+        self.progress_label.configure(text=f"Restored {len(items)} queued item(s) from the last session")
+        if interrupted:
+            # Partially downloaded files (.part/.ytdl) are continued rather than started over
+            self.after(1000, self.start_download)
+
+    def on_close(self):
+        """Window close or SIGTERM: stop taking work, bring the running item to a safe point, exit."""
+        if self.shutting_down:
+            return
+        self.shutting_down = True
+        self.orchestrator.stop_accepting()
+        self.enricher.stop()
+        for capture in self.live_captures:
+            capture.stop()  # ffmpeg finishes the current segment file
+        was_downloading = self.is_downloading
+        if was_downloading:
+            # The progress hook stops a transfer at once; post-processing is given time to finish
+            self.progress_label.configure(text="Closing: waiting for post-processing to finish..."
+                                          if self.downloader.postprocessing else "Closing: stopping the current download...")
+        timeout = float(self.downloader.config['download'].get('shutdown_timeout') or 30)
+        self._finish_shutdown(time.monotonic() + timeout, was_downloading)
+
+    def _finish_shutdown(self, deadline, was_downloading):
+        # Running background calls (a subscription sync, a batch import) may still write to the database
+        busy = (self.is_downloading or self.orchestrator.running
+                or any(not capture.finished for capture in self.live_captures))
+        if busy and time.monotonic() < deadline:
+            self.after(200, self._finish_shutdown, deadline, was_downloading)
+            return
+        if busy:
+            self.logger.warning("Background work did not finish in time; terminating child processes.")
+        if self.downloader.process_pool:
+            self.downloader.process_pool.shutdown()
+        ChildProcessReaper.terminate_children()
+        with self.queue_lock:
+            items = list(self.download_queue)
+            current = self.current_queue_item
+            if current is not None and not any(item is current for item in items):
+                items.insert(0, current)
+        if self.checkpoint_restored:  # Else closed during startup; the last checkpoint is still unread
+            self.downloader.db.save_queue_checkpoint(items, interrupted=was_downloading)
+        self.orchestrator.shutdown()
+        self.downloader.db.close()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+        self.logs.stop()
+        self.destroy()
+
+    def _extract_bounded(self, url):
+        with self.orchestrator.slot('extract'):
+            return self.downloader.get_video_info(url)
 
     def setup_ui(self):
         self.grid_columnconfigure(0, weight=1)
@@ -978,8 +3884,18 @@ class MainWindow(ctk.CTk):
         EntryContextMenu(self.url_entry)  # Add right-click context menu
         ctk.CTkButton(url_frame, text="Fetch Info", command=self.fetch_video_info).grid(
             row=0, column=1, padx=10, pady=10)
-        ctk.CTkButton(url_frame, text="Settings", command=self.open_settings).grid(
+        ctk.CTkButton(url_frame, text="Batch Import", command=self.open_batch_import).grid(
             row=0, column=2, padx=(0, 10), pady=10)
+        ctk.CTkButton(url_frame, text="Subscriptions", command=self.open_subscriptions).grid(
+            row=0, column=3, padx=(0, 10), pady=10)
+        ctk.CTkButton(url_frame, text="Live", command=self.open_live_captures, width=60).grid(
+            row=0, column=4, padx=(0, 10), pady=10)
+        ctk.CTkButton(url_frame, text="Logs", command=self.open_logs, width=60).grid(
+            row=0, column=5, padx=(0, 10), pady=10)
+        ctk.CTkButton(url_frame, text="Stats", command=self.open_stats, width=60).grid(
+            row=0, column=6, padx=(0, 10), pady=10)
+        ctk.CTkButton(url_frame, text="Settings", command=self.open_settings).grid(
+            row=0, column=7, padx=(0, 10), pady=10)
         
         # Side-by-side frame for Queue and Video Information
         content_frame = ctk.CTkFrame(self)
@@ -1006,6 +3922,22 @@ class MainWindow(ctk.CTk):
         ctk.CTkButton(queue_button_frame, text="Add to Queue", command=self.add_to_queue, width=100).pack(side="left", padx=5)
         ctk.CTkButton(queue_button_frame, text="Clear Queue", command=self.clear_queue, width=100).pack(side="left", padx=5)
         
+        # Queue ordering: scheduling policy plus manual reordering of item #N (works while running)
+        queue_order_frame = ctk.CTkFrame(queue_frame)
+        queue_order_frame.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="ew")
+        ctk.CTkLabel(queue_order_frame, text="Order:").pack(side="left", padx=(5, 0))
+        self.policy_var = ctk.StringVar(value=self.scheduler.policy)
+        ctk.CTkOptionMenu(queue_order_frame, variable=self.policy_var, values=QueueScheduler.POLICIES,
+                          command=self.on_policy_change, width=120).pack(side="left", padx=5)
+        ctk.CTkLabel(queue_order_frame, text="Item #").pack(side="left", padx=(10, 0))
+        self.queue_item_entry = ctk.CTkEntry(queue_order_frame, width=40)
+        self.queue_item_entry.pack(side="left", padx=5)
+        ctk.CTkButton(queue_order_frame, text="Up", width=40, command=lambda: self.move_queue_item(-1)).pack(side="left", padx=2)
+        ctk.CTkButton(queue_order_frame, text="Down", width=40, command=lambda: self.move_queue_item(1)).pack(side="left", padx=2)
+        ctk.CTkButton(queue_order_frame, text="Top", width=40, command=lambda: self.move_queue_item(None)).pack(side="left", padx=2)
+        ctk.CTkButton(queue_order_frame, text="Prio +", width=50, command=lambda: self.change_queue_priority(1)).pack(side="left", padx=2)
+        ctk.CTkButton(queue_order_frame, text="Prio -", width=50, command=lambda: self.change_queue_priority(-1)).pack(side="left", padx=2)
+        
         # Video Information frame (RIGHT)
         info_outer_frame = ctk.CTkFrame(content_frame)
         info_outer_frame.grid(row=0, column=1, padx=(5, 0), sticky="nsew")
@@ -1024,6 +3956,20 @@ class MainWindow(ctk.CTk):
         self.details_label = ctk.CTkLabel(
             self.info_frame, text="", font=ctk.CTkFont(size=12))
         self.details_label.grid(row=2, column=0, pady=(0, 10))
+        # Filled in by update_video_info; hidden while empty
+        self.stats_label = ctk.CTkLabel(self.info_frame, text="", font=ctk.CTkFont(size=10))
+        self.date_label = ctk.CTkLabel(self.info_frame, text="", font=ctk.CTkFont(size=10))
+        self.subtitles_label = ctk.CTkLabel(self.info_frame, text="", font=ctk.CTkFont(size=10))
+        self.tags_label = ctk.CTkLabel(self.info_frame, text="", font=ctk.CTkFont(size=10))
+        for row, label in enumerate((self.stats_label, self.date_label, self.subtitles_label, self.tags_label), 3):
+            label.grid(row=row, column=0, pady=5, sticky="w")
+            label.grid_remove()
+        self.description_label = ctk.CTkLabel(self.info_frame, text="Description:", font=ctk.CTkFont(size=11, weight="bold"))
+        self.description_label.grid(row=7, column=0, pady=(10, 5), sticky="w")
+        self.description_label.grid_remove()
+        self.description_text = ctk.CTkTextbox(self.info_frame, height=100, state="disabled")
+        self.description_text.grid(row=8, column=0, pady=(0, 10), sticky="ew")
+        self.description_text.grid_remove()
         options_frame = ctk.CTkFrame(self)
         options_frame.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
         options_frame.grid_columnconfigure((1, 3, 5), weight=1)  # Flexible columns for dropdowns
@@ -1052,6 +3998,22 @@ class MainWindow(ctk.CTk):
         self.open_browser_button = ctk.CTkButton(options_frame, text="Open in Browser", command=self._open_in_browser, width=120)
         self.open_browser_button.grid(row=0, column=7, padx=(0, 10), pady=5)
         
+        # Optional sections (clips) of a single video
+        self.sections_var = ctk.StringVar(value="")
+        ctk.CTkLabel(options_frame, text="Sections:").grid(
+            row=1, column=0, padx=10, pady=5, sticky="w")
+        sections_entry = ctk.CTkEntry(options_frame, textvariable=self.sections_var,
+                                      placeholder_text="e.g. 1:30-2:45, 1:02:00-1:05:00 (empty = whole video)")
+        sections_entry.grid(row=1, column=1, columnspan=3, padx=10, pady=5, sticky="ew")
+        EntryContextMenu(sections_entry)
+        self.chapters_button = ctk.CTkButton(options_frame, text="Chapters...", command=self.open_chapter_picker,
+                                             width=100, state="disabled")
+        self.chapters_button.grid(row=1, column=4, columnspan=2, padx=10, pady=5, sticky="w")
+        # Precise cuts re-encode around the cut points; fast cuts snap to the nearest keyframes
+        self.precise_cuts_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(options_frame, text="Precise cuts (slower)", variable=self.precise_cuts_var).grid(
+            row=1, column=6, columnspan=2, padx=(20, 10), pady=5, sticky="w")
+        
         progress_frame = ctk.CTkFrame(self)
         progress_frame.grid(row=3, column=0, padx=10, pady=10, sticky="ew")
         progress_frame.grid_columnconfigure(1, weight=1)
@@ -1092,249 +4054,193 @@ class MainWindow(ctk.CTk):
         self.title_label.configure(text="Fetching video information...")
         self.details_label.configure(text="")
         self.thumbnail_label.configure(image=None)
-        threading.Thread(target=self._fetch_info_thread,
-                         args=(url,), daemon=True).start()
+        self.orchestrator.spawn('extract', self._fetch_info_thread, url)
 
     def _fetch_info_thread(self, url):
         try:
             self.current_url = url
             # First try to detect if it's a playlist
             try:
-                playlist_info = self.downloader.get_playlist_info(url)
-                if playlist_info.get('videos') and len(playlist_info['videos']) > 1:
-                    # It's a playlist with multiple videos
-                    self.after(0, self.show_playlist_selector, playlist_info)
+                if self._stream_playlist(url):
                     return
-            except Exception:
-                # Not a playlist or error - continue with single video
-                pass
+            except Exception as e:
+                if self.downloader.is_playlist_url(url):
+                    raise  # A playlist or channel link that could not be listed: show why
+                # Extracted as a single video below, which reports its own error
+                self.logger.debug(f"Playlist probe of {url} failed: {e}")
             
             # It's a single video
-            self.video_info = self.downloader.get_video_info(url)
+            self.video_info = self.downloader.get_video_info(url, refresh=True)
             self.is_playlist_mode = False
-            self.after(0, self.update_video_info, self.video_info)
+            self.call_ui(self.update_video_info, self.video_info, FormatMenus(self.video_info.formats))
         except Exception as e:
-            self.after(0, lambda: messagebox.showerror(
+            self.call_ui(lambda: messagebox.showerror(
                 "Error", f"Failed to fetch info: {e}"))
-            self.after(0, lambda: self.title_label.configure(
+            self.call_ui(lambda: self.title_label.configure(
                 text="Failed to fetch info. Please try again."))
 
-    def update_video_info(self, info):
-        self.title_label.configure(text=info['title'])
+    def _stream_playlist(self, url, page_size=50):
+        """Open the playlist selector on the first page and feed it the rest as it loads.
+
+        Runs in the fetch thread's 'extract' slot, which is given back after the first
+        page: a long channel is enumerated by a task of its own, so other lookups are
+        not starved. Returns False if the URL is not a multi-video playlist; errors
+        before the selector opens are raised.
+        """
+        cancel_event = threading.Event()
+        pages = self.downloader.iter_playlist_info(url, page_size=page_size, cancel_event=cancel_event)
+        meta = next(pages)
+        if not meta['is_playlist']:
+            pages.close()
+            return False
+        first_page = next(pages, [])
+        if len(first_page) <= 1 and len(first_page) < page_size:
+            # A one-video playlist is handled like a single video
+            pages.close()
+            return False
+        
+        playlist_info = {'title': meta['title'], 'uploader': meta['uploader'], 'videos': first_page}
+        self.call_ui(self.show_playlist_selector, playlist_info, cancel_event)
+        try:
+            self.orchestrator.spawn(None, self._load_playlist_pages, pages)
+        except RuntimeError as e:  # Shutting down
+            pages.close()
+            self.call_ui(self._finish_playlist_loading, str(e))
+        return True
+
+    def _load_playlist_pages(self, pages):
+        """Feed the open selector the pages after the first; errors are shown there."""
+        error = None
+        try:
+            for page in pages:
+                self.call_ui(self._deliver_playlist_page, page)
+        except Exception as e:
+            error = str(e)
+            self.logger.warning(f"Playlist enumeration stopped: {e}")
+        finally:
+            pages.close()
+        self.call_ui(self._finish_playlist_loading, error)
+
+    def _deliver_playlist_page(self, page):
+        if self.playlist_window is not None and self.playlist_window.winfo_exists():
+            self.playlist_window.add_videos(page)
+
+    def _finish_playlist_loading(self, error=None):
+        if self.playlist_window is not None and self.playlist_window.winfo_exists():
+            self.playlist_window.finish_loading(error)
+
+    def open_chapter_picker(self):
+        if self.video_info and self.video_info.chapters:
+            ChapterPickerWindow(self, self.video_info.chapters).focus()
+
+    def update_video_info(self, info, menus=None):
+        """Show a fetched video; menus (FormatMenus) is built by the caller's thread if it can."""
+        menus = menus or FormatMenus(info.formats)
+        self.playlist_options_active = False
+        self.sections_var.set("")
+        self.chapters_button.configure(state="normal" if info.chapters else "disabled")
+        self.title_label.configure(text=info.title)
         self.details_label.configure(
-            text=f"Uploader: {info.get('uploader', 'N/A')} | Duration: {time.strftime('%H:%M:%S', time.gmtime(info.get('duration', 0)))}")
-        
-        # Clear and rebuild info frame with all available info
-        for widget in self.info_frame.winfo_children():
-            if widget != self.thumbnail_label and widget != self.title_label and widget != self.details_label:
-                widget.destroy()
-        
-        # Add extended info sections below details
-        row = 3
-        
-        # Stats section
-        views = info.get('views')
-        likes = info.get('likes')
-        if views or likes:
-            stats_text = ""
-            if views:
-                stats_text += f"Views: {views:,}"
-            if likes:
-                stats_text += f" | Likes: {likes:,}"
-            if stats_text:
-                ctk.CTkLabel(self.info_frame, text=stats_text, font=ctk.CTkFont(size=10)).grid(
-                    row=row, column=0, pady=5, sticky="w")
-                row += 1
-        
-        # Upload date
-        upload_date = info.get('upload_date')
-        if upload_date:
-            try:
-                formatted_date = f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:8]}"
-                ctk.CTkLabel(self.info_frame, text=f"Uploaded: {formatted_date}", font=ctk.CTkFont(size=10)).grid(
-                    row=row, column=0, pady=5, sticky="w")
-                row += 1
-            except:
-                pass
+            text=f"Uploader: {info.uploader or 'N/A'} | Duration: {time.strftime('%H:%M:%S', time.gmtime(info.duration or 0))}")
+        
+        # Extended info below the details; the labels are reused, empty ones hidden
+        stats_text = ""
+        if views := info.views:
+            stats_text += f"Views: {views:,}"
+        if likes := info.likes:
+            stats_text += f" | Likes: {likes:,}"
+        upload_date = info.upload_date or ""
+        date_text = f"Uploaded: {upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:8]}" if len(upload_date) == 8 else ""
+        subtitles_text = tags_text = ""
+        if subtitles := info.subtitles:
+            subtitles_text = f"Subtitles: {', '.join(subtitles[:5])}" + (f" +{len(subtitles)-5} more" if len(subtitles) > 5 else "")
+        if tags := info.tags:
+            tags_text = f"Tags: {', '.join(tags)}" + (f" +{info.tag_count-len(tags)} more" if info.tag_count > len(tags) else "")
+        for label, text in ((self.stats_label, stats_text), (self.date_label, date_text),
+                            (self.subtitles_label, subtitles_text), (self.tags_label, tags_text)):
+            label.configure(text=text)
+            if text:
+                label.grid()
+            else:
+                label.grid_remove()
+        
+        self.description_text.configure(state="normal")
+        self.description_text.delete("1.0", "end")
+        if info.description:
+            self.description_text.insert("1.0", info.description)
+            self.description_label.grid()
+            self.description_text.grid()
+        else:
+            self.description_label.grid_remove()
+            self.description_text.grid_remove()
+        self.description_text.configure(state="disabled")
         
-        # Subtitles
-        subtitles = info.get('subtitles', [])
-        if subtitles:
-            sub_text = f"Subtitles: {', '.join(subtitles[:5])}"
-            if len(subtitles) > 5:
-                sub_text += f" +{len(subtitles)-5} more"
-            ctk.CTkLabel(self.info_frame, text=sub_text, font=ctk.CTkFont(size=10)).grid(
-                row=row, column=0, pady=5, sticky="w")
-            row += 1
-        
-        # Tags
-        tags = info.get('tags', [])
-        if tags:
-            tags_text = f"Tags: {', '.join(tags[:5])}"
-            if len(tags) > 5:
-                tags_text += f" +{len(tags)-5} more"
-            ctk.CTkLabel(self.info_frame, text=tags_text, font=ctk.CTkFont(size=10)).grid(
-                row=row, column=0, pady=5, sticky="w")
-            row += 1
-        
-        # Description
-        description = info.get('description')
-        if description:
-            desc_label = ctk.CTkLabel(self.info_frame, text="Description:", font=ctk.CTkFont(size=11, weight="bold"))
-            desc_label.grid(row=row, column=0, pady=(10, 5), sticky="w")
-            row += 1
-            
-            desc_text = ctk.CTkTextbox(self.info_frame, height=100, state="disabled")
-            desc_text.grid(row=row, column=0, pady=(0, 10), sticky="ew")
-            desc_text.configure(state="normal")
-            desc_text.insert("1.0", description[:500] + ("..." if len(description) > 500 else ""))
-            desc_text.configure(state="disabled")
-            row += 1
-        
-        unique_formats = {}
-        self.quality_map = {}
         # Store video formats for later use
-        self.video_formats = info['formats'].get('video', [])
-        self.audio_formats = info['formats'].get('audio', [])
-        self.container_formats = info['formats'].get('formats', ['mp4'])
-        
-        sorted_formats = sorted(self.video_formats, key=lambda f: (int(f.get(
-            'resolution', '0x0').split('x')[1]), int(f.get('fps', 0) or 0)), reverse=True)
-        for f in sorted_formats:
-            res = f.get('resolution')
-            height = res.split('x')[1]
-            if not res:
-                continue
-            display_key = f"{height}p"
-            if (fps := f.get('fps')) and fps > 30:
-                display_key += str(fps)
-            if (note := f.get('format_note')) and note and "hdr" in note.lower():
-                display_key += " (HDR)"
-            if display_key not in unique_formats:
-                unique_formats[display_key] = height
-        self.quality_map = unique_formats
-        self.quality_map["Audio Only"] = "audio"
+        self.format_menus = menus
+        self.video_formats = menus.video_formats
+        self.audio_formats = menus.audio_formats
+        self.container_formats = menus.container_formats
+        self.quality_map = menus.quality_map
         self.quality_menu.configure(values=list(self.quality_map.keys()), command=self.on_quality_change)
-        default_quality = next((q for q in ["1080p", "720p"] if q in self.quality_map), list(
-            self.quality_map.keys())[0])
-        self.quality_var.set(default_quality)
-        # Build audio format options
-        audio_options = ["best"]
-        if self.audio_formats:
-            seen_codecs = set()
-            for audio in sorted(self.audio_formats, key=lambda a: a.get('abr') or 0, reverse=True):
-                codec = audio.get('acodec', 'unknown')
-                if codec not in seen_codecs:
-                    audio_options.append(codec)
-                    seen_codecs.add(codec)
-        self.audio_menu.configure(values=audio_options)
+        self.quality_var.set(menus.default_quality)
+        self.audio_id_map = menus.audio_id_map
+        self.audio_menu.configure(values=menus.audio_options)
         self.audio_var.set("best")
         # Set initial format options based on current quality
-        self.on_quality_change(default_quality)
-        if info['thumbnail']:
-            threading.Thread(target=self._load_thumbnail, args=(
-                info['thumbnail'],), daemon=True).start()
+        self.on_quality_change(menus.default_quality)
+        if info.thumbnail:
+            self.orchestrator.spawn('thumbnail', self._load_thumbnail, info.thumbnail)
 
     def on_quality_change(self, selected_quality):
         """Update format options based on selected quality - called when quality selection changes."""
-        if selected_quality == "Audio Only":
-            # For audio, show audio format options
-            audio_formats = ["best", "mp3", "aac", "opus", "wav", "flac"]
-            
-            # Add codecs from actual audio tracks if available
-            if self.audio_formats:
-                seen_codecs = set()
-                for audio in sorted(self.audio_formats, key=lambda a: a.get('abr') or 0, reverse=True):
-                    codec = audio.get('acodec', 'unknown')
-                    abr = audio.get('abr', 0)
-                    # Create display string with bitrate if available
-                    if codec not in seen_codecs and codec != 'opus' and codec not in ['best', 'mp3', 'aac', 'opus', 'wav', 'flac']:
-                        if abr:
-                            display = f"{codec} ({abr}kbps)"
-                        else:
-                            display = codec
-                        audio_formats.append(display)
-                        seen_codecs.add(codec)
-            
-            self.format_menu.configure(values=audio_formats)
-            # Set default to 'best' for audio
-            self.format_var.set("best" if "best" in audio_formats else audio_formats[0])
-            
-        else:
-            # For video, show all available video format variants for the selected quality
-            selected_height = self.quality_map.get(selected_quality)
-            video_format_options = []
-            
-            if selected_height and selected_height != "audio":
-                # Find all formats matching the selected quality
-                seen_codecs = {}  # Track by codec to avoid duplicates
-                
-                for fmt in self.video_formats:
-                    res = fmt.get('resolution', '')
-                    if not res:
-                        continue
-                    height = res.split('x')[1] if 'x' in res else '0'
-                    
-                    # Match the selected quality height
-                    if height == selected_height:
-                        codec = fmt.get('vcodec', 'unknown')
-                        fps = fmt.get('fps', 0)
-                        filesize = fmt.get('filesize', 0)
-                        
-                        # Create a descriptive display string
-                        size_str = f"{filesize / (1024*1024):.1f}MB" if filesize else "unknown size"
-                        
-                        if fps and fps > 30:
-                            display = f"{codec} @ {int(fps)}fps ({size_str})"
-                        else:
-                            display = f"{codec} ({size_str})"
-                        
-                        # Only add if we haven't seen this exact codec yet
-                        if codec not in seen_codecs:
-                            video_format_options.append(display)
-                            seen_codecs[codec] = True
-            
-            # If no specific formats found, use container formats as fallback
-            if not video_format_options:
-                video_format_options = self.container_formats if self.container_formats else ['mp4', 'mkv', 'webm']
-            
-            self.format_menu.configure(values=video_format_options)
-            self.format_var.set(video_format_options[0] if video_format_options else 'mp4')
+        values, id_map, default = self.format_menus.options_for(selected_quality)
+        self.format_id_map = id_map
+        self.format_menu.configure(values=values)
+        self.format_var.set(default)
 
     def _load_thumbnail(self, url):
         if Image is None:
-            self.log_to_gui("PIL/Pillow not available. Skipping thumbnail.")
+            self.logger.warning("PIL/Pillow not available. Skipping thumbnail.")
             return
         
         try:
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            img = Image.open(BytesIO(response.content))
-            max_width = 700
-            w_percent = (max_width / float(img.size[0]))
-            h_size = int((float(img.size[1]) * float(w_percent)))
-            img = img.resize((max_width, h_size), Image.Resampling.LANCZOS)
-            photo = ctk.CTkImage(
-                light_image=img, dark_image=img, size=img.size)
-            self.after(0, self.thumbnail_label.configure,
+            with METRICS.span('load_thumbnail'):
+                response = requests.get(url, stream=True)
+                response.raise_for_status()
+                img = Image.open(BytesIO(response.content))
+                max_width = 700
+                w_percent = (max_width / float(img.size[0]))
+                h_size = int((float(img.size[1]) * float(w_percent)))
+                img = img.resize((max_width, h_size), Image.Resampling.LANCZOS)
+                photo = ctk.CTkImage(
+                    light_image=img, dark_image=img, size=img.size)
+            self.call_ui(self.thumbnail_label.configure,
                        {"image": photo, "text": ""})
         except Exception as e:
-            self.log_to_gui(f"Failed to load thumbnail: {e}")
+            self.logger.warning(f"Failed to load thumbnail: {e}")
 
-    def show_playlist_selector(self, playlist_info):
+    def show_playlist_selector(self, playlist_info, cancel_event=None):
         """Display the playlist selector window."""
-        playlist_window = PlaylistSelectorWindow(self, playlist_info)
-        playlist_window.focus()
-        # Wait for window to close and check if videos were selected
-        self.wait_window(playlist_window)
-        if self.is_playlist_mode and self.selected_playlist_videos:
+        self.current_playlist_title = playlist_info['title']
+        self.playlist_window = PlaylistSelectorWindow(self, playlist_info, cancel_event)
+        self.playlist_window.focus()
+
+    def on_playlist_selector_closed(self, playlist_window):
+        """Queue what was selected once the selector is closed.
+
+        Not a wait_window in show_playlist_selector: that runs as a call_ui callback,
+        and page delivery and lookups for the open selector come through call_ui too.
+        """
+        if self.playlist_window is playlist_window:
+            self.playlist_window = None
+        playlist_info = playlist_window.playlist_info
+        if self.is_playlist_mode and playlist_window.queued_indexes:
             self.title_label.configure(text=f"Playlist: {playlist_info['title']}")
             self.details_label.configure(
-                text=f"Selected {len(self.selected_playlist_videos)} video(s) from {len(playlist_info['videos'])} total")
-            # Enable quality selection menus for playlist
-            self._setup_playlist_quality_options()
-            # Auto-add selected videos to queue
-            self._auto_add_playlist_to_queue()
+                text=f"Selected {len(playlist_window.queued_indexes)} video(s) from {len(playlist_info['videos'])} total")
+            # Add the videos that were not already queued while the playlist was loading
+            if self.selected_playlist_videos:
+                self.queue_playlist_videos(self.selected_playlist_videos)
 
     def _setup_playlist_quality_options(self):
         """Setup quality/format/audio options for playlist downloads with default values."""
@@ -1352,29 +4258,47 @@ class MainWindow(ctk.CTk):
         audio_options = ["best", "aac", "mp3", "opus"]
         self.audio_menu.configure(values=audio_options, command=lambda a: self._on_playlist_options_change())
         self.audio_var.set("best")
+        self.playlist_options_active = True
 
-    def _auto_add_playlist_to_queue(self):
-        """Automatically add selected playlist videos to queue."""
-        if not self.is_playlist_mode or not self.selected_playlist_videos:
-            return
-        
-        # Clear existing queue items for playlist
-        self.download_queue.clear()
+    def queue_playlist_videos(self, videos):
+        """Add playlist videos to the queue with the playlist quality settings."""
+        if not self.playlist_options_active:
+            # Enable quality selection menus for playlist
+            self.is_playlist_mode = True
+            self._setup_playlist_quality_options()
         
         quality = self.quality_var.get()
         format_choice = self.format_var.get()
         audio = self.audio_var.get()
         
-        for video in self.selected_playlist_videos:
+        items = []
+        for video in videos:
+            item_quality = video.get('quality') or quality
+            item_format = format_choice
+            if (item_quality == "Audio Only") != (quality == "Audio Only"):
+                # A per-video override across audio/video cannot reuse the playlist's format
+                item_format = "best" if item_quality == "Audio Only" else "mp4"
             queue_item = {
                 'title': video['title'],
                 'url': video['url'],
-                'quality': quality,
-                'format': format_choice,
+                'quality': item_quality,
+                'format': item_format,
                 'audio': audio,
-                'duration': video.get('duration', 0)
+                'duration': video.get('duration', 0),
+                'priority': 0,
+                'group': self.current_playlist_title
             }
-            self.download_queue.append(queue_item)
+            if video.get('quality'):
+                queue_item['quality_override'] = True  # Kept when the playlist menus change
+            if video.get('live_status') in LiveCapture.LIVE_STATUSES:
+                queue_item['live_status'] = video['live_status']
+            self._estimate_queue_item(queue_item, video.get('formats'))
+            queue_item['queued_at'] = time.time()
+            items.append(queue_item)
+        with self.queue_lock:
+            self.download_queue.extend(items)
+        # Entries the selector has not looked up yet get their real formats in the background
+        self._enrich_queue_items([item for item, video in zip(items, videos) if not video.get('formats')])
         
         self.update_queue_display()
     
@@ -1413,7 +4337,11 @@ class MainWindow(ctk.CTk):
         self._update_queue_quality()
     
     def _update_queue_quality(self):
-        """Update all queue items with current quality/format/audio settings."""
+        """Apply the playlist quality/format/audio menus to the current playlist's queue items.
+
+        Other items (single videos, batch imports, subscriptions, restored items) and
+        playlist videos given their own quality in the selector keep their settings.
+        """
         if not self.is_playlist_mode or not self.download_queue:
             return
         
@@ -1421,17 +4349,277 @@ class MainWindow(ctk.CTk):
         format_choice = self.format_var.get()
         audio = self.audio_var.get()
         
-        # Update all items in queue with new settings
-        for item in self.download_queue:
-            item['quality'] = quality
-            item['format'] = format_choice
-            item['audio'] = audio
+        with self.queue_lock:
+            for item in self.download_queue:
+                if item.get('group') != self.current_playlist_title or item.get('quality_override'):
+                    continue
+                item['quality'] = quality
+                item['format'] = format_choice
+                item['audio'] = audio
+                info = self.downloader.metadata_cache.get(YouTubeDownloader.canonical_id(item['url']))
+                self._estimate_queue_item(item, info.formats if info else None)
+        
+        self.update_queue_display()
+
+    def open_batch_import(self):
+        BatchImportWindow(self).focus()
+
+    def import_batch(self, lines, quality, format_choice, progress_callback=None, cancel_event=None):
+        """Resolve many URLs in parallel and stream them into the queue as they arrive.
+
+        Runs in a background thread. URLs are deduplicated by canonical video ID, both within
+        the batch and against the queue; playlist/channel links are expanded into their videos.
+        """
+        with self.queue_lock:
+            seen = {YouTubeDownloader.canonical_id(item['url']) for item in self.download_queue}
+        urls = []
+        duplicates = 0
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith(('#', ';', ']')):
+                continue
+            if re.fullmatch(r'[A-Za-z0-9_-]{11}', line):
+                line = f"https://www.youtube.com/watch?v={line}"
+            key = YouTubeDownloader.canonical_id(line)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            urls.append(line)
         
+        stats = {'total': len(urls), 'resolved': 0, 'added': 0, 'failed': 0, 'duplicates': duplicates}
+        # Parallelism is bounded by the orchestrator's extract slots (download.batch_workers)
+        with self.orchestrator.group() as group:
+            for url in urls:
+                group.spawn('extract', self._resolve_batch_url, url, cancel_event)
+            for future in group.as_completed():
+                if cancel_event and cancel_event.is_set():
+                    group.cancel()
+                    break
+                try:
+                    videos = future.result()
+                except Exception as e:
+                    stats['failed'] += 1
+                    self.queue_logger.warning(f"Batch import: failed to resolve URL: {e}")
+                else:
+                    stats['resolved'] += 1
+                    items = []
+                    for video in videos:
+                        key = YouTubeDownloader.canonical_id(video['url'])
+                        # Playlist expansions can repeat videos already in the batch
+                        if video.get('expanded') and key in seen:
+                            stats['duplicates'] += 1
+                            continue
+                        seen.add(key)
+                        items.append(self._make_batch_item(video, quality, format_choice))
+                    stats['added'] += len(items)
+                    self.call_ui(self._append_queue_items, items)
+                if progress_callback:
+                    progress_callback(dict(stats))
+        return stats
+
+    def _resolve_batch_url(self, url, cancel_event=None):
+        """Fetch metadata for one batch line (worker thread); returns a list of video dicts."""
+        if cancel_event and cancel_event.is_set():
+            return []
+        if YouTubeDownloader.is_playlist_url(url):
+            playlist_info = self.downloader.get_playlist_info(url)
+            return [dict(video, uploader=playlist_info.get('uploader'), group=playlist_info.get('title'), expanded=True)
+                    for video in playlist_info['videos']]
+        info = self.downloader.get_video_info(url)
+        return [{'title': info.title or url, 'url': url, 'duration': info.duration,
+                 'uploader': info.uploader, 'group': info.uploader, 'formats': info.formats,
+                 'live_status': info.live_status}]
+
+    def _make_batch_item(self, video, quality, format_choice):
+        queue_item = {
+            'title': video.get('title') or video['url'],
+            'url': video['url'],
+            'quality': quality,
+            'format': format_choice,
+            'audio': "best",
+            'duration': video.get('duration') or 0,
+            'priority': 0,
+            'group': video.get('group')
+        }
+        if video.get('live_status') in LiveCapture.LIVE_STATUSES:
+            queue_item['live_status'] = video['live_status']
+        return self._estimate_queue_item(queue_item, video.get('formats'))
+
+    def _append_queue_items(self, items):
+        """Add items on the Tk thread, redrawing the queue at most a few times per second."""
+        for item in items:
+            item.setdefault('queued_at', time.time())
+        with self.queue_lock:
+            self.download_queue.extend(items)
+        self._enrich_queue_items(items)
+        self._schedule_queue_redraw()
+
+    def _schedule_queue_redraw(self):
+        if not self._queue_redraw_pending:
+            self._queue_redraw_pending = True
+            self.after(250, self._flush_queue_redraw)
+
+    def _flush_queue_redraw(self):
+        self._queue_redraw_pending = False
         self.update_queue_display()
 
+    def _enrich_queue_items(self, items):
+        """Look up the real formats of queue items that were sized from typical bitrates."""
+        for item in items:
+            if item.get('format_id') or item.get('audio_format_id'):
+                continue  # Exact picks were made (and sized) from the fetched formats
+            self.enricher.request(item['url'], lambda info, item=item: self._apply_item_info(item, info), queued=True)
+
+    def _apply_item_info(self, queue_item, info):
+        if info.live_status in LiveCapture.LIVE_STATUSES:
+            queue_item['live_status'] = info.live_status
+        if info.duration:
+            queue_item['duration'] = info.duration
+        self._estimate_queue_item(queue_item, info.formats)
+        self._schedule_queue_redraw()
+
+    def open_logs(self):
+        if self.log_window is None or not self.log_window.winfo_exists():
+            self.log_window = LogWindow(self)
+        self.log_window.focus()
+
+    def open_stats(self):
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            self.stats_window = StatsWindow(self)
+        self.stats_window.focus()
+
+    def open_live_captures(self):
+        if self.live_window is None or not self.live_window.winfo_exists():
+            self.live_window = LiveCapturesWindow(self)
+        self.live_window.focus()
+
+    def start_live_capture(self, url, title, from_start=None):
+        """Record a live stream or premiere in a live slot, outside the download queue."""
+        config = self.downloader.config
+        live_config = config['live']
+        save_path = Path(config['download']['save_path']).expanduser()
+        capture = LiveCapture(
+            url, title, save_path / "Live",
+            segment_minutes=int(live_config.get('segment_minutes') or 60),
+            keep_segments=int(live_config.get('keep_segments') or 0),
+            from_start=live_config.get('from_start', False) if from_start is None else from_start,
+            poll_interval=int(live_config.get('poll_interval') or 60),
+            ydl_options=self._network_options(),
+            disk_guard=DiskSpaceGuard(save_path, int(config['download'].get('min_free_space_mb') or 0) * 1024 * 1024,
+                                      check_interval=int(config['download'].get('disk_check_interval') or 15)),
+            log=self.downloader.log)
+        self.live_captures.append(capture)
+        self.orchestrator.spawn('live', capture.run)
+        return capture
+
+    def _network_options(self):
+        """The proxy/cookie/header part of the yt-dlp options."""
+        config = self.downloader.config
+        http_headers = self.downloader.get_http_headers(config)
+        return {
+            'proxy': config['network']['proxy_url'] if config['network']['use_proxy'] else None,
+            'socket_timeout': config['network']['socket_timeout'],
+            'cookiesfrombrowser': (config['authentication']['cookie_browser'],) if config['authentication']['use_cookies'] else None,
+            'http_headers': http_headers if http_headers else {},
+        }
+
+    def open_subscriptions(self):
+        if self.subscriptions_window is None or not self.subscriptions_window.winfo_exists():
+            self.subscriptions_window = SubscriptionsWindow(self)
+        self.subscriptions_window.focus()
+
+    def subscribe(self, url, quality, format_choice, on_done=None):
+        """Follow a channel/playlist; the first sync only records its current uploads."""
+        # Channel upload tabs list newest first, so syncs can stop at the first known video.
+        # Regular playlists may be in any order and are always walked fully.
+        newest_first = 'list=' not in url
+        subscription_id = self.downloader.db.add_subscription(url, quality, format_choice, newest_first)
+        self.sync_subscriptions([subscription_id], on_done=on_done)
+
+    def _schedule_subscription_sync(self):
+        settings = self.downloader.config['subscriptions']
+        if settings.get('auto_sync'):
+            interval = max(1, int(settings.get('interval_minutes') or 60))
+            self.after(interval * 60 * 1000, self._run_scheduled_sync)
+
+    def _run_scheduled_sync(self):
+        if self.shutting_down:
+            return
+        self.sync_subscriptions(auto_download=self.downloader.config['subscriptions'].get('auto_download'))
+        self._schedule_subscription_sync()
+
+    def sync_subscriptions(self, subscription_ids=None, on_done=None, auto_download=False):
+        """Check subscriptions for new uploads in the background and queue them."""
+        if self.subscription_sync_running:
+            if on_done:
+                on_done("A sync is already running")
+            return
+        self.subscription_sync_running = True
+        self.orchestrator.spawn(None, self._sync_subscriptions_worker, subscription_ids, on_done, auto_download)
+
+    def _sync_subscriptions_worker(self, subscription_ids, on_done, auto_download):
+        summary = "Subscription sync failed (see log)"
+        try:
+            subscriptions = self.downloader.db.get_subscriptions(enabled_only=True)
+            if subscription_ids is not None:
+                subscriptions = [sub for sub in subscriptions if sub['id'] in subscription_ids]
+            with self.queue_lock:
+                queued = {YouTubeDownloader.canonical_id(item['url']) for item in self.download_queue}
+            added = failed = 0
+            workers = max(1, int(self.downloader.config['subscriptions'].get('sync_workers') or 4))
+            with self.orchestrator.group(limit=workers) as group:
+                futures = {group.spawn('extract', self._sync_subscription, sub): sub for sub in subscriptions}
+                for future in group.as_completed():
+                    try:
+                        videos = future.result()
+                    except Exception as e:
+                        failed += 1
+                        self.subscription_logger.error(f"Sync failed for {futures[future]['url']}: {e}")
+                        continue
+                    items = []
+                    for video in videos:
+                        key = YouTubeDownloader.canonical_id(video['url'])
+                        if key not in queued:
+                            queued.add(key)
+                            items.append(self._make_batch_item(video, video['quality'], video['format']))
+                    added += len(items)
+                    if items:
+                        self.call_ui(self._append_queue_items, items)
+            summary = f"Checked {len(subscriptions)} subscription(s): {added} new video(s) queued"
+            if failed:
+                summary += f", {failed} failed (see log)"
+            self.subscription_logger.info(summary)
+            if added and auto_download:
+                self.call_ui(self._start_queue_if_idle)
+        finally:
+            self.subscription_sync_running = False
+        if on_done:
+            self.call_ui(on_done, summary)
+
+    def _sync_subscription(self, sub):
+        """Fetch uploads newer than what was seen last time (worker thread)."""
+        db = self.downloader.db
+        known_ids = db.get_seen_ids(sub['id'])
+        meta, entries = self.downloader.fetch_new_entries(sub['url'], known_ids, bool(sub['newest_first']))
+        db.record_subscription_sync(sub['id'], meta.get('title'), [YouTubeDownloader.entry_key(entry) for entry in entries],
+                                    prune=bool(sub['newest_first']))
+        if not known_ids:
+            return []  # First sync is the baseline: nothing already published gets queued
+        title = meta.get('title') or sub['title']
+        # Oldest new upload first, so the queue follows publishing order
+        return [dict(entry, group=title, quality=sub['quality'], format=sub['format'])
+                for entry in reversed(entries)]
+
+    def _start_queue_if_idle(self):
+        if not self.is_downloading and self.download_queue:
+            self.start_download()
+
     def open_settings(self):
         if self.settings_window is None or not self.settings_window.winfo_exists():
             self.settings_window = SettingsWindow(self)
+        else:
+            self.settings_window.show()
         self.settings_window.focus()
 
     def _open_in_browser(self):
@@ -1448,52 +4636,159 @@ class MainWindow(ctk.CTk):
                 messagebox.showerror("Error", "No playlist videos selected.")
                 return
             
-            quality = self.quality_var.get()
-            format_choice = self.format_var.get()
-            audio = self.audio_var.get()
-            
-            for video in self.selected_playlist_videos:
-                queue_item = {
-                    'title': video['title'],
-                    'url': video['url'],
-                    'quality': quality,
-                    'format': format_choice,
-                    'audio': audio,
-                    'duration': video.get('duration', 0)
-                }
-                self.download_queue.append(queue_item)
-            
+            self.queue_playlist_videos(self.selected_playlist_videos)
             messagebox.showinfo("Success", f"Added {len(self.selected_playlist_videos)} video(s) to queue.")
         else:
             # Add single video with current quality settings
             if not self.video_info:
                 messagebox.showerror("Error", "Please fetch video info first.")
                 return
+            if self.video_info.live_status in LiveCapture.LIVE_STATUSES:
+                # A live stream would hold the queue indefinitely; it gets its own slot
+                if messagebox.askyesno("Live Stream", "This is a live stream or upcoming premiere.\n"
+                                                      "Record it in a live slot instead of the queue?"):
+                    self.start_live_capture(self.url_entry.get().strip(), self.video_info.title)
+                    self.open_live_captures()
+                return
+            
+            try:
+                sections = Sections.parse(self.sections_var.get())
+            except ValueError as e:
+                messagebox.showerror("Invalid Sections", str(e))
+                return
             
             quality = self.quality_var.get()
             format_choice = self.format_var.get()
             audio = self.audio_var.get()
             
             queue_item = {
-                'title': self.video_info.get('title', 'Unknown'),
+                'title': self.video_info.title or 'Unknown',
                 'url': self.url_entry.get().strip(),
                 'quality': quality,
                 'format': format_choice,
                 'audio': audio,
-                'duration': self.video_info.get('duration', 0)
+                'duration': self.video_info.duration or 0,
+                'priority': 0,
+                'group': self.video_info.uploader
             }
-            self.download_queue.append(queue_item)
+            queue_item.update(self._selected_format_ids())
+            if sections:
+                queue_item['sections'] = sections
+                queue_item['precise_cuts'] = self.precise_cuts_var.get()
+            self._estimate_queue_item(queue_item, {'video': self.video_formats, 'audio': self.audio_formats})
+            queue_item['queued_at'] = time.time()
+            with self.queue_lock:
+                self.download_queue.append(queue_item)
             messagebox.showinfo("Success", "Video added to queue.")
         
         self.update_queue_display()
 
+    def _estimate_queue_item(self, queue_item, formats=None):
+        """Attach a projected download size in bytes to a queue item.
+
+        formats is the parsed format dict of the item's video; without it the size
+        comes from typical bitrates for the requested quality.
+        """
+        height = self._quality_height(queue_item['quality'])
+        duration = queue_item.get('duration') or 0
+        video_formats = (formats or {}).get('video', [])
+        audio_formats = (formats or {}).get('audio', [])
+        video_format = audio_format = None
+        if queue_item.get('format_id'):
+            video_format = next((f for f in video_formats if f.get('format_id') == queue_item['format_id']), None)
+        elif height and height != "audio":
+            # No exact pick: assume the largest stream at the highest available height up to
+            # the requested one, as bestvideo[height<=N] would
+            heights = [(f, self._format_height(f)) for f in video_formats]
+            top = max((h for f, h in heights if h and h <= int(height)), default=None)
+            candidates = [f for f, h in heights if top and h == top]
+            video_format = max(candidates, key=lambda f: SizeEstimator.format_bytes(f, duration) or 0, default=None)
+        if queue_item.get('audio_format_id'):
+            audio_format = next((a for a in audio_formats if a.get('format_id') == queue_item['audio_format_id']), None)
+        elif audio_formats:
+            audio_format = max(audio_formats, key=lambda a: a.get('abr') or 0)
+        queue_item['estimated_bytes'] = SizeEstimator.estimate(height, duration, video_format, audio_format)
+        if queue_item.get('sections') and queue_item['estimated_bytes'] and duration:
+            # Only the sections are transferred (plus a little up to the surrounding keyframes)
+            share = min(Sections.total(queue_item['sections'], duration) / duration, 1)
+            queue_item['estimated_bytes'] = int(queue_item['estimated_bytes'] * share)
+        return queue_item
+
+    @staticmethod
+    def _format_height(fmt):
+        """Height in pixels from a parsed format's resolution ("1920x1080"), or None."""
+        height = (fmt.get('resolution') or '').rpartition('x')[2]
+        return int(height) if height.isdigit() else None
+
+    def _selected_format_ids(self):
+        """Resolve the current menu selections to the exact format IDs parsed from the video."""
+        selected_format = self.format_var.get()
+        format_id = self.format_id_map.get(selected_format)
+        vcodec = None
+        if self.quality_var.get() == "Audio Only":
+            # An exact audio stream picked in the format menu wins over the audio menu
+            audio_format_id = format_id or self.audio_id_map.get(self.audio_var.get())
+            return {'format_id': None, 'audio_format_id': audio_format_id, 'vcodec': None}
+        if format_id:
+            vcodec = next((f.get('vcodec') for f in self.video_formats if f.get('format_id') == format_id), None)
+        audio_format_id = self.audio_id_map.get(self.audio_var.get())
+        return {'format_id': format_id, 'audio_format_id': audio_format_id, 'vcodec': vcodec}
+
+    def on_policy_change(self, policy):
+        """Switch the queue scheduling policy; applies to the next item picked."""
+        self.scheduler.policy = policy
+        self.downloader.config['download']['queue_policy'] = policy
+        self.update_queue_display()
+
+    def _selected_queue_index(self):
+        """Index into download_queue of the item number typed next to the reorder buttons.
+
+        Called without queue_lock held: the error dialogs are modal, and the runner needs the lock.
+        """
+        try:
+            index = int(self.queue_item_entry.get().strip()) - 1
+        except ValueError:
+            messagebox.showerror("Error", "Enter the number of a queued item.")
+            return None
+        if not 0 <= index < len(self.download_queue):
+            messagebox.showerror("Error", f"There is no item #{index + 1} in the queue.")
+            return None
+        return index
+
+    def move_queue_item(self, offset):
+        """Move queue item #N up/down by offset, or to the top when offset is None."""
+        index = self._selected_queue_index()
+        if index is None:
+            return
+        with self.queue_lock:
+            if index >= len(self.download_queue):
+                return  # The runner took items since the number was checked
+            new_index = 0 if offset is None else max(0, min(len(self.download_queue) - 1, index + offset))
+            self.download_queue.insert(new_index, self.download_queue.pop(index))
+        self.queue_item_entry.delete(0, "end")
+        self.queue_item_entry.insert(0, str(new_index + 1))
+        self.update_queue_display()
+
+    def change_queue_priority(self, delta):
+        """Raise or lower the priority of queue item #N (used by the Priority policy)."""
+        index = self._selected_queue_index()
+        if index is None:
+            return
+        with self.queue_lock:
+            if index >= len(self.download_queue):
+                return  # The runner took items since the number was checked
+            item = self.download_queue[index]
+            item['priority'] = item.get('priority', 0) + delta
+        self.update_queue_display()
+
     def clear_queue(self):
         """Clear all items from the download queue."""
         if not self.download_queue:
             messagebox.showwarning("Queue Empty", "Queue is already empty.")
             return
         
-        self.download_queue.clear()
+        with self.queue_lock:
+            self.download_queue.clear()
         self.update_queue_display()
         messagebox.showinfo("Queue Cleared", "All items removed from queue.")
 
@@ -1502,14 +4797,32 @@ class MainWindow(ctk.CTk):
         self.queue_display.configure(state="normal")
         self.queue_display.delete("1.0", "end")
         
+        if self.current_queue_item:
+            self.queue_display.insert("end", f"Now downloading: {self.current_queue_item['title'][:50]}\n\n")
         if not self.download_queue:
             self.queue_display.insert("end", "Queue is empty")
         else:
+            known_sizes = [item['estimated_bytes'] for item in self.download_queue if item.get('estimated_bytes')]
+            total_text = f"~{self.format_bytes(sum(known_sizes))}" if known_sizes else "unknown"
+            if known_sizes and len(known_sizes) < len(self.download_queue):
+                total_text += f" (+{len(self.download_queue) - len(known_sizes)} unknown)"
+            self.queue_display.insert("end", f"{len(self.download_queue)} item(s) | Projected size: {total_text}\n\n")
             for idx, item in enumerate(self.download_queue, 1):
                 duration_str = time.strftime('%H:%M:%S', time.gmtime(item.get('duration', 0)))
+                size_str = f"~{self.format_bytes(item['estimated_bytes'])}" if item.get('estimated_bytes') else "unknown"
                 text = f"{idx}. {item['title'][:50]}\n"
                 text += f"   Quality: {item['quality']} | Format: {item['format']} | Audio: {item['audio']}\n"
-                text += f"   Duration: {duration_str}\n\n"
+                text += f"   Duration: {duration_str} | Size: {size_str}"
+                if item.get('priority'):
+                    text += f" | Priority: {item['priority']}"
+                if item.get('sections'):
+                    text += f"\n   Clip: {Sections.format(item['sections'][:1])}"
+                    if len(item['sections']) > 1:
+                        text += f" (+{len(item['sections']) - 1} more)"
+                    text += " | Precise cuts" if item.get('precise_cuts') else " | Fast cuts"
+                if item.get('attempts'):
+                    text += f" | Retry {item['attempts']} ({item.get('last_error')})"
+                text += "\n\n"
                 self.queue_display.insert("end", text)
         
         self.queue_display.configure(state="disabled")
@@ -1544,99 +4857,325 @@ class MainWindow(ctk.CTk):
         self.per_video_progress_bar.set(0)
         self.progress_label.configure(text="Starting queue download...")
         self.per_video_label.configure(text="")
-        threading.Thread(target=self.download_from_queue, daemon=True).start()
+        self.orchestrator.spawn(None, self.download_from_queue)
 
     def download_from_queue(self):
         """Download all items from the queue with their respective quality settings."""
-        total_items = len(self.download_queue)
-        
-        for idx, queue_item in enumerate(self.download_queue):
-            if self.cancel_download:
-                self.after(0, lambda: (
-                    self.progress_label.configure(text="Download cancelled by user"),
-                    self.cancel_button.configure(state="disabled"),
-                    self.skip_button.configure(state="disabled")
-                ))
-                break
-            
-            # Update overall queue progress
-            queue_progress = idx / total_items
-            self.after(0, lambda q=queue_progress: self.progress_bar.set(q))
+        config = self.downloader.config
+        # The runner picks straight from download_queue, so items can be added or reordered mid-run
+        pending = self.download_queue
+        self.queue_bytes_done = 0
+        self.throughput = ThroughputMeter()
+        self.scheduler.served = {}
+        self.disk_guard = DiskSpaceGuard(
+            Path(config['download']['save_path']).expanduser(),
+            reserve_bytes=int(config['download'].get('min_free_space_mb') or 0) * 1024 * 1024,
+            check_interval=int(config['download'].get('disk_check_interval') or 15))
+        self.retry_policy = RetryPolicy(max_attempts=int(config['download'].get('queue_retries') or 0),
+                                        base_delay=int(config['download'].get('retry_base_delay') or 10))
+        started = 0
+        succeeded = 0
+        failures = []  # (title, category, message) of items that will not be retried
+        run_started = time.time()
+        
+        try:
+            while pending:
+                if self.shutting_down:
+                    break
+                if self.cancel_download:
+                    self.call_ui(lambda: (
+                        self.progress_label.configure(text="Download cancelled by user"),
+                        self.cancel_button.configure(state="disabled"),
+                        self.skip_button.configure(state="disabled")
+                    ))
+                    break
             
-            # Temporarily set quality/format/audio vars for this item
-            self.quality_var.set(queue_item['quality'])
-            self.format_var.set(queue_item['format'])
-            self.audio_var.set(queue_item['audio'])
+                queue_item, weight = self._admit_next_item(pending)
+                if queue_item is None:
+                    continue  # Cancelled while paused for disk space, or the queue was emptied
+                total_items = started + 1 + len(pending)
+                if queue_item.get('live_status') in LiveCapture.LIVE_STATUSES:
+                    # Recorded in a live slot; the queue moves on instead of waiting for the stream to end
+                    self.queue_logger.info(f"{queue_item['title']} is live, recording it outside the queue.")
+                    self.call_ui(self.start_live_capture, queue_item['url'], queue_item['title'])
+                    self.call_ui(self.update_queue_display)
+                    continue
+                started += 1
+                self.scheduler.mark_started(queue_item)
+                # Time spent waiting while the queue was running (not before Start was pressed)
+                METRICS.observe('queue_wait_seconds', time.time() - max(queue_item.get('queued_at') or 0, run_started))
+                self.current_queue_item = queue_item
+                self.call_ui(self.update_queue_display)
             
-            self.skip_current_video = False
-            self.after(0, lambda i=idx, t=total_items, title=queue_item['title']: 
-                      self.progress_label.configure(text=f"Downloading ({i+1}/{t}): {title[:50]}..."))
-            self.after(0, lambda: self.per_video_label.configure(text=""))
-            self.after(0, lambda: self.per_video_progress_bar.set(0))
-            self.after(0, lambda: self.skip_button.configure(state="normal"))
+                # Update overall queue progress
+                self.current_item_estimate = queue_item.get('estimated_bytes')
+                self.current_item_weight = weight
+                self.current_item_fraction = 0.0
+                self.current_file_bytes = {}
             
-            # Build options with current queue item settings
-            options = self._build_download_options()
-            result = self.downloader.download(queue_item['url'], options)
+                # Temporarily set quality/format/audio vars for this item
+                self.quality_var.set(queue_item['quality'])
+                self.format_var.set(queue_item['format'])
+                self.audio_var.set(queue_item['audio'])
             
-            if self.skip_current_video:
-                self.after(0, lambda i=idx, t=total_items: 
-                          self.progress_label.configure(text=f"Skipped. Continuing ({i+2}/{t})..."))
                 self.skip_current_video = False
-                continue
+                self.queue_status_text = f"Downloading ({started}/{total_items}): {queue_item['title'][:50]}..."
+                if queue_item.get('attempts'):
+                    self.queue_status_text += f" (retry {queue_item['attempts']})"
+                self.call_ui(self._refresh_overall_progress)
+                self.call_ui(lambda: self.per_video_label.configure(text=""))
+                self.call_ui(lambda: self.per_video_progress_bar.set(0))
+                self.call_ui(lambda: self.skip_button.configure(state="normal"))
             
-            if result['status'] == 'error':
-                self.after(0, lambda title=queue_item['title'], err=result['message']: 
-                          messagebox.showerror("Download Error", f"Failed to download {title}: {err}"))
+                # Build options with current queue item settings
+                options = self._build_download_options(queue_item)
+                timeline = Timeline(queue_item['title'] + (f" (retry {queue_item['attempts']})" if queue_item.get('attempts') else ""),
+                                    queued_at=max(queue_item.get('queued_at') or 0, run_started))
+                self.timelines.append(timeline)
+                slot_requested = time.time()
+                with self.orchestrator.slot('download'):
+                    timeline.complete('waiting for a download slot', 'queue', slot_requested, time.time())
+                    result = self.downloader.download(queue_item['url'], options, timeline=timeline)
+                timeline.close(result['status'])
+                self.current_item_fraction = 0.0
+            
+                if self.shutting_down and result['status'] == 'error':
+                    # Interrupted by closing: keep it first in line for the checkpoint, not a failure
+                    with self.queue_lock:
+                        pending.insert(0, queue_item)
+                        self.current_queue_item = None
+                    break
+                self.current_queue_item = None
+            
+                if self.disk_guard.low_space and result['status'] == 'error':
+                    # Stopped mid-transfer to keep the disk from filling up; the .part file resumes later
+                    self.queue_logger.warning(f"Free space fell below the reserve while downloading {queue_item['title']}, re-queued.")
+                    with self.queue_lock:
+                        pending.insert(0, queue_item)
+                    started -= 1
+                    self.call_ui(self.update_queue_display)
+                    continue
+            
+                if self.skip_current_video:
+                    self.queue_bytes_done += weight
+                    self.call_ui(lambda i=started, t=total_items: 
+                              self.progress_label.configure(text=f"Skipped. Continuing ({i+1}/{t})..."))
+                    self.skip_current_video = False
+                    self.call_ui(self.update_queue_display)
+                    continue
+            
+                if result['status'] == 'error':
+                    if self._handle_failed_item(queue_item, result, failures):
+                        started -= 1  # Re-queued at the back; it will be counted again when it runs
+                        self.call_ui(self.update_queue_display)
+                        continue
+                else:
+                    succeeded += 1
+                self.queue_bytes_done += weight
+                self.call_ui(self.update_queue_display)
         
-        self.is_downloading = False
-        self.after(0, lambda: (
+        finally:
+            # Also when an item raised: a runner left marked as downloading would block the next Start
+            self.is_downloading = False
+            self.disk_guard = None
+            self.current_queue_item = None
+            if not self.shutting_down:
+                self.call_ui(lambda: (self.cancel_button.configure(state="disabled"),
+                                      self.skip_button.configure(state="disabled")))
+        if self.shutting_down:
+            return
+        if self.cancel_download:
+            self.call_ui(self.update_queue_display)
+            return
+        if failures:
+            # One summary at the end instead of a blocking dialog per failed item
+            summary = "\n".join(f"- {title[:50]}: {category}" for title, category, _ in failures[:15])
+            if len(failures) > 15:
+                summary += f"\n... and {len(failures) - 15} more (see the failures table in downloads.db)"
+            self.call_ui(lambda: messagebox.showwarning(
+                "Some Downloads Failed", f"{len(failures)} item(s) could not be downloaded:\n\n{summary}"))
+        self.call_ui(lambda: (
             self.progress_label.configure(text="Queue download completed!"),
-            messagebox.showinfo("Success", f"Downloaded {total_items} item(s) from queue!"),
+            messagebox.showinfo("Success", f"Downloaded {succeeded} item(s) from queue!"),
             self.progress_bar.set(0),
             self.per_video_progress_bar.set(0),
             self.per_video_label.configure(text=""),
             self.cancel_button.configure(state="disabled"),
             self.skip_button.configure(state="disabled"),
-            self.clear_queue()
+            self.update_queue_display()
         ))
 
+    def _handle_failed_item(self, queue_item, result, failures):
+        """Re-queue retryable failures with backoff and record every failure in the database.
+
+        Returns True if the item went back into the queue.
+        """
+        category = result.get('category') or RetryPolicy.classify(result['message'])
+        queue_item['attempts'] = queue_item.get('attempts', 0) + 1
+        queue_item['last_error'] = category
+        retry = self.retry_policy.should_retry(category, queue_item['attempts'])
+        try:
+            self.downloader.db.add_failure(queue_item['url'], queue_item['title'], category, result['message'],
+                                           queue_item['attempts'], final=not retry)
+        except sqlite3.Error as e:
+            self.queue_logger.error(f"Could not record failure: {e}")
+        METRICS.inc('queue_failures_total', category=category, final=str(not retry).lower())
+        if not retry:
+            self.queue_logger.error(f"Giving up on {queue_item['title']} ({category}): {result['message']}")
+            failures.append((queue_item['title'], category, result['message']))
+            return False
+        delay = self.retry_policy.delay(category, queue_item['attempts'])
+        queue_item['not_before'] = time.time() + delay
+        queue_item['queued_at'] = queue_item['not_before']
+        METRICS.inc('queue_retries_total', category=category)
+        with self.queue_lock:
+            self.download_queue.append(queue_item)
+        self.queue_logger.warning(f"{queue_item['title']} failed ({category}), retry {queue_item['attempts']}/"
+                            f"{self.retry_policy.max_attempts} in {delay:.0f}s")
+        return True
+
+    def _disk_requirement(self, queue_item):
+        """Projected peak disk usage of a queue item, post-processing copies included."""
+        config = self.downloader.config
+        height = self._quality_height(queue_item['quality'])
+        quality_is_audio = height == "audio"
+        remuxes = (not quality_is_audio and not self._is_exact_pick(queue_item)
+                   and queue_item['format'] not in ['mp4', 'mkv', 'webm'])
+        rewrites = (quality_is_audio or remuxes or config['post-processing']['extract_audio']
+                    or config['metadata']['embed_thumbnail'] or config['metadata']['embed_subtitles']
+                    or config['post-processing']['use_sponsorblock'])
+        return DiskSpaceGuard.required_bytes(queue_item.get('estimated_bytes'), merges=not quality_is_audio,
+                                             rewrites=rewrites, keep_video=config['output']['keep_video'])
+
+    def _admit_next_item(self, pending):
+        """Take the first pending item that fits on disk, pausing while none does.
+
+        Returns (item, weight) with the item removed from pending, or (None, None).
+        """
+        while not self.cancel_download and not self.shutting_down:
+            available = self.disk_guard.free_bytes() - self.disk_guard.reserve_bytes
+            with self.queue_lock:
+                ordered = self.scheduler.order(pending)
+            if not ordered:
+                return None, None
+            # Items waiting out a retry backoff are skipped until their time comes
+            now = time.time()
+            ready = [item for item in ordered if item.get('not_before', 0) <= now]
+            if not ready:
+                wait = min(item['not_before'] for item in ordered) - now
+                self.call_ui(lambda w=wait, n=len(ordered): self.progress_label.configure(
+                    text=f"Waiting {w:.0f}s before retrying {n} failed item(s)..."))
+                time.sleep(min(wait, 1.0))
+                continue
+            ordered = ready
+            requirements = [(item, self._disk_requirement(item)) for item in ordered]
+            item = next((item for item, required in requirements if required <= available), None)
+            if item is not None:
+                weight = self._claim_item(pending, item)
+                if weight is None:
+                    continue  # Removed or cleared while we were deciding; pick again
+                if item is not ordered[0]:
+                    self.queue_logger.info(f"Not enough disk space for {ordered[0]['title']}, downloading {item['title']} first.")
+                self.disk_guard.low_space = False
+                self.disk_guard.last_check = time.monotonic()
+                return item, weight
+            # Nothing fits: wait for the user to free space (or cancel), re-checking periodically
+            needed = min(required for _, required in requirements)
+            self.call_ui(lambda n=needed, a=max(available, 0): self.progress_label.configure(
+                text=f"Paused: waiting for disk space (next item needs ~{self.format_bytes(n)}, "
+                     f"{self.format_bytes(a)} usable). Free up space or cancel."))
+            # In short steps, so Cancel and closing the app are noticed at once
+            resume = time.monotonic() + self.disk_guard.check_interval
+            while time.monotonic() < resume and not self.cancel_download and not self.shutting_down:
+                time.sleep(min(resume - time.monotonic(), 1.0))
+        return None, None
+
+    def _claim_item(self, pending, queue_item):
+        """Remove queue_item from pending and return its progress weight, or None if it is gone.
+
+        One locked step, so Clear Queue or a reorder between picking and taking the item is harmless.
+        """
+        with self.queue_lock:
+            index = next((i for i, item in enumerate(pending) if item is queue_item), None)
+            if index is None:
+                return None
+            # Weight each item by its projected size; unknown sizes count as the average known size
+            known_sizes = [item['estimated_bytes'] for item in pending if item.get('estimated_bytes')]
+            default_weight = sum(known_sizes) / len(known_sizes) if known_sizes else 1
+            self.queue_bytes_total = self.queue_bytes_done + sum(
+                item.get('estimated_bytes') or default_weight for item in pending)
+            self.show_queue_eta = bool(known_sizes)
+            del pending[index]
+            return queue_item.get('estimated_bytes') or default_weight
+
     def download_playlist(self):
         """Download all selected videos from the playlist."""
         for idx, video in enumerate(self.selected_playlist_videos):
-            self.after(0, lambda v=video, i=idx: self.progress_label.configure(
+            self.call_ui(lambda v=video, i=idx: self.progress_label.configure(
                 text=f"Downloading {i+1}/{len(self.selected_playlist_videos)}: {v['title'][:40]}..."))
             
             options = self._build_download_options()
             result = self.downloader.download(video['url'], options)
             
             if result['status'] == 'error':
-                self.after(0, lambda v=video, err=result['message']: messagebox.showerror(
+                self.call_ui(lambda v=video, err=result['message']: messagebox.showerror(
                     "Download Error", f"Failed to download {v['title']}: {err}"))
         
-        self.after(0, lambda: (
+        self.call_ui(lambda: (
             self.progress_label.configure(text="Playlist download completed!"),
             messagebox.showinfo("Success", f"Downloaded {len(self.selected_playlist_videos)} video(s)"),
             self.progress_bar.set(0)
         ))
 
-    def _build_download_options(self):
+    def _quality_height(self, quality_name):
+        """Map a quality menu entry to a height string ("1080") or "audio"."""
+        if quality_name == "Audio Only":
+            return "audio"
+        # Entries built from the fetched video are in quality_map; playlist/batch items use
+        # the standard names ("720p"), which parse the same way as "1080p60 (HDR)"
+        if quality_name in self.quality_map:
+            return self.quality_map[quality_name]
+        match = re.match(r'(\d+)p', quality_name or "")
+        return match.group(1) if match else "720"
+
+    def _is_exact_pick(self, queue_item):
+        """Whether the item's format choice names an exact stream rather than a container/codec."""
+        # Display strings like "vp9 (12.3MB)" name an exact stream, not a container
+        return bool(queue_item and (queue_item.get('format_id') or queue_item.get('audio_format_id'))
+                    and queue_item['format'] not in ['best', 'mp3', 'aac', 'opus', 'wav', 'flac',
+                                                     'mp4', 'mkv', 'webm', 'avi', 'flv'])
+
+    def _build_format_spec(self, height, queue_item=None):
+        """Build a yt-dlp format spec from the exact format IDs of a queue item.
+
+        Falls back to the same codec family, then to a plain height filter, so an item
+        still downloads if its format IDs disappeared since the info was fetched.
+        """
+        queue_item = queue_item or {}
+        video_id = queue_item.get('format_id')
+        audio_id = queue_item.get('audio_format_id')
+        if height == "audio":
+            return f'{audio_id}/bestaudio/best' if audio_id else 'bestaudio/best'
+        
+        audio_spec = audio_id or 'bestaudio'
+        chain = []
+        if video_id:
+            chain.append(f'{video_id}+{audio_spec}')
+            if audio_id:
+                chain.append(f'{video_id}+bestaudio')
+            if vcodec := queue_item.get('vcodec'):
+                # e.g. 'avc1.640028' -> 'avc1' so a re-encoded variant of the same codec still matches
+                codec_family = vcodec.split('.')[0]
+                chain.append(f'bestvideo[height<={height}][vcodec^={codec_family}]+bestaudio')
+        chain.append(f'bestvideo[height<={height}]+bestaudio')
+        chain.append(f'best[height<={height}]')
+        chain.append('best')
+        return '/'.join(chain)
+
+    @PROFILER.profiled('options')
+    def _build_download_options(self, queue_item=None):
         config = self.downloader.config
-        # For playlist mode, quality_map might not be populated, so we handle it differently
-        if self.is_playlist_mode:
-            # Map standard quality names to height values
-            quality_name = self.quality_var.get()
-            quality_map_playlist = {
-                "1080p": "1080",
-                "720p": "720",
-                "480p": "480",
-                "360p": "360",
-                "240p": "240",
-                "Audio Only": "audio"
-            }
-            height = quality_map_playlist.get(quality_name, "720")
-        else:
-            height = self.quality_map.get(self.quality_var.get())
+        height = self._quality_height(queue_item['quality'] if queue_item else self.quality_var.get())
         
         quality_is_audio = (height == "audio")
         save_path = Path(config['download']['save_path']).expanduser()
@@ -1647,7 +5186,7 @@ class MainWindow(ctk.CTk):
         
         # Build the full yt-dlp options dictionary from the config
         options = {
-            'verbose': True,
+            'verbose': config.get('logging', {}).get('ytdlp_verbose', False),
             'outtmpl': str(save_path / config['download']['filename_template']),
             'retries': config['download']['retries'], 'fragment_retries': config['download']['fragment_retries'],
             'concurrent_fragment_downloads': config['download']['concurrent_fragment_downloads'],
@@ -1670,16 +5209,18 @@ class MainWindow(ctk.CTk):
         # Handle Post Processors
         postprocessors = []
         # Get selected audio format
-        selected_audio = self.audio_var.get()
-        selected_format = self.format_var.get()
+        selected_format = queue_item['format'] if queue_item else self.format_var.get()
+        is_exact_pick = self._is_exact_pick(queue_item)
+        options['format'] = self._build_format_spec(height, queue_item)
         
         # FFmpegExtractAudio must be first if used
         if quality_is_audio or config['post-processing']['extract_audio']:
-            options[
-                'format'] = 'bestaudio/best' if quality_is_audio else f'bestvideo[height<={height}]+bestaudio/best'
             # Determine audio codec
-            if selected_format == "best":
+            if selected_format == "best" or (is_exact_pick and not quality_is_audio):
                 audio_codec = config['post-processing']['audio_format']
+            elif is_exact_pick:
+                # Keep the picked stream as-is instead of re-encoding it
+                audio_codec = "best"
             elif selected_format == "mp3":
                 audio_codec = "mp3"
             else:
@@ -1687,9 +5228,10 @@ class MainWindow(ctk.CTk):
             postprocessors.append(
                 {'key': 'FFmpegExtractAudio', 'preferredcodec': audio_codec, 'preferredquality': config['post-processing']['audio_quality']})
         else:  # Video or Video+Audio
-            options['format'] = f'bestvideo[height<={height}]+bestaudio/best'
             # Add FFmpeg remuxing for format conversion (only for video)
-            if selected_format and selected_format not in ['mp4', 'mkv', 'webm']:
+            if is_exact_pick:
+                pass  # Let yt-dlp pick a container that fits the exact streams
+            elif selected_format and selected_format not in ['mp4', 'mkv', 'webm']:
                 postprocessors.append({'key': 'FFmpegVideoRemuxer', 'preferedformat': selected_format})
             else:
                 options['merge_output_format'] = selected_format
@@ -1705,7 +5247,20 @@ class MainWindow(ctk.CTk):
                 {'key': 'ModifyChapters', 'remove_sponsor_segments': config['post-processing']['sponsorblock_mark']})
 
         options['postprocessors'] = postprocessors
-        self.downloader.log(f"DEBUG: Using options: {options}")
+        
+        if queue_item and queue_item.get('sections'):
+            options['section_ranges'] = queue_item['sections']
+            options['force_keyframes_at_cuts'] = bool(queue_item.get('precise_cuts'))
+            # Name each clip after its range so sections of one video do not overwrite each other
+            template = config['download']['filename_template']
+            stem, dot, extension = template.rpartition('.')
+            if dot and extension == '%(ext)s':
+                template = f"{stem} %(section_start)d-%(section_end)d.%(ext)s"
+            options['outtmpl'] = str(save_path / template)
+        if self.queue_logger.isEnabledFor(logging.DEBUG):
+            self.queue_logger.debug(f"Options for {queue_item['title'] if queue_item else self.current_url}: "
+                                    f"format {options['format']}, template {options['outtmpl']}, "
+                                    f"postprocessors {[pp['key'] for pp in postprocessors]}")
         return options
 
     def format_bytes(self, bytes_val):
@@ -1725,7 +5280,50 @@ class MainWindow(ctk.CTk):
         secs = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
     
+    def _refresh_overall_progress(self):
+        """Show byte-weighted queue progress and an ETA based on measured throughput."""
+        if not self.is_downloading or not self.queue_bytes_total:
+            return
+        done = self.queue_bytes_done + self.current_item_fraction * self.current_item_weight
+        self.progress_bar.set(min(done / self.queue_bytes_total, 1.0))
+        text = self.queue_status_text
+        if self.show_queue_eta:
+            rate = self.throughput.rate()
+            remaining = max(self.queue_bytes_total - done, 0)
+            eta_str = self.format_time(remaining / rate) if rate else "N/A"
+            text += f" | {self.format_bytes(done)} of ~{self.format_bytes(self.queue_bytes_total)} | Queue ETA {eta_str}"
+        self.progress_label.configure(text=text)
+
+    def _track_item_bytes(self, d):
+        """Account downloaded bytes of the current item (runs in the download thread)."""
+        filename = d.get('filename')
+        downloaded = float(d.get('downloaded_bytes') or 0)
+        previous = self.current_file_bytes.get(filename, 0)
+        self.current_file_bytes[filename] = downloaded
+        if downloaded > previous:
+            self.throughput.add(downloaded - previous)
+        item_bytes = sum(self.current_file_bytes.values())
+        if self.current_item_estimate:
+            # Real sizes drift from estimates; never report an item done before it finishes
+            self.current_item_fraction = min(item_bytes / self.current_item_estimate, 0.99)
+        else:
+            total_bytes = float(d.get('total_bytes') or d.get('total_bytes_estimate') or 0)
+            if total_bytes > 0:
+                self.current_item_fraction = min(downloaded / total_bytes, 0.99)
+
     def update_progress_display(self, d):
+        if self.shutting_down:
+            # Stop the transfer; the .part file and the checkpointed queue resume it next start
+            raise ShutdownRequested("The application is closing")
+        if d['status'] == 'downloading' and self.disk_guard and not self.disk_guard.periodic_check():
+            # Abort before the disk fills up; yt-dlp keeps the .part file for resuming
+            raise DiskSpaceLowError("Free disk space fell below the configured minimum")
+        if d['status'] == 'downloading':
+            try:
+                self._track_item_bytes(d)
+            except (ValueError, TypeError):
+                pass
+        
         def _update_gui():
             if d['status'] == 'downloading':
                 try:
@@ -1750,12 +5348,13 @@ class MainWindow(ctk.CTk):
                         # Terminal-style progress info
                         progress_text = f"[download] {percent*100:5.1f}% of {total_formatted:>10} at {speed_mbps:>6.2f}MiB/s ETA {eta_str}"
                         self.per_video_label.configure(text=progress_text)
+                        self._refresh_overall_progress()
                 except (ValueError, TypeError):
                     pass
             elif d['status'] == 'finished':
                 self.per_video_label.configure(text="Download finished, post-processing...")
                 self.per_video_progress_bar.set(1.0)
-        self.after(0, _update_gui)
+        self.call_ui(_update_gui)
 
     def update_postprocessor_display(self, d):
         def _update_gui():
@@ -1766,11 +5365,34 @@ class MainWindow(ctk.CTk):
                 self.per_video_label.configure(
                     text="Post-processing completed!")
                 self.per_video_progress_bar.set(1.0)
-        self.after(0, _update_gui)
+        self.call_ui(_update_gui)
 
-    def log_to_gui(self, message): print(message)
+    def log_to_gui(self, message): self.logger.info(message)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YouTube downloader GUI built on yt-dlp.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Sample every thread's stack while the app runs and save them as collapsed stacks")
+    parser.add_argument('--profile-stage', action='append', choices=StageProfiler.STAGES, default=[],
+                        help="Also run this stage under cProfile (repeatable)")
+    parser.add_argument('--profile-interval', type=float, default=5, metavar="MS", help="Sampling interval (default: 5)")
+    parser.add_argument('--profile-dir', default="profiles", help="Where profile sessions are saved (default: profiles)")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="Print how long each startup phase took, then exit")
+    args = parser.parse_args(argv)
+
+    session = None
+    if args.profile or args.profile_stage:
+        session = ProfileSession(args.profile_dir, "gui", args.profile, args.profile_stage,
+                                 args.profile_interval / 1000).start()
+    try:
+        app = MainWindow(startup_report=args.startup_report)
+        app.mainloop()
+    finally:
+        if session:
+            print(f"Profile saved to {session.close()}")
 
 
 if __name__ == "__main__":
-    app = MainWindow()
-    app.mainloop()
+    main()
@@ -0,0 +1,486 @@
+# -*- coding: utf-8 -*-
+"""Offline benchmarks for Youtube_GUI.py (no network, no display).
+
+A local HTTP server serves synthetic media: a direct file, an HLS and a DASH stream
+split into fragments, and an RSS feed used as a playlist, all of which yt-dlp's
+generic extractor understands. Each scenario drives the real code against it in a
+fresh process, so CPU time and peak memory belong to that scenario alone:
+
+    python benchmark.py                          # run every scenario and print a report
+    python benchmark.py --save baseline.json     # keep the results
+    python benchmark.py --compare baseline.json  # exit 1 if something got slower than --threshold
+
+Scenarios:
+    direct, hls, dash   YouTubeDownloader.download of each media kind
+    playlist            YouTubeDownloader.get_playlist_info on the RSS feed
+    queue               MainWindow.download_from_queue over a mix of all three kinds,
+                        with the UI updates dropped (see HeadlessQueue)
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import resource  # Unix only; without it CPU time excludes child processes and RSS is not reported
+except ImportError:
+    resource = None
+
+SCENARIOS = ("direct", "hls", "dash", "playlist", "queue")
+
+# Holds the test-only yt-dlp plugins ('fake:' URLs); kept out of the repository root so
+# the app itself never loads them
+TEST_PLUGINS = Path(__file__).parent / "loadtest"
+
+# Metric -> True if larger is better; compared against the baseline with --compare
+COMPARED = {"throughput_mbps": True, "items_per_s": True, "p50_s": False, "p95_s": False,
+            "cpu_s": False, "peak_rss_mb": False}
+
+
+# ============================================================================
+# SYNTHETIC MEDIA AND SERVER
+# ============================================================================
+
+class MediaLibrary:
+    """Writes the synthetic files into a directory; contents are random but seeded."""
+
+    def __init__(self, root, file_mb=20, fragments=40, fragment_kb=256, playlist_size=500, seed=1):
+        self.root = Path(root)
+        self.file_mb = file_mb
+        self.fragments = fragments
+        self.fragment_kb = fragment_kb
+        self.playlist_size = playlist_size
+        self.random = random.Random(seed)
+
+    def _random_bytes(self, size):
+        return self.random.getrandbits(size * 8).to_bytes(size, 'little')
+
+    def build(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / "direct.mp4").write_bytes(self._random_bytes(self.file_mb * 1024 * 1024))
+        self._build_hls()
+        self._build_dash()
+        self._build_feed()
+        return self
+
+    def _build_hls(self):
+        hls = self.root / "hls"
+        hls.mkdir(exist_ok=True)
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:4", "#EXT-X-MEDIA-SEQUENCE:0"]
+        for index in range(self.fragments):
+            (hls / f"seg{index}.ts").write_bytes(self._random_bytes(self.fragment_kb * 1024))
+            lines += ["#EXTINF:4.0,", f"seg{index}.ts"]
+        lines.append("#EXT-X-ENDLIST")
+        (hls / "stream.m3u8").write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+    def _build_dash(self):
+        dash = self.root / "dash"
+        dash.mkdir(exist_ok=True)
+        (dash / "init.mp4").write_bytes(self._random_bytes(1024))
+        segments = []
+        for index in range(self.fragments):
+            (dash / f"seg{index}.m4s").write_bytes(self._random_bytes(self.fragment_kb * 1024))
+            segments.append(f'<SegmentURL media="seg{index}.m4s"/>')
+        # One muxed representation, so no ffmpeg merge is needed
+        (dash / "stream.mpd").write_text(f"""<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" minBufferTime="PT2S"
+     mediaPresentationDuration="PT{self.fragments * 4}S" profiles="urn:mpeg:dash:profile:isoff-main:2011">
+  <Period>
+    <AdaptationSet mimeType="video/mp4" contentType="video">
+      <Representation id="muxed" bandwidth="{self.fragment_kb * 8 * 1024 // 4}" width="1280" height="720"
+                      codecs="avc1.64001f,mp4a.40.2">
+        <SegmentList timescale="1" duration="4">
+          <Initialization sourceURL="init.mp4"/>
+          {''.join(segments)}
+        </SegmentList>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+""", encoding='utf-8')
+
+    def _build_feed(self):
+        items = "".join(
+            f"<item><title>Video {index}</title><link>http://example.invalid/{index}</link>"
+            f"<enclosure url=\"direct.mp4?item={index}\" type=\"video/mp4\" length=\"0\"/></item>"
+            for index in range(self.playlist_size))
+        (self.root / "feed.rss").write_text(
+            f'<?xml version="1.0"?><rss version="2.0"><channel><title>Benchmark feed</title>'
+            f'<link>http://example.invalid/</link>{items}</channel></rss>', encoding='utf-8')
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static files; 'direct-7.mp4' serves 'direct.mp4', so each queue item gets its own video ID."""
+
+    def translate_path(self, path):
+        return super().translate_path(re.sub(r'-\d+(\.\w+)(?=$|\?)', r'\1', path))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MediaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # yt-dlp's generic extractor reads the start of a file and hangs up; that is expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(root):
+    server = MediaServer(('127.0.0.1', 0), partial(QuietHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, name="media-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ============================================================================
+# SCENARIOS (run in a child process each)
+# ============================================================================
+
+def benchmark_config(G, save_path, mode):
+    """The app's default config with everything that needs ffmpeg or the network turned off."""
+    config = copy.deepcopy(G.DEFAULT_CONFIG)
+    config['download'].update(save_path=str(save_path), min_free_space_mb=0, queue_retries=0)
+    config['output'].update(writethumbnail=False)
+    config['subtitles'].update(writesubtitles=False, writeautomaticsub=False)
+    config['metadata'].update(embed_metadata=False, embed_thumbnail=False, embed_subtitles=False)
+    config['post-processing'].update(use_sponsorblock=False, extract_audio=False)
+    config['performance'].update(execution_mode=mode)
+    config['logging'].update(level="WARNING")
+    return config
+
+
+def make_headless_queue(G):
+    class Value:
+        def __init__(self, value=""):
+            self.value = value
+        def get(self):
+            return self.value
+        def set(self, value):
+            self.value = value
+
+    class HeadlessQueue(G.MainWindow):
+        """MainWindow's queue runner without Tk: state only, UI updates are dropped."""
+
+        def __init__(self, downloader):
+            # Tk is never initialized, so every attribute the runner reads must be set here
+            self._init_state(downloader)
+            self.quality_var, self.format_var, self.audio_var = Value(), Value(), Value()
+
+        def call_ui(self, func, *args):
+            pass
+
+        def after(self, ms, func=None, *args):
+            pass
+
+    return HeadlessQueue
+
+
+def measure(warmup, run, finish):
+    """Run warmup(), then time run() -> (latencies, bytes, entries) with CPU time and peak RSS.
+
+    finish() stops worker processes before CPU time is read, so theirs is included
+    (in processes mode that also counts the warmup done in those workers).
+    """
+    warmup()
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    latencies, size, entries = run()
+    wall = time.perf_counter() - started
+    finish()
+    result = {
+        'items': len(latencies),
+        'wall_s': round(wall, 3),
+        'p50_s': round(statistics.median(latencies), 4) if latencies else None,
+        'p95_s': round(_percentile(latencies, 0.95), 4) if latencies else None,
+        'throughput_mbps': round(size / wall / (1024 * 1024), 2) if size else None,
+        'items_per_s': round(entries / wall, 1) if entries else None,
+        'cpu_s': round(_cpu_seconds() - cpu_before, 3),
+        'peak_rss_mb': None,
+    }
+    if resource:
+        peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)  # Largest worker process
+        # Kilobytes on Linux, bytes on macOS
+        result['peak_rss_mb'] = round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    return result
+
+
+def _cpu_seconds():
+    if not resource:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def import_gui():
+    """Import Youtube_GUI from this checkout, with the test plugins on sys.path before yt-dlp loads."""
+    for path in (TEST_PLUGINS, Path(__file__).parent):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+    import Youtube_GUI
+    return Youtube_GUI
+
+
+def start_profile(args, label):
+    """ProfileSession of Youtube_GUI for this child if --profile or --profile-stage was given."""
+    if not (args.profile or args.profile_stage):
+        return None
+    G = import_gui()
+    return G.ProfileSession(args.profile_dir, label, args.profile, args.profile_stage).start()
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', action='store_true',
+                        help="Save collapsed stacks of each scenario (sampling adds some overhead to the results)")
+    parser.add_argument('--profile-stage', action='append', default=[], choices=("extract", "options", "progress"),
+                        help="Also run this stage under cProfile (repeatable)")
+    parser.add_argument('--profile-dir', default=str(Path(__file__).parent / "profiles"),
+                        help="Where profile sessions are saved")
+
+
+def profile_arguments(args):
+    """The profiling options as given, to pass on to a child process."""
+    forwarded = ['--profile'] if args.profile else []
+    for stage in args.profile_stage:
+        forwarded += ['--profile-stage', stage]
+    return forwarded + ['--profile-dir', args.profile_dir] if forwarded else []
+
+
+def run_scenario(name, base_url, items, warmup, mode):
+    G = import_gui()  # Imported here so the parent process stays small
+
+    work_dir = Path(tempfile.mkdtemp(prefix=f"ytgui-bench-{name}-"))
+    config = benchmark_config(G, work_dir / "out", mode)
+    downloader = G.YouTubeDownloader(config=config, db=G.DatabaseManager(str(work_dir / "bench.db")))
+    urls = {'direct': f"{base_url}/direct.mp4", 'hls': f"{base_url}/hls/stream.m3u8",
+            'dash': f"{base_url}/dash/stream.mpd"}
+
+    def download_once(url, index):
+        options = {'outtmpl': str(work_dir / "out" / f"{index}.%(ext)s"), 'quiet': True, 'no_warnings': True}
+        result = downloader.download(url, options)
+        if result['status'] != 'success':
+            raise RuntimeError(f"{url}: {result['message']}")
+        return sum(f.stat().st_size for f in (work_dir / "out").glob(f"{index}.*"))
+
+    def warm_downloads():
+        for index in range(warmup):
+            download_once(urls[name], f"warmup{index}")
+
+    def run_downloads():
+        latencies, size = [], 0
+        for index in range(items):
+            started = time.perf_counter()
+            size += download_once(urls[name], index)
+            latencies.append(time.perf_counter() - started)
+        return latencies, size, 0
+
+    def warm_playlist():
+        for _ in range(warmup):
+            downloader.get_playlist_info(f"{base_url}/feed.rss")
+
+    def run_playlist():
+        latencies, entries = [], 0
+        for _ in range(items):
+            started = time.perf_counter()
+            entries += len(downloader.get_playlist_info(f"{base_url}/feed.rss")['videos'])
+            latencies.append(time.perf_counter() - started)
+        return latencies, 0, entries
+
+    def warm_downloads_of_each_kind():
+        for index in range(warmup):
+            for kind in ('direct', 'hls', 'dash'):
+                download_once(urls[kind], f"warmup{index}{kind}")
+
+    def run_queue():
+        runner = make_headless_queue(G)(downloader)
+        kinds = ['direct', 'hls', 'dash']
+        runner.download_queue.extend(
+            {'title': f"{kinds[index % 3]} {index}", 'url': re.sub(r'(\.\w+)$', rf'-{index}\1', urls[kinds[index % 3]]),
+             'quality': "720p", 'format': "mp4", 'audio': "best", 'duration': 160, 'queued_at': time.time()}
+            for index in range(items))
+        runner.is_downloading = True
+        runner.download_from_queue()
+        runner.orchestrator.shutdown()
+        failed = [timeline.title for timeline in runner.timelines if timeline.events[-1]['name'] != 'success']
+        if failed:
+            raise RuntimeError(f"Queue items failed: {failed}")
+        latencies = []
+        for timeline in runner.timelines:
+            start = next(event['ts'] for event in timeline.events if event['name'] == 'waiting for a download slot')
+            latencies.append((timeline.events[-1]['ts'] - start) / 1e6)
+        size = sum(f.stat().st_size for f in (work_dir / "out").rglob("*")
+                   if f.is_file() and not f.name.startswith("warmup"))
+        return latencies, size, 0
+
+    if name == 'playlist':
+        scenario = (warm_playlist, run_playlist)
+    elif name == 'queue':
+        scenario = (warm_downloads_of_each_kind, run_queue)
+    else:
+        scenario = (warm_downloads, run_downloads)
+    def finish():
+        if downloader.process_pool:
+            downloader.process_pool.shutdown()
+
+    try:
+        return measure(*scenario, finish)
+    finally:
+        finish()
+        downloader.db.close()
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    try:
+        import yt_dlp
+        yt_dlp_version = yt_dlp.version.__version__
+    except ImportError:
+        yt_dlp_version = None
+    return {'commit': commit, 'python': platform.python_version(), 'yt_dlp': yt_dlp_version,
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def format_report(results):
+    header = f"{'scenario':<10}{'items':>7}{'wall s':>9}{'p50 s':>9}{'p95 s':>9}{'MB/s':>9}{'items/s':>9}{'CPU s':>9}{'RSS MB':>9}"
+    lines = [header, "-" * len(header)]
+    for name, result in results.items():
+        if 'error' in result:
+            lines.append(f"{name:<10} failed: {result['error']}")
+            continue
+        cells = [result['items'], result['wall_s'], result['p50_s'], result['p95_s'], result['throughput_mbps'],
+                 result['items_per_s'], result['cpu_s'], result['peak_rss_mb']]
+        lines.append(f"{name:<10}" + "".join(f"{'-' if value is None else value:>{7 if i == 0 else 9}}"
+                                             for i, value in enumerate(cells)))
+    return "\n".join(lines)
+
+
+def compare(results, baseline, threshold):
+    """Lines describing changes beyond threshold (percent); the bool is True on any regression."""
+    lines, regressed = [], False
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before or 'error' in result or 'error' in before:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            if abs(change) >= threshold:
+                verdict = "REGRESSION" if worse > 0 else "improved"
+                regressed |= worse > 0
+                lines.append(f"{name:<10}{metric:<17}{old:>10} -> {new:<10} ({change:+.1f}%) {verdict}")
+    return lines, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the YouTube downloader GUI.")
+    parser.add_argument('scenarios', nargs='*', metavar="SCENARIO",
+                        help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--items', type=int, default=6, help="Measured items per scenario")
+    parser.add_argument('--warmup', type=int, default=1, help="Unmeasured items run first in each scenario")
+    parser.add_argument('--mode', choices=["threads", "processes"], default="threads",
+                        help="performance.execution_mode to benchmark")
+    parser.add_argument('--file-mb', type=int, default=20, help="Size of the direct file")
+    parser.add_argument('--fragments', type=int, default=40, help="Fragments of the HLS and DASH streams")
+    parser.add_argument('--fragment-kb', type=int, default=256, help="Size of each fragment")
+    parser.add_argument('--playlist-size', type=int, default=500, help="Entries in the RSS playlist")
+    parser.add_argument('--save', metavar="JSON", help="Write the results here")
+    parser.add_argument('--compare', metavar="JSON", help="Baseline results to compare against")
+    parser.add_argument('--threshold', type=float, default=15.0,
+                        help="Percent change that counts as a regression (default: 15)")
+    add_profile_arguments(parser)
+    # Internal: one scenario in a child process, result as JSON on stdout
+    parser.add_argument('--child', nargs=2, metavar=("SCENARIO", "BASE_URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if unknown := set(args.scenarios) - set(SCENARIOS):
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    if args.child:
+        session = start_profile(args, f"bench-{args.child[0]}")
+        try:
+            result = run_scenario(args.child[0], args.child[1], args.items, args.warmup, args.mode)
+        finally:
+            if session:
+                print(f"Profile saved to {session.close()}", file=sys.stderr)
+        print("RESULT " + json.dumps(result))
+        return 0
+
+    settings = {key: getattr(args, key) for key in
+                ('items', 'warmup', 'mode', 'file_mb', 'fragments', 'fragment_kb', 'playlist_size')}
+    with tempfile.TemporaryDirectory(prefix="ytgui-bench-media-") as media_dir:
+        MediaLibrary(media_dir, args.file_mb, args.fragments, args.fragment_kb, args.playlist_size).build()
+        server, base_url = start_server(media_dir)
+        results = {}
+        try:
+            for name in args.scenarios or SCENARIOS:
+                print(f"Running {name}...", file=sys.stderr)
+                child = subprocess.run(
+                    [sys.executable, __file__, '--child', name, base_url, '--items', str(args.items),
+                     '--warmup', str(args.warmup), '--mode', args.mode] + profile_arguments(args),
+                    capture_output=True, text=True)
+                for line in child.stderr.splitlines():
+                    if line.startswith("Profile saved to "):
+                        print(f"  {line}", file=sys.stderr)
+                line = next((line for line in child.stdout.splitlines() if line.startswith("RESULT ")), None)
+                if line is None:
+                    error = (child.stderr.strip().splitlines() or ["no output"])[-1]
+                    results[name] = {'error': error}
+                else:
+                    results[name] = json.loads(line[len("RESULT "):])
+        finally:
+            server.shutdown()
+
+    print(format_report(results))
+    document = {'environment': environment(), 'settings': settings, 'results': results}
+    if args.save:
+        Path(args.save).write_text(json.dumps(document, indent=2), encoding='utf-8')
+    exit_code = 1 if any('error' in result for result in results.values()) else 0
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        if baseline.get('settings') != settings:
+            print(f"\nWarning: baseline was run with different settings: {baseline.get('settings')}")
+        lines, regressed = compare(results, baseline, args.threshold)
+        print(f"\nCompared with {args.compare} (commit {baseline.get('environment', {}).get('commit')}, "
+              f"threshold {args.threshold:g}%):")
+        print("\n".join(lines) if lines else "No changes beyond the threshold.")
+        if regressed:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""Load tests for Youtube_GUI.py at playlist and queue sizes the network can't give on CI.
+
+The extractor plugin in loadtest/yt_dlp_plugins/extractor/gui_fake.py makes up 'fake:' videos
+and playlists of any size, with latency and injected 429/403/timeout/DPAPI failures;
+a local server answers their format URLs with generated bytes. Like benchmark.py,
+each scenario runs in a fresh process and reports wall time, latencies, CPU time and
+peak memory. It also checks the outcome (every entry listed, every retried item
+downloaded, ...) and exits 1 if a check fails:
+
+    python loadtest.py                                   # every scenario at the default sizes
+    python loadtest.py playlist selector --size 100000
+    python loadtest.py queue --items 500 --failures 429,timeout --fail-rate 0.5
+
+Scenarios:
+    playlist   YouTubeDownloader.iter_playlist_info over a fake playlist of --size entries
+    database   DatabaseManager writes from --threads threads at once
+    queue      MainWindow.download_from_queue over --items fake videos with injected
+               failures, retried by the real RetryPolicy with its delays scaled down
+    selector   PlaylistSelectorWindow streaming a playlist of --size entries; needs a
+               display and is skipped without one
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+from benchmark import (MediaServer, add_profile_arguments, benchmark_config, environment, format_report,
+                       import_gui, make_headless_queue, measure, profile_arguments, start_profile)
+
+SCENARIOS = ("playlist", "database", "queue", "selector")
+FAILURES = ("429", "403", "timeout", "dpapi")
+
+
+# ============================================================================
+# FAKE MEDIA SERVER
+# ============================================================================
+
+class FakeMediaHandler(BaseHTTPRequestHandler):
+    """GET /bytes/<n> answers n zero bytes, /status/<code> that HTTP status (see gui_fake)."""
+
+    CHUNK = bytes(64 * 1024)
+
+    def do_GET(self):
+        kind, _, value = urllib.parse.urlparse(self.path).path.strip('/').partition('/')
+        if kind == 'status' and value.isdigit():
+            return self.send_error(int(value))
+        if kind != 'bytes' or not value.isdigit():
+            return self.send_error(404)
+        remaining = int(value)
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(remaining))
+        self.end_headers()
+        while remaining > 0:
+            chunk = self.CHUNK[:remaining]
+            self.wfile.write(chunk)
+            remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_media_server():
+    server = MediaServer(('127.0.0.1', 0), FakeMediaHandler)
+    threading.Thread(target=server.serve_forever, name="fake-media-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def fake_url(kind, **params):
+    return f"fake:{kind}?" + urllib.parse.urlencode({key: value for key, value in params.items() if value is not None})
+
+
+# ============================================================================
+# SCENARIOS (run in a child process each)
+# ============================================================================
+
+class Skipped(Exception):
+    """The scenario cannot run in this environment."""
+
+
+def run_scenario(name, media_url, args):
+    G = import_gui()  # Also puts the 'fake:' plugin where yt-dlp finds it
+
+    work_dir = Path(tempfile.mkdtemp(prefix=f"ytgui-load-{name}-"))
+    config = benchmark_config(G, work_dir / "out", args.mode)
+    config['download'].update(queue_retries=args.retries)
+    if 'dpapi' in args.failures:
+        # The fake DPAPI error is only raised when browser cookies are requested
+        config['authentication'].update(use_cookies=True, cookie_browser="chrome")
+    downloader = G.YouTubeDownloader(config=config, db=G.DatabaseManager(str(work_dir / "load.db")))
+    extra = {'checks_failed': []}
+
+    def check(passed, message):
+        if not passed:
+            extra['checks_failed'].append(message)
+
+    def nothing():
+        pass
+
+    def run_playlist():
+        url = fake_url('playlist', list=f"load{args.size}", size=args.size, page_latency=args.page_latency or None)
+        started = time.perf_counter()
+        pages = downloader.iter_playlist_info(url)
+        next(pages)
+        entries = 0
+        for page in pages:
+            if not entries:
+                extra['first_page_s'] = round(time.perf_counter() - started, 4)
+            entries += len(page)
+        check(entries == args.size, f"listed {entries} of {args.size} entries")
+        return [time.perf_counter() - started], 0, entries
+
+    def run_database():
+        db = downloader.db
+        per_thread = args.records // args.threads
+        latencies = [[] for _ in range(args.threads)]
+
+        def writer(number):
+            for index in range(per_thread):
+                video_id = f"db-{number}-{index}"
+                started = time.perf_counter()
+                if index % 10 == 9:
+                    db.add_failure(fake_url('video', v=video_id), video_id, "transient", "timed out", 1, final=False)
+                else:
+                    db.add_download(G.DownloadRecord(
+                        id=video_id, title=f"Fake video {video_id}", uploader="Fake channel",
+                        webpage_url=fake_url('video', v=video_id), duration=10, format="720p",
+                        resolution="1280x720", filename=f"{video_id}.mp4", filesize=1000))
+                latencies[number].append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=writer, args=(number,)) for number in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with db.lock:
+            rows = (db.conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+                    + db.conn.execute("SELECT COUNT(*) FROM failures").fetchone()[0])
+        check(rows == per_thread * args.threads, f"stored {rows} of {per_thread * args.threads} rows")
+        flat = [latency for thread_latencies in latencies for latency in thread_latencies]
+        return flat, 0, len(flat)
+
+    def run_queue():
+        scale = args.backoff_scale
+
+        class LoadQueue(make_headless_queue(G)):
+            def _handle_failed_item(self, queue_item, result, failures):
+                requeued = super()._handle_failed_item(queue_item, result, failures)
+                if requeued:
+                    # Real categories and attempt counts, backoff shortened (runs on the queue thread)
+                    wait = (queue_item['not_before'] - time.time()) * scale
+                    queue_item['not_before'] = queue_item['queued_at'] = time.time() + wait
+                return requeued
+
+        failures = args.failures or [None]
+        runner = LoadQueue(downloader)
+        runner.download_queue.extend(
+            {'title': f"Fake video {index}", 'quality': "720p", 'format': "mp4", 'audio': "best",
+             'duration': args.duration, 'queued_at': time.time(),
+             'url': fake_url('video', v=f"q{index}", split=0, formats=2, duration=args.duration,
+                             latency=args.latency or None, media=media_url, fail=failures[index % len(failures)],
+                             fail_rate=args.fail_rate, fail_attempts=args.fail_attempts)}
+            for index in range(args.items))
+        runner.is_downloading = True
+        runner.download_from_queue()
+        runner.orchestrator.shutdown()
+
+        succeeded = {timeline.title for timeline in runner.timelines if timeline.events[-1]['name'] == 'success'}
+        with downloader.db.lock:
+            counts = dict(downloader.db.conn.execute("SELECT final, COUNT(*) FROM failures GROUP BY final").fetchall())
+        extra.update(succeeded=len(succeeded), retries=counts.get(0, 0), gave_up=counts.get(1, 0))
+        if args.mode == 'threads' and 0 < args.fail_attempts <= args.retries:
+            # Worker processes count attempts each, so only threads mode guarantees this
+            check(len(succeeded) == args.items, f"{len(succeeded)} of {args.items} items downloaded")
+        latencies = []
+        for timeline in runner.timelines:
+            start = next(event['ts'] for event in timeline.events if event['name'] == 'waiting for a download slot')
+            latencies.append((timeline.events[-1]['ts'] - start) / 1e6)
+        size = sum(f.stat().st_size for f in (work_dir / "out").rglob("*") if f.is_file())
+        return latencies, size, len(succeeded)
+
+    def run_selector():
+        import tkinter
+        os.chdir(work_dir)  # MainWindow keeps its config and database in the working directory
+        try:
+            app = G.MainWindow()
+        except tkinter.TclError as e:
+            raise Skipped(f"needs a display ({e})")
+        app.withdraw()
+        marks = {}
+
+        def poll():
+            window = app.playlist_window
+            if window is not None:
+                marks.setdefault('first_page', time.perf_counter())
+                if not window.loading:
+                    marks['done'] = time.perf_counter()
+                    marks['entries'] = len(window.check_vars)
+                    window.close()
+                    app.after(50, app.quit)
+                    return
+            app.after(20, poll)
+
+        url = fake_url('playlist', list=f"load{args.size}", size=args.size, page_latency=args.page_latency or None)
+        started = time.perf_counter()
+        app.orchestrator.spawn('extract', app._stream_playlist, url)
+        app.after(20, poll)
+        app.mainloop()
+        app.orchestrator.shutdown()
+        app.destroy()
+        extra['first_page_s'] = round(marks['first_page'] - started, 4)
+        check(marks['entries'] == args.size, f"listed {marks['entries']} of {args.size} entries")
+        return [marks['done'] - started], 0, marks['entries']
+
+    def finish():
+        if downloader.process_pool:
+            downloader.process_pool.shutdown()
+
+    runs = {'playlist': run_playlist, 'database': run_database, 'queue': run_queue, 'selector': run_selector}
+    try:
+        return dict(measure(nothing, runs[name], finish), **extra)
+    except Skipped as e:
+        return {'skipped': str(e)}
+    finally:
+        finish()
+        downloader.db.close()
+
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+# Options passed on to the child processes as given
+CHILD_OPTIONS = ('mode', 'size', 'page_latency', 'records', 'threads', 'items', 'duration', 'latency',
+                 'failures', 'fail_rate', 'fail_attempts', 'retries', 'backoff_scale')
+
+
+def failure_list(text):
+    kinds = [kind for kind in text.split(',') if kind]
+    if unknown := set(kinds) - set(FAILURES):
+        raise argparse.ArgumentTypeError(f"unknown failure kind(s): {', '.join(sorted(unknown))}")
+    return kinds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load tests for the YouTube downloader GUI.")
+    parser.add_argument('scenarios', nargs='*', metavar="SCENARIO",
+                        help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--mode', choices=["threads", "processes"], default="threads",
+                        help="performance.execution_mode to test")
+    parser.add_argument('--size', type=int, default=10000, help="Playlist entries, 1 to 100000 (playlist, selector)")
+    parser.add_argument('--page-latency', type=float, default=0.0, help="Seconds per 100-entry playlist page")
+    parser.add_argument('--records', type=int, default=20000, help="Rows written (database)")
+    parser.add_argument('--threads', type=int, default=8, help="Writer threads (database)")
+    parser.add_argument('--items', type=int, default=100, help="Queue items (queue)")
+    parser.add_argument('--duration', type=int, default=2, help="Seconds per fake video; sets its size (queue)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per extraction (queue)")
+    parser.add_argument('--failures', type=failure_list, default=list(FAILURES[:3]),
+                        help="Comma-separated kinds injected round-robin: 429, 403, timeout, dpapi "
+                             "(default: 429,403,timeout). dpapi turns on browser cookies for the run, so "
+                             "videos that don't fail need readable cookies; use it with --fail-rate 1")
+    parser.add_argument('--fail-rate', type=float, default=0.3, help="Share of videos that fail (queue)")
+    parser.add_argument('--fail-attempts', type=int, default=1,
+                        help="Failing videos fail this many attempts, 0 for every attempt (queue)")
+    parser.add_argument('--retries', type=int, default=3, help="download.queue_retries (queue)")
+    parser.add_argument('--backoff-scale', type=float, default=0.01, help="Factor applied to retry delays (queue)")
+    parser.add_argument('--save', metavar="JSON", help="Write the results here")
+    add_profile_arguments(parser)
+    # Internal: one scenario in a child process, result as JSON on stdout
+    parser.add_argument('--child', nargs=2, metavar=("SCENARIO", "MEDIA_URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if unknown := set(args.scenarios) - set(SCENARIOS):
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    if not 1 <= args.size <= 100000:
+        parser.error("--size must be between 1 and 100000")
+    if args.child:
+        session = start_profile(args, f"load-{args.child[0]}")
+        try:
+            result = run_scenario(args.child[0], args.child[1], args)
+        finally:
+            if session:
+                print(f"Profile saved to {session.close()}", file=sys.stderr)
+        print("RESULT " + json.dumps(result))
+        return 0
+
+    forwarded = []
+    for key in CHILD_OPTIONS:
+        value = getattr(args, key)
+        forwarded += [f"--{key.replace('_', '-')}", ",".join(value) if isinstance(value, list) else str(value)]
+    server, media_url = start_media_server()
+    results = {}
+    try:
+        for name in args.scenarios or SCENARIOS:
+            print(f"Running {name}...", file=sys.stderr)
+            child = subprocess.run([sys.executable, __file__, '--child', name, media_url] + forwarded
+                                   + profile_arguments(args), capture_output=True, text=True)
+            for line in child.stderr.splitlines():
+                if line.startswith("Profile saved to "):
+                    print(f"  {line}", file=sys.stderr)
+            line = next((line for line in child.stdout.splitlines() if line.startswith("RESULT ")), None)
+            if line is None:
+                results[name] = {'error': (child.stderr.strip().splitlines() or ["no output"])[-1]}
+            else:
+                results[name] = json.loads(line[len("RESULT "):])
+    finally:
+        server.shutdown()
+
+    measured = {name: result for name, result in results.items() if 'skipped' not in result}
+    print(format_report(measured))
+    failed = False
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name}: skipped, {result['skipped']}")
+            continue
+        details = {key: result[key] for key in ('first_page_s', 'succeeded', 'retries', 'gave_up') if key in result}
+        if details:
+            print(f"{name}: " + ", ".join(f"{key}={value}" for key, value in details.items()))
+        for message in result.get('checks_failed', []):
+            print(f"{name}: CHECK FAILED: {message}")
+        failed |= 'error' in result or bool(result.get('checks_failed'))
+    if args.save:
+        Path(args.save).write_text(json.dumps({'environment': environment(), 'settings': vars(args),
+                                               'results': results}, indent=2), encoding='utf-8')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Fake videos and playlists for load-testing Youtube_GUI.py without the network.
+
+yt-dlp loads this file as an extractor plugin when the directory holding
+'yt_dlp_plugins' (loadtest/) is on sys.path; benchmark.py and loadtest.py add it,
+the app itself never does. It only handles 'fake:' URLs:
+
+    fake:video?v=ID[&options]
+    fake:playlist?list=NAME&size=N[&page=100&page_latency=0][&options]
+
+Video options (a playlist passes its own on to every entry):
+    formats=N        video heights on the ladder, 144p up (default 4)
+    split=0|1        YouTube-style video-only + audio-only formats plus one muxed
+                     format (default 1); 0 lists muxed formats only, which
+                     download without ffmpeg
+    duration=S       seconds (default 10, or seeded 60-1200 in playlists); format sizes follow
+    chapters=N       split the video into N chapters
+    latency=S        sleep this long in every extraction
+    media=URL        base URL of a server answering GET /bytes/<n> with n bytes (and
+                     /status/<code> with that status); format URLs point there.
+                     Without it they point at a closed local port and downloads fail
+    fail=KIND        429, 403, timeout or dpapi: raise the error yt-dlp would
+    fail_rate=R      share of videos that fail (default 1), picked by a seeded hash of the ID
+    fail_attempts=N  fail only the first N extractions of each failing video, so
+                     retries eventually succeed (default 0: every attempt fails)
+    fail_stage=S     extract (default) or download: 429 and 403 are then returned by
+                     the media server while fetching the format
+    seed=N           varies the seeded choices
+
+'dpapi' only fails when cookiesfrombrowser is set, like the real Chrome cookie
+decryption error on Windows. Attempts are counted per process.
+"""
+
+import hashlib
+import threading
+import time
+import urllib.parse
+
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils import ExtractorError
+
+HEIGHTS = [144, 240, 360, 480, 720, 1080, 1440, 2160, 4320]
+
+# Message of each injected failure, as yt-dlp reports the real one
+FAILURES = {
+    '429': 'HTTP Error 429: Too Many Requests',
+    '403': 'HTTP Error 403: Forbidden',
+    'timeout': 'Unable to download webpage: The read operation timed out',
+    'dpapi': 'Failed to decrypt with DPAPI. See https://github.com/yt-dlp/yt-dlp/issues/10927 for more info',
+}
+
+# Discard port: format URLs stay valid, fetching them is refused
+NO_MEDIA = 'http://127.0.0.1:9'
+
+# Playlist-only parameters; everything else is passed on to the entries
+PLAYLIST_PARAMS = ('list', 'size', 'page', 'page_latency')
+
+
+def _params(url):
+    return dict(urllib.parse.parse_qsl(urllib.parse.urlparse(url).query))
+
+
+def _unit(*parts):
+    """Seeded number in [0, 1) for the given parts, the same in every process."""
+    digest = hashlib.sha1(':'.join(map(str, parts)).encode()).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+class FakeGuiIE(InfoExtractor):
+    IE_NAME = 'fake:video'
+    _VALID_URL = r'fake:video\?(?:.*&)?v=(?P<id>[^&]+)'
+
+    _attempts = {}  # video ID -> extractions so far
+    _attempts_lock = threading.Lock()
+
+    @classmethod
+    def reset_attempts(cls):
+        with cls._attempts_lock:
+            cls._attempts.clear()
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        params = _params(url)
+        seed = params.get('seed', '0')
+        if latency := float(params.get('latency') or 0):
+            time.sleep(latency)
+        with self._attempts_lock:
+            attempt = self._attempts[video_id] = self._attempts.get(video_id, 0) + 1
+
+        # The DPAPI error comes from reading browser cookies, which only happens when they are requested
+        failure = self._failure(video_id, params, attempt, bool(self.get_param('cookiesfrombrowser')))
+        media = (params.get('media') or NO_MEDIA).rstrip('/')
+        fail_on_download = failure in ('429', '403') and params.get('fail_stage') == 'download'
+        if failure and not fail_on_download:
+            raise ExtractorError(FAILURES[failure], video_id=video_id, expected=True)
+
+        duration = int(params.get('duration') or 10)
+        formats = []
+        for height in HEIGHTS[:max(1, int(params.get('formats') or 4))]:
+            formats.append(self._format(f'{height}p', height, duration, media, video_id,
+                                        muxed=params.get('split') == '0'))
+        if params.get('split') != '0':
+            formats.append(self._format('18', 360, duration, media, video_id, muxed=True))
+            for format_id, abr in (('139', 48), ('140', 128)):
+                formats.append({
+                    'format_id': format_id, 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2',
+                    'abr': abr, 'tbr': abr, 'filesize': abr * duration * 125,
+                    'url': f'{media}/bytes/{abr * duration * 125}?v={video_id}&f={format_id}',
+                })
+        if fail_on_download:
+            for f in formats:
+                f['url'] = f'{media}/status/{failure}?v={video_id}'
+
+        chapter_count = int(params.get('chapters') or 0)
+        return {
+            'id': video_id,
+            'title': params.get('title') or f'Fake video {video_id}',
+            'uploader': 'Fake channel',
+            'channel_id': 'fake',
+            'duration': duration,
+            'upload_date': '20240101',
+            'view_count': int(_unit(seed, video_id, 'views') * 1_000_000),
+            'like_count': int(_unit(seed, video_id, 'likes') * 10_000),
+            'description': f'Generated by the gui_fake plugin ({urllib.parse.urlparse(url).query})',
+            'tags': ['fake'],
+            'categories': ['Testing'],
+            'age_limit': 0,
+            'availability': 'public',
+            'live_status': 'not_live',
+            'chapters': [{'title': f'Chapter {index + 1}', 'start_time': duration * index / chapter_count,
+                          'end_time': duration * (index + 1) / chapter_count}
+                         for index in range(chapter_count)],
+            'formats': formats,
+        }
+
+    @staticmethod
+    def _failure(video_id, params, attempt, with_cookies):
+        """The failure kind to raise on this attempt, or None."""
+        failure = params.get('fail')
+        if failure not in FAILURES:
+            return None
+        if _unit(params.get('seed', '0'), video_id, 'fail') >= float(params.get('fail_rate') or 1):
+            return None
+        if failure == 'dpapi' and not with_cookies:
+            return None
+        fail_attempts = int(params.get('fail_attempts') or 0)
+        if fail_attempts and attempt > fail_attempts:
+            return None
+        return failure
+
+    def _format(self, format_id, height, duration, media, video_id, muxed):
+        tbr = height * 2 + (128 if muxed else 0)
+        size = tbr * duration * 125
+        return {
+            'format_id': format_id, 'ext': 'mp4', 'height': height, 'width': height * 16 // 9, 'fps': 30,
+            'vcodec': 'avc1.4d401e', 'acodec': 'mp4a.40.2' if muxed else 'none',
+            'tbr': tbr, 'filesize': size, 'format_note': f'{height}p',
+            'url': f'{media}/bytes/{size}?v={video_id}&f={format_id}',
+        }
+
+
+class FakeGuiPlaylistIE(InfoExtractor):
+    IE_NAME = 'fake:playlist'
+    _VALID_URL = r'fake:playlist\?(?:.*&)?list=(?P<id>[^&]+)'
+
+    def _real_extract(self, url):
+        playlist_id = self._match_id(url)
+        params = _params(url)
+        if latency := float(params.get('latency') or 0):
+            time.sleep(latency)
+        size = int(params.get('size') or 10)
+        entry_params = {k: v for k, v in params.items() if k not in PLAYLIST_PARAMS}
+        return self.playlist_result(
+            self._entries(playlist_id, params, size, entry_params), playlist_id, f'Fake playlist {playlist_id}',
+            uploader='Fake channel', playlist_count=size)
+
+    def _entries(self, playlist_id, params, size, entry_params):
+        # A generator like YouTube's tabs: each page costs page_latency when it is reached
+        page_size = max(1, int(params.get('page') or 100))
+        page_latency = float(params.get('page_latency') or 0)
+        seed = params.get('seed', '0')
+        for index in range(size):
+            if page_latency and index % page_size == 0:
+                time.sleep(page_latency)
+            video_id = f'{playlist_id}-{index}'
+            duration = int(params['duration']) if params.get('duration') else 60 + int(_unit(seed, video_id) * 1140)
+            url = 'fake:video?' + urllib.parse.urlencode(dict(entry_params, v=video_id, duration=duration))
+            yield self.url_result(url, FakeGuiIE, video_id, f'Fake video {index + 1}', duration=duration)